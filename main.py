@@ -1,8 +1,8 @@
 from src.utilities.logger import Logger
 from src.configuration import Configuration
 from dotenv import load_dotenv
-from src.execution_orchestrator import ExecutionOrchestrator
 import logging
+import signal
 
 
 if __name__ == "__main__":
@@ -13,7 +13,12 @@ if __name__ == "__main__":
         Logger()
         cfg = Configuration('run.cfg')
 
+        # Imported once the configuration is valid, the engine pulls in pandas and the rest
+        from src.execution_orchestrator import ExecutionOrchestrator
+
         trading_system = ExecutionOrchestrator(cfg)
+        signal.signal(signal.SIGTERM, lambda signum, frame: trading_system.stop())
+        signal.signal(signal.SIGINT, lambda signum, frame: trading_system.stop())
         trading_system.start()
 
     except Exception as e:
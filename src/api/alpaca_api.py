@@ -1,32 +1,55 @@
-from alpaca.data.live.option import OptionDataStream
-from alpaca.data.historical.option import OptionHistoricalDataClient
-from typing import Callable, List
+from __future__ import annotations
+from datetime import datetime
+from typing import Callable, List, TYPE_CHECKING
 import threading
 import time
 from typing import Union, Optional, Dict, Any
 from uuid import UUID
-from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import (
-    GetOrdersRequest, 
-    MarketOrderRequest, 
-    GetOrderByIdRequest, 
-    ClosePositionRequest, 
-    GetOptionContractsRequest,
-    LimitOrderRequest,
-    StopOrderRequest,
-    GetAssetsRequest
-)
-from alpaca.trading.enums import OrderSide, QueryOrderStatus, OrderType
-from alpaca.trading.client import TradingClient
-from alpaca.trading.enums import OrderSide, TimeInForce, OrderType, AssetClass
-from alpaca.trading.models import OptionContract, OptionContractsResponse, Asset
 import logging
 import os
 from src.configuration import Configuration
 from src.utilities.enums import Signal
 from dotenv import load_dotenv
-from alpaca.trading.stream import TradingStream
-from alpaca.trading.models import Order
+from src.pricing.black_scholes import parse_option_symbol
+from src.api.stream_supervisor import StreamSupervisor
+from src.mkt_data.warm_start_loader import bars_to_frame
+from src.utilities.metrics import REGISTRY
+import functools
+
+# The Alpaca SDK takes longer to import than the rest of the engine, so it is only imported
+# where it is used. Configuration and ledger errors then surface before it is loaded.
+if TYPE_CHECKING:
+    from alpaca.data.live.option import OptionDataStream
+    from alpaca.data.models import BarSet
+    from alpaca.data.timeframe import TimeFrame
+    from alpaca.trading.models import Asset, OptionContract
+    from alpaca.trading.requests import GetAssetsRequest, GetOptionContractsRequest, GetOrderByIdRequest
+
+
+API_CALLS = REGISTRY.counter("alpaca_api_calls_total", "REST calls to the Alpaca API", ["method"])
+API_ERRORS = REGISTRY.counter("alpaca_api_errors_total", "REST calls to the Alpaca API that raised", ["method"])
+API_CALL_SECONDS = REGISTRY.histogram("alpaca_api_call_seconds", "Duration of REST calls to the Alpaca API", ["method"])
+
+
+def _instrumented(func):
+    """Count the calls, errors and duration of a REST call"""
+    calls = API_CALLS.labels(func.__name__)
+    errors = API_ERRORS.labels(func.__name__)
+    seconds = API_CALL_SECONDS.labels(func.__name__)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        calls.inc()
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            seconds.observe(time.perf_counter() - start)
+
+    return wrapper
 
 
 class AlpacaAPI:
@@ -38,7 +61,11 @@ class AlpacaAPI:
         "trading_api", 
         "trading_stream", 
         "option_md_stream", 
-        "option_md_api"
+        "option_md_api",
+        "equity_md_stream",
+        "option_md_supervisor",
+        "_underlying_subscriptions",
+        "_option_md_subscriptions"
         )
 
     def __init__(self) -> None:
@@ -53,21 +80,39 @@ class AlpacaAPI:
         self.trading_stream = None
         self.option_md_stream = None
         self.option_md_api = None
+        self.equity_md_stream = None
+        self.option_md_supervisor = None
+        self._underlying_subscriptions = set()
+        self._option_md_subscriptions = [] # (quotes_handler, trades_handler, symbols, backfill_handler)
 
     def connect(self, config: Configuration) -> None:
         self._connect_trading_api(config)
         self._connect_trading_websocket(config)
         self._connect_option_md_api(config)
-        self._connect_option_md_websocket(config)
+        if not config.shared_feed: # Option quotes are read from the feed handler's ring instead
+            self._connect_option_md_websocket(config)
+        if config.subscribe_underlying:
+            self._connect_equity_md_websocket(config)
 
         time.sleep(3) #important to wait for the websockets to connect!
 
+    def connect_market_data(self, config: Configuration) -> None:
+        """
+        Connect only the option market data API and websocket, as used by the feed handler.
+
+        :param config: Configuration object containing API keys and settings.
+        """
+        self._connect_option_md_api(config)
+        self._connect_option_md_websocket(config)
+
     def _connect_trading_api(self, config: Configuration) -> None:
         """
         Connect to the Alpaca API using the provided configuration.
 
         :param config: Configuration object containing API keys and settings.
         """
+        from alpaca.trading.client import TradingClient
+
         try:
             self.trading_api = TradingClient(
                 api_key=os.environ.get('ALPACA_KEY', 'WRONG-KEY'),
@@ -87,6 +132,8 @@ class AlpacaAPI:
 
         :param config: Configuration object containing API keys and settings.
         """
+        from alpaca.trading.stream import TradingStream
+
         try:
             self.trading_stream = TradingStream(
                 api_key=os.environ.get('ALPACA_KEY', 'WRONG-KEY'),
@@ -112,20 +159,94 @@ class AlpacaAPI:
         :param config: Configuration object containing API keys and settings.
         """
         try:
-            self.option_md_stream = OptionDataStream(
+            self.option_md_supervisor = StreamSupervisor(
+                "option market data",
+                self._create_option_md_stream,
+                on_reconnect=self._backfill_option_md,
+                max_backoff=config.reconnect_max_backoff,
+                silence_timeout=config.reconnect_silence_timeout or None
+            )
+            self.option_md_supervisor.start()
+
+            time.sleep(3) #important to wait for the websocket to connect!
+
+            logging.info("Successfully connected to Alpaca option market data websocket.")
+
+        except Exception as err:
+            logging.error(f"Failed to connect to Alpaca option market data websocket: {err}")
+            raise
+
+    def _create_option_md_stream(self) -> OptionDataStream:
+        """
+        Create the option market data websocket and apply all subscriptions made so far.
+        Used by the supervisor on connect and on every reconnect.
+
+        :return: OptionDataStream
+        """
+        from alpaca.data.live.option import OptionDataStream
+
+        self.option_md_stream = OptionDataStream(
+            api_key=os.environ.get('ALPACA_KEY', 'WRONG-KEY'),
+            secret_key=os.environ.get('ALPACA_SECRET', 'WRONG-KEY')
+        )
+
+        for quotes_handler, trades_handler, symbols, _ in self._option_md_subscriptions:
+            self.option_md_stream.subscribe_quotes(quotes_handler, *symbols)
+            self.option_md_stream.subscribe_trades(trades_handler, *symbols)
+
+        return self.option_md_stream
+
+    def _backfill_option_md(self, disconnected_ns: int) -> None:
+        """
+        Backfill the option market data missed while the websocket was down.
+
+        The option market data API has no historical quotes endpoint. The missed interval is
+        filled with the minute bars of every subscribed symbol since the disconnect, starting
+        at the minute it dropped in, and the latest quotes are fetched to resume from. Both
+        are handed to the backfill handlers.
+
+        :param disconnected_ns: Time the websocket dropped in UTC nanoseconds.
+        """
+        import pandas as pd
+
+        start = pd.Timestamp(disconnected_ns, tz="UTC").floor("min")
+        end = pd.Timestamp.now(tz="UTC")
+
+        for _, _, symbols, backfill_handler in self._option_md_subscriptions:
+            if backfill_handler is None:
+                continue
+
+            barset = self.get_option_bars(symbols, start.to_pydatetime(), end.to_pydatetime())
+            bars = {symbol: bars_to_frame(barset.data.get(symbol, [])) for symbol in symbols}
+            quotes = self.get_option_latest_quotes(symbols)
+
+            msg = f"Backfilling {sum(len(df) for df in bars.values())} bars and {len(quotes)} option quotes"
+            logging.info(msg + f" missed since {start}")
+            backfill_handler(list(quotes.values()), bars)
+
+    def _connect_equity_md_websocket(self, config: Configuration) -> None:
+        """
+        Connect to the Alpaca stock market data websocket, used for the underlyings.
+
+        :param config: Configuration object containing API keys and settings.
+        """
+        from alpaca.data.live.stock import StockDataStream
+
+        try:
+            self.equity_md_stream = StockDataStream(
                 api_key=os.environ.get('ALPACA_KEY', 'WRONG-KEY'),
                 secret_key=os.environ.get('ALPACA_SECRET', 'WRONG-KEY')
             )
 
-            thread = threading.Thread(target=self.option_md_stream.run, daemon=True)
+            thread = threading.Thread(target=self.equity_md_stream.run, daemon=True)
             thread.start()
 
             time.sleep(3) #important to wait for the websocket to connect!
 
-            logging.info("Successfully connected to Alpaca option market data websocket.")
+            logging.info("Successfully connected to Alpaca stock market data websocket.")
 
         except Exception as err:
-            logging.error(f"Failed to connect to Alpaca option market data websocket: {err}")
+            logging.error(f"Failed to connect to Alpaca stock market data websocket: {err}")
             raise
 
     def _connect_option_md_api(self, config: Configuration) -> None:
@@ -134,6 +255,8 @@ class AlpacaAPI:
 
         :param config: Configuration object containing API keys and settings.
         """
+        from alpaca.data.historical.option import OptionHistoricalDataClient
+
         try:
             self.option_md_api = OptionHistoricalDataClient(
                 api_key=os.environ.get('ALPACA_KEY', 'WRONG-KEY'),
@@ -146,11 +269,66 @@ class AlpacaAPI:
             logging.error(f"Failed to connect to Alpaca option market data API: {err}")
             raise
 
-    def subscribe_option_md_updates(self, quotes_handler: Callable, trades_handler: Callable, symbols: List[str]) -> None:
+    def subscribe_option_md_updates(self, 
+                                    quotes_handler: Callable, 
+                                    trades_handler: Callable, 
+                                    symbols: List[str], 
+                                    underlying_quotes_handler: Optional[Callable] = None,
+                                    backfill_handler: Optional[Callable] = None) -> None:
+        """
+        Subscribe to option quotes and trades, and optionally to the quotes of their underlyings.
+        Subscriptions are reapplied when the websocket reconnects.
+
+        :param quotes_handler: Callable called with option quotes.
+        :param trades_handler: Callable called with option trades.
+        :param symbols: Option symbols.
+        :param underlying_quotes_handler: Callable called with underlying stock quotes.
+        :param backfill_handler: Callable called with the latest quotes and a dict of symbol -> minute bars 
+            of the missed interval, fetched after a reconnect.
+        """
         logging.info(f"Subscribing to option market data streaming updates for {symbols}")
+        quotes_handler = self._with_heartbeat(quotes_handler)
+        trades_handler = self._with_heartbeat(trades_handler)
+        self._option_md_subscriptions.append((quotes_handler, trades_handler, list(symbols), backfill_handler))
         self.option_md_stream.subscribe_quotes(quotes_handler, *symbols) 
         self.option_md_stream.subscribe_trades(trades_handler, *symbols)
 
+        if underlying_quotes_handler is not None and self.equity_md_stream is not None:
+            underlyings = [parse_option_symbol(symbol).underlying for symbol in symbols]
+            self.subscribe_underlying_md_updates(underlying_quotes_handler, underlyings)
+
+    def _with_heartbeat(self, handler: Callable) -> Callable:
+        """
+        Wrap a market data handler to report every message to the stream supervisor,
+        which detects a silent stream the SDK reconnected internally.
+
+        :param handler: Async handler of the option market data websocket.
+        :return: Async handler.
+        """
+        @functools.wraps(handler)
+        async def wrapped(data):
+            if self.option_md_supervisor is not None:
+                self.option_md_supervisor.heartbeat()
+            await handler(data)
+
+        return wrapped
+
+    def subscribe_underlying_md_updates(self, quotes_handler: Callable, symbols: List[str]) -> None:
+        """
+        Subscribe to stock quotes of underlyings. Underlyings already subscribed are skipped,
+        so many contracts on the same underlying share a single subscription.
+
+        :param quotes_handler: Callable called with stock quotes.
+        :param symbols: Underlying stock symbols.
+        """
+        new_symbols = sorted(set(symbols) - self._underlying_subscriptions)
+        if not new_symbols:
+            return
+
+        logging.info(f"Subscribing to underlying market data streaming updates for {new_symbols}")
+        self.equity_md_stream.subscribe_quotes(quotes_handler, *new_symbols)
+        self._underlying_subscriptions.update(new_symbols)
+
     def subscribe_trade_updates(self, update_handler: Callable) -> None:
         """
         Subscribe to trade updates from the Alpaca websocket.
@@ -160,6 +338,7 @@ class AlpacaAPI:
         logging.info("Subscribing to trade updates from the Alpaca trading websocket.")
         self.trading_stream.subscribe_trade_updates(update_handler)
 
+    @_instrumented
     def account_details(self) -> dict:
         return self.trading_api.get_account()
     
@@ -169,7 +348,11 @@ class AlpacaAPI:
     def options_trading_level(self) -> int:
         return self.account_details().options_trading_level
 
+    @_instrumented
     def get_orders(self, signal: Signal = None, status: str = "all"):
+        from alpaca.trading.enums import OrderSide, QueryOrderStatus
+        from alpaca.trading.requests import GetOrdersRequest
+
         if not signal and not status:
             return self.trading_api.get_orders()
         
@@ -193,10 +376,16 @@ class AlpacaAPI:
 
         return self.trading_api.get_orders(filter=request_params)
     
+    @_instrumented
     def get_order_by_id(self, order_id: Union[UUID, str], _options: Optional[GetOrderByIdRequest] = None):
         return self.trading_api.get_order_by_id(order_id, _options)
     
-    def place_market_order(self, symbol: str, qty: float, side: Signal, tif = TimeInForce.DAY) -> None:
+    @_instrumented
+    def place_market_order(self, symbol: str, qty: float, side: Signal, tif = None) -> None:
+        from alpaca.trading.enums import OrderSide, TimeInForce
+        from alpaca.trading.requests import MarketOrderRequest
+
+        tif = tif or TimeInForce.DAY
         logging.info(f"Placing market order for {symbol} with quantity {qty} and side {side}")
         side = OrderSide.BUY if side == Signal.BUY else OrderSide.SELL
 
@@ -209,20 +398,44 @@ class AlpacaAPI:
 
         return self.trading_api.submit_order(order_data=market_order_data)
     
+    @_instrumented
+    def place_limit_order(self, symbol: str, qty: float, side: Signal, limit_price: float, tif = None):
+        from alpaca.trading.enums import OrderSide, TimeInForce
+        from alpaca.trading.requests import LimitOrderRequest
+
+        tif = tif or TimeInForce.DAY
+        logging.info(f"Placing limit order for {symbol} with quantity {qty}, side {side} and limit price {limit_price}")
+        side = OrderSide.BUY if side == Signal.BUY else OrderSide.SELL
+
+        limit_order_data = LimitOrderRequest(
+                            symbol=symbol,
+                            qty=qty,
+                            side=side,
+                            time_in_force=tif,
+                            limit_price=limit_price
+                            )
+
+        return self.trading_api.submit_order(order_data=limit_order_data)
+
+    @_instrumented
     def cancel_all_orders(self) -> list:
         """Returns a list of cancelled orders"""
         return self.trading_api.cancel_orders()
     
+    @_instrumented
     def cancel_order_by_id(self, order_id: Union[UUID, str]) -> None:
         return self.trading_api.cancel_order_by_id(order_id)
 
+    @_instrumented
     def get_all_positions(self) -> list:
         """Returns a list of all positions"""
         return self.trading_api.get_all_positions()
     
+    @_instrumented
     def get_open_position_by_id(self, symbol_or_asset_id: Union[UUID, str]):
         return self.trading_api.get_open_position(symbol_or_asset_id)
 
+    @_instrumented
     def close_all_positions(self, cancel_orders: bool = True) -> list:
         """Returns a list of closed positions"""
         return self.trading_api.close_all_positions(cancel_orders=cancel_orders)
@@ -230,27 +443,59 @@ class AlpacaAPI:
     # def close_position_by_id(self, symbol_or_asset_id: Union[UUID, str], close_options: Optional[ClosePositionRequest] = None):
     #     return self.client_api.close_position(symbol_or_asset_id, close_options)
     
+    @_instrumented
     def close_position_by_id(self, symbol_or_asset_id: Union[UUID, str], qty):
+        from alpaca.trading.requests import ClosePositionRequest
+
         if qty:
             close_options = ClosePositionRequest(qty=qty)
             return self.trading_api.close_position(symbol_or_asset_id, close_options)
         else:
             return self.trading_api.close_position(symbol_or_asset_id)
     
+    @_instrumented
     def get_option_contract_by_id(self, symbol_or_id: Union[UUID, str]) -> Union[OptionContract, Dict[str, Any]]:
         return self.trading_api.get_option_contract(symbol_or_id)
     
+    @_instrumented
     def get_all_assets(self, filter: Optional[GetAssetsRequest] = None) -> Union[List[Asset], Dict[str, Any]]:
         return self.trading_api.get_all_assets(filter)
     
     def get_us_options(self) -> List[Asset]:
+        from alpaca.trading.enums import AssetClass
+        from alpaca.trading.requests import GetAssetsRequest
+
         return self.get_all_assets(filter=GetAssetsRequest(asset_class=AssetClass.US_OPTION))
     
+    @_instrumented
     def get_option_contracts(self, filter: GetOptionContractsRequest) -> List[OptionContract]:
         return self.trading_api.get_option_contracts(filter)
 
+    @_instrumented
+    def get_option_latest_quotes(self, symbols: List[str]) -> dict:
+        """Returns the latest quote per option symbol"""
+        from alpaca.data.requests import OptionLatestQuoteRequest
+
+        return self.option_md_api.get_option_latest_quote(OptionLatestQuoteRequest(symbol_or_symbols=symbols))
+
+    @_instrumented
+    def get_option_bars(self, symbols: List[str], start: datetime, end: datetime, timeframe: Optional[TimeFrame] = None) -> BarSet:
+        """Returns the option bars of the symbols between start and end, minute bars by default"""
+        from alpaca.data.requests import OptionBarsRequest
+        from alpaca.data.timeframe import TimeFrame
+
+        timeframe = timeframe or TimeFrame.Minute
+        return self.option_md_api.get_option_bars(
+            OptionBarsRequest(symbol_or_symbols=symbols, start=start, end=end, timeframe=timeframe))
+
     def close_websockets(self):
         logging.info("Stopping and closing websockets")
-        self.trading_stream.stop()
-        self.option_md_stream.stop()
+        if self.trading_stream is not None:
+            self.trading_stream.stop()
+        if self.option_md_supervisor is not None:
+            self.option_md_supervisor.stop()
+        elif self.option_md_stream is not None:
+            self.option_md_stream.stop()
+        if self.equity_md_stream is not None:
+            self.equity_md_stream.stop()
 
@@ -1,5 +1,7 @@
+import math
 import pandas as pd
 from src.api.alpaca_api import AlpacaAPI
+from src.utilities.enums import Signal
 from typing import Optional
 
 
@@ -41,3 +43,22 @@ def check_options_level(api: AlpacaAPI, level: int) -> bool:
     """
     return api.options_approved_level() >= level and api.options_trading_level() >= level
 
+
+def round_to_tick(price: float, side: Signal) -> float:
+    """Round an option limit price to its tick size, away from the market.
+    
+    Options quoted below $3.00 trade in $0.01 increments and the others in $0.05
+    increments, so a sell is rounded up and a buy down to never cross the requested price.
+    
+    Args:
+        price (float): Limit price
+        side (Signal): Side of the order
+        
+    Returns:
+        float: Price on the tick grid
+    """
+    tick = 0.01 if price < 3.0 else 0.05
+    ticks = price / tick
+    # Tolerate the float error of prices that are already on the grid
+    ticks = math.ceil(ticks - 1e-9) if side == Signal.SELL else math.floor(ticks + 1e-9)
+    return round(ticks * tick, 2)
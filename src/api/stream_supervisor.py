@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+
+class StreamSupervisor:
+    """Runs a websocket stream on a daemon thread and recreates it whenever it drops.
+
+    The factory builds a new stream with all subscriptions applied. Reconnects back off
+    exponentially, and the backoff resets once a connection stayed up for stable_after
+    seconds. After every reconnect on_reconnect is called with the disconnect time, so
+    the missed interval can be backfilled.
+
+    The SDK streams also reconnect internally on websocket errors without returning from
+    run. With silence_timeout set, the stream's handlers report every message through
+    heartbeat, and a watchdog thread treats a stream silent for silence_timeout seconds
+    as dropped. Once messages arrive again, on_reconnect is called with the time of the
+    last message before the gap.
+    """
+
+    def __init__(self,
+                 name: str,
+                 factory: Callable,
+                 on_reconnect: Optional[Callable[[int], None]] = None,
+                 initial_backoff: float = 1.0,
+                 max_backoff: float = 60.0,
+                 stable_after: float = 60.0,
+                 silence_timeout: Optional[float] = None) -> None:
+        """Initialize the supervisor.
+
+        Args:
+            name (str): Name of the stream used in log messages
+            factory (Callable): Returns a new stream with the subscriptions applied
+            on_reconnect (Optional[Callable[[int], None]]): Called with the disconnect time in UTC nanoseconds
+            initial_backoff (float): Delay in seconds before the first reconnect attempt
+            max_backoff (float): Maximum delay in seconds between reconnect attempts
+            stable_after (float): Seconds a connection must stay up to reset the backoff
+            silence_timeout (Optional[float]): Seconds without messages after which the stream
+                is considered dropped, None to only detect drops when run returns
+        """
+        self.name = name
+        self.factory = factory
+        self.on_reconnect = on_reconnect
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.silence_timeout = silence_timeout
+
+        self.stream = None
+        self.reconnects = 0
+        self.gaps = 0 # Silent intervals detected by the watchdog
+        self._last_message_ns = None
+        self._gap_start_ns = None # Time of the last message before the current silent interval
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._watchdog = None
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Delay in seconds before reconnect attempt number attempt (starting at 0)."""
+        return min(self.max_backoff, self.initial_backoff * 2 ** attempt)
+
+    def start(self) -> None:
+        """Create the stream and run it on a daemon thread."""
+        self.stream = self.factory()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-stream", daemon=True)
+        self._thread.start()
+
+        if self.silence_timeout is not None:
+            self._watchdog = threading.Thread(target=self._watch, name=f"{self.name}-watchdog", daemon=True)
+            self._watchdog.start()
+
+    def heartbeat(self) -> None:
+        """Record that the stream delivered a message, called by the stream's handlers."""
+        self._last_message_ns = time.time_ns()
+
+    def stop(self) -> None:
+        """Stop the stream without reconnecting."""
+        self._stop_event.set()
+        if self.stream is not None:
+            try:
+                self.stream.stop()
+            except Exception as err:
+                logging.debug(f"StreamSupervisor: Error stopping {self.name} stream: {err}")
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._watchdog is not None:
+            self._watchdog.join(timeout)
+
+    def _run(self) -> None:
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            try:
+                self.stream.run()
+            except Exception as err:
+                logging.error(f"StreamSupervisor: {self.name} stream failed: {err}")
+
+            if self._stop_event.is_set():
+                return
+
+            disconnected_ns = time.time_ns()
+            if time.monotonic() - started >= self.stable_after:
+                attempt = 0
+
+            while True:
+                delay = self.backoff_delay(attempt)
+                attempt += 1
+                logging.warning(f"StreamSupervisor: {self.name} stream disconnected. Reconnecting in {delay:.1f} seconds")
+                if self._stop_event.wait(delay):
+                    return
+
+                try:
+                    self.stream = self.factory()
+                    break
+                except Exception as err:
+                    logging.error(f"StreamSupervisor: Failed to recreate {self.name} stream: {err}")
+
+            self.reconnects += 1
+            logging.info(f"StreamSupervisor: {self.name} stream reconnected ({self.reconnects} reconnects)")
+
+            # The backfill covers the silent interval the watchdog may have detected before the drop
+            gap_start_ns, self._gap_start_ns = self._gap_start_ns, None
+            self._backfill(min(disconnected_ns, gap_start_ns or disconnected_ns))
+
+    def _watch(self) -> None:
+        while not self._stop_event.wait(self.silence_timeout / 4):
+            last_message_ns = self._last_message_ns
+            if last_message_ns is None:
+                continue
+
+            gap_start_ns = self._gap_start_ns
+            if gap_start_ns is None:
+                if time.time_ns() - last_message_ns >= self.silence_timeout * 1_000_000_000:
+                    self._gap_start_ns = last_message_ns
+                    logging.warning(f"StreamSupervisor: No {self.name} messages for {self.silence_timeout} seconds")
+
+            elif last_message_ns > gap_start_ns:
+                # Messages resumed, typically after the SDK reconnected internally
+                self._gap_start_ns = None
+                self.gaps += 1
+                logging.info(f"StreamSupervisor: {self.name} stream resumed after a silent interval")
+                self._backfill(gap_start_ns)
+
+    def _backfill(self, disconnected_ns: int) -> None:
+        if self.on_reconnect is None:
+            return
+
+        try:
+            self.on_reconnect(disconnected_ns)
+        except Exception as err:
+            logging.error(f"StreamSupervisor: Backfill after {self.name} reconnect failed: {err}")
@@ -0,0 +1,289 @@
+import os
+import glob
+import shutil
+import logging
+import argparse
+import tempfile
+import itertools
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+from src.utilities.utils import quantity_buckets
+
+
+CONTRACT_MULTIPLIER = 100
+
+# Per-worker views on the memory-mapped tick store, set by _init_worker
+_worker_sessions = None
+
+
+def load_sessions(data_dir: str, pattern: str = "market_data_*.csv") -> Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]:
+    """Load every recorded market data file into contiguous arrays.
+
+    Args:
+        data_dir (str): Directory containing the saved market data files
+        pattern (str): Glob pattern of the market data files
+
+    Returns:
+        Tuple[List[str], np.ndarray, np.ndarray, np.ndarray]: Session names, bid prices,
+            ask prices and session offsets. Session i spans offsets[i]:offsets[i + 1].
+    """
+    paths = sorted(glob.glob(os.path.join(data_dir, pattern)))
+    if not paths:
+        raise ValueError(f"No market data files matching {pattern} found in {data_dir}")
+
+    names, bids, asks, offsets = [], [], [], [0]
+    for path in paths:
+        df = pd.read_csv(path, usecols=['bid_price', 'ask_price'])
+        if df.empty:
+            continue
+
+        names.append(os.path.basename(path))
+        bids.append(df['bid_price'].to_numpy(dtype=np.float64))
+        asks.append(df['ask_price'].to_numpy(dtype=np.float64))
+        offsets.append(offsets[-1] + len(df))
+
+    logging.info(f"Loaded {len(names)} sessions with {offsets[-1]} ticks from {data_dir}")
+    return names, np.concatenate(bids), np.concatenate(asks), np.array(offsets, dtype=np.int64)
+
+
+def parameter_grid(profit_target_sets: Sequence[Sequence[float]],
+                   sell_buckets: Sequence[int],
+                   close_strategies: Sequence[str]) -> List[Tuple[Tuple[float, ...], int, str]]:
+    """Build the parameter combinations to evaluate.
+
+    Combinations are skipped when the number of sell buckets is not one more than the
+    number of profit targets, the same consistency check the Configuration applies.
+
+    Args:
+        profit_target_sets (Sequence[Sequence[float]]): Candidate profit target ladders
+        sell_buckets (Sequence[int]): Candidate numbers of sell buckets
+        close_strategies (Sequence[str]): Candidate close strategies (risk_on/risk_off)
+
+    Returns:
+        List[Tuple[Tuple[float, ...], int, str]]: (profit_targets, sell_buckets, close_strategy) combinations
+    """
+    grid = []
+    for targets, buckets, strategy in itertools.product(profit_target_sets, sell_buckets, close_strategies):
+        if buckets != len(targets) + 1:
+            logging.debug(f"Skipping {targets} with {buckets} sell buckets")
+            continue
+        grid.append((tuple(targets), buckets, strategy))
+    return grid
+
+
+def simulate_session(bids: np.ndarray,
+                     entry_price: float,
+                     quantity: int,
+                     profit_targets: Sequence[float],
+                     sell_buckets: int,
+                     close_strategy: str) -> Tuple[float, int]:
+    """Replay the bucketed take-profit logic of the orchestrator over one session.
+
+    Buckets are worked in order. Each bucket is sold at the first bid at or above its
+    target after the previous bucket was sold. Unsold buckets and runners are marked at
+    the last bid of the session.
+
+    Args:
+        bids (np.ndarray): Bid prices of the session
+        entry_price (float): Average entry price of the position
+        quantity (int): Number of contracts held
+        profit_targets (Sequence[float]): Profit targets relative to the entry price
+        sell_buckets (int): Number of sell buckets including the runners
+        close_strategy (str): risk_on or risk_off bucket rounding
+
+    Returns:
+        Tuple[float, int]: PnL of the session and the number of buckets sold
+    """
+    buckets = quantity_buckets(quantity, sell_buckets, close_strategy)
+    levels = [entry_price * (1 + target) for target in profit_targets]
+
+    pnl = 0.0
+    sold = 0
+    remaining = quantity
+    position = 0
+    for bucket_qty, level in zip(buckets[:-1], levels):
+        hits = np.flatnonzero(bids[position:] >= level)
+        if not hits.size:
+            break
+
+        idx = position + int(hits[0])
+        pnl += bucket_qty * (bids[idx] - entry_price)
+        remaining -= bucket_qty
+        sold += 1
+        position = idx + 1
+
+    pnl += remaining * (bids[-1] - entry_price)
+    return pnl * CONTRACT_MULTIPLIER, sold
+
+
+def evaluate(combinations: Sequence[Tuple[Tuple[float, ...], int, str]],
+             sessions: Tuple[np.ndarray, np.ndarray, np.ndarray],
+             quantity: int) -> List[dict]:
+    """Evaluate parameter combinations over all sessions.
+
+    Args:
+        combinations (Sequence[Tuple[Tuple[float, ...], int, str]]): Combinations to evaluate
+        sessions (Tuple[np.ndarray, np.ndarray, np.ndarray]): Bid prices, ask prices and session offsets
+        quantity (int): Number of contracts held at the start of each session
+
+    Returns:
+        List[dict]: One result row per combination
+    """
+    bids, asks, offsets = sessions
+    results = []
+    for profit_targets, sell_buckets, close_strategy in combinations:
+        session_pnls = []
+        buckets_sold = 0
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            # The orchestrator enters with a market order, so the first ask is the entry
+            pnl, sold = simulate_session(bids[start:end], float(asks[start]), quantity,
+                                         profit_targets, sell_buckets, close_strategy)
+            session_pnls.append(pnl)
+            buckets_sold += sold
+
+        session_pnls = np.array(session_pnls)
+        results.append({
+            'profit_targets': ", ".join(str(target) for target in profit_targets),
+            'sell_buckets': sell_buckets,
+            'close_strategy': close_strategy,
+            'total_pnl': session_pnls.sum(),
+            'mean_pnl': session_pnls.mean(),
+            'worst_pnl': session_pnls.min(),
+            'win_rate': (session_pnls > 0).mean(),
+            'buckets_sold': buckets_sold,
+        })
+    return results
+
+
+def _init_worker(store_dir: str) -> None:
+    """Open the memory-mapped tick store once per worker process."""
+    global _worker_sessions
+    _worker_sessions = (
+        np.load(os.path.join(store_dir, "bids.npy"), mmap_mode='r'),
+        np.load(os.path.join(store_dir, "asks.npy"), mmap_mode='r'),
+        np.load(os.path.join(store_dir, "offsets.npy")),
+    )
+
+
+def _evaluate_chunk(combinations, quantity: int) -> List[dict]:
+    return evaluate(combinations, _worker_sessions, quantity)
+
+
+def run_sweep(data_dir: str,
+              grid: Sequence[Tuple[Tuple[float, ...], int, str]],
+              quantity: int,
+              workers: Optional[int] = None,
+              chunk_size: int = 50) -> pd.DataFrame:
+    """Evaluate a parameter grid over all recorded sessions on a process pool.
+
+    The tick files are parsed once and written to a temporary memory-mapped store that
+    every worker maps read-only, so the data is shared instead of copied per task.
+
+    Args:
+        data_dir (str): Directory containing the saved market data files
+        grid (Sequence[Tuple[Tuple[float, ...], int, str]]): Combinations from parameter_grid
+        quantity (int): Number of contracts held at the start of each session
+        workers (Optional[int]): Number of worker processes, defaults to the CPU count
+        chunk_size (int): Number of combinations per task
+
+    Returns:
+        pd.DataFrame: Results ranked by total PnL
+    """
+    names, bids, asks, offsets = load_sessions(data_dir)
+
+    store_dir = tempfile.mkdtemp(prefix="parameter_sweep_")
+    try:
+        np.save(os.path.join(store_dir, "bids.npy"), bids)
+        np.save(os.path.join(store_dir, "asks.npy"), asks)
+        np.save(os.path.join(store_dir, "offsets.npy"), offsets)
+        del bids, asks
+
+        chunks = [grid[idx:idx + chunk_size] for idx in range(0, len(grid), chunk_size)]
+        logging.info(f"Evaluating {len(grid)} combinations over {len(names)} sessions in {len(chunks)} tasks")
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(store_dir,)) as executor:
+            for chunk_results in executor.map(_evaluate_chunk, chunks, itertools.repeat(quantity)):
+                results.extend(chunk_results)
+
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+    df = pd.DataFrame(results)
+    if df.empty:
+        return df
+
+    df.sort_values('total_pnl', ascending=False, inplace=True, ignore_index=True)
+    df.index.name = 'rank'
+    return df
+
+
+def parse_ladders(text: str) -> List[List[float]]:
+    """Parse profit target ladders separated by semicolons, targets separated by commas.
+
+    Args:
+        text (str): Ladders, e.g. "-0.1,-0.2,0.1; 0.1,0.2,0.3"
+
+    Returns:
+        List[List[float]]: One list of profit targets per ladder
+    """
+    try:
+        return [[float(target) for target in ladder.split(',')] for ladder in text.split(';') if ladder.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid profit target ladders: {text}")
+
+
+def read_ladder_file(path: str) -> List[List[float]]:
+    """Read profit target ladders from a file with one comma-separated ladder per line.
+
+    Args:
+        path (str): Path to the ladder file, blank lines and lines starting with # are skipped
+
+    Returns:
+        List[List[float]]: One list of profit targets per ladder
+    """
+    try:
+        with open(path) as f:
+            lines = [line.split('#')[0].strip() for line in f]
+    except OSError as e:
+        raise argparse.ArgumentTypeError(f"Cannot read ladder file {path}: {e}")
+    return parse_ladders(';'.join(line for line in lines if line))
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sweep take-profit parameters over recorded market data.")
+    parser.add_argument('--data-dir', default='output', help="Directory with market_data_*.csv files")
+    parser.add_argument('--profit-targets', type=parse_ladders, action='extend', default=[],
+                        help='Profit target ladders separated by semicolons. Ladders starting with a negative '
+                             'target must be passed with "=", e.g. --profit-targets="-0.1,-0.2,0.1;0.1,0.2,0.3"')
+    parser.add_argument('--ladder-file', type=read_ladder_file, action='extend', default=[],
+                        help="File with one comma-separated profit target ladder per line")
+    parser.add_argument('--sell-buckets', nargs='+', type=int, required=True)
+    parser.add_argument('--close-strategies', nargs='+', default=['risk_on', 'risk_off'])
+    parser.add_argument('--quantity', type=int, required=True, help="Contracts held at the start of each session")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    profit_target_sets = args.profit_targets + args.ladder_file
+    if not profit_target_sets:
+        parser.error("one of --profit-targets or --ladder-file is required")
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    grid = parameter_grid(profit_target_sets, args.sell_buckets, args.close_strategies)
+    results = run_sweep(args.data_dir, grid, args.quantity, args.workers)
+
+    output_dir = os.path.join(os.getcwd(), "output")
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, f"parameter_sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    results.to_csv(filepath)
+
+    logging.info(f"Results saved to {filepath}")
+    print(results.head(20).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import os
+import time
+import asyncio
+import logging
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Union
+from src.utilities.timestamps import to_datetime_index
+
+
+# Sample OPRA participant codes
+OPTION_EXCHANGES = np.array(["A", "B", "C", "D", "E", "H", "I", "J", "M", "N", "O", "P", "Q", "S", "T", "W", "X", "Z"])
+QUOTE_CONDITIONS = np.array([" ", " ", " ", "A", "F"])
+TRADE_CONDITIONS = np.array(["I", "I", "I", "J", "S", "a"])
+
+
+class SyntheticQuote(NamedTuple):
+    """Option quote with the attributes of alpaca.data.models.Quote read by MktDataState"""
+    symbol: str
+    timestamp: datetime
+    bid_price: float
+    bid_size: float
+    bid_exchange: str
+    ask_price: float
+    ask_size: float
+    ask_exchange: str
+    conditions: List[str]
+    tape: Optional[str]
+
+
+class SyntheticTrade(NamedTuple):
+    """Option trade with the attributes of alpaca.data.models.Trade"""
+    symbol: str
+    timestamp: datetime
+    exchange: str
+    price: float
+    size: float
+    id: int
+    conditions: List[str]
+    tape: Optional[str]
+
+
+class SyntheticOptionFeed:
+    """Random option quote and trade streams for load and soak tests.
+
+    Events arrive as a Poisson process at rate per second per symbol. Each second a
+    burst starts with burst_probability, multiplying the rate by burst_multiplier for
+    burst_seconds, like the bursts around the open and on expiry days. Mid prices
+    follow a geometric random walk, and a fraction trade_ratio of the events are
+    trades printed at the bid or the ask.
+    """
+
+    def __init__(self,
+                 symbols: Union[int, Sequence[str]] = 1,
+                 start: Optional[pd.Timestamp] = None,
+                 rate: float = 10.0,
+                 volatility: float = 0.002,
+                 initial_price: float = 2.0,
+                 spread: float = 0.05,
+                 trade_ratio: float = 0.05,
+                 burst_probability: float = 0.01,
+                 burst_multiplier: float = 10.0,
+                 burst_seconds: int = 5,
+                 seed: Optional[int] = None) -> None:
+        """Initialize the feed.
+
+        Args:
+            symbols (Union[int, Sequence[str]]): Option symbols, or the number of symbols to make up with
+                weekly expiries from the start date
+            start (Optional[pd.Timestamp]): Timestamp of the first event, defaults to today's 09:30 New York open
+            rate (float): Events per second per symbol outside bursts
+            volatility (float): Standard deviation of the relative mid price change per second
+            initial_price (float): Initial mid price
+            spread (float): Bid-ask spread
+            trade_ratio (float): Fraction of events that are trades
+            burst_probability (float): Probability per second that a burst starts
+            burst_multiplier (float): Rate multiplier during bursts
+            burst_seconds (int): Duration of a burst in seconds
+            seed (Optional[int]): Random seed
+        """
+        if start is None:
+            start = pd.Timestamp.now(tz="America/New_York").normalize() + pd.Timedelta(hours=9, minutes=30)
+        self.start_ns = start.value
+
+        if isinstance(symbols, int):
+            # Weekly expiries from the session date on
+            symbols = [f"SPY{start.date() + timedelta(weeks=idx):%y%m%d}C00500000" for idx in range(symbols)]
+        self.symbols = np.array(symbols)
+
+        self.rate = rate
+        self.volatility = volatility
+        self.spread = spread
+        self.trade_ratio = trade_ratio
+        self.burst_probability = burst_probability
+        self.burst_multiplier = burst_multiplier
+        self.burst_seconds = burst_seconds
+
+        self._rng = np.random.default_rng(seed)
+        self._mids = np.full(self.symbols.size, initial_price)
+        self._burst_left = 0
+        self._trade_id = 0
+
+    def second(self, idx: int) -> List[Union[SyntheticQuote, SyntheticTrade]]:
+        """Generate the events of one second of the session, in timestamp order.
+
+        Args:
+            idx (int): Seconds since the start
+
+        Returns:
+            List[Union[SyntheticQuote, SyntheticTrade]]: Quotes and trades of that second
+        """
+        rng = self._rng
+        if self._burst_left == 0 and rng.random() < self.burst_probability:
+            self._burst_left = self.burst_seconds
+        multiplier = self.burst_multiplier if self._burst_left else 1.0
+        self._burst_left = max(self._burst_left - 1, 0)
+
+        count = rng.poisson(self.rate * multiplier * self.symbols.size)
+        if not count:
+            return []
+
+        offsets = np.sort(rng.integers(0, 1_000_000_000, count))
+        timestamps = to_datetime_index(self.start_ns + idx * 1_000_000_000 + offsets).to_pydatetime()
+        symbol_idx = rng.integers(0, self.symbols.size, count)
+
+        # Each event moves the mid of its symbol, scaled so the per-second volatility holds
+        step = self.volatility / np.sqrt(self.rate * multiplier)
+        returns = rng.normal(0, step, count)
+        mids = np.empty(count)
+        for sym in np.unique(symbol_idx):
+            mask = symbol_idx == sym
+            path = self._mids[sym] * np.exp(np.cumsum(returns[mask]))
+            mids[mask] = path
+            self._mids[sym] = path[-1]
+
+        half_spread = self.spread / 2
+        bids = np.maximum(np.round(mids - half_spread, 2), 0.01)
+        asks = np.round(np.maximum(mids + half_spread, bids + 0.01), 2)
+        bid_sizes = rng.integers(1, 100, count)
+        ask_sizes = rng.integers(1, 100, count)
+        bid_exchanges = rng.choice(OPTION_EXCHANGES, count)
+        ask_exchanges = rng.choice(OPTION_EXCHANGES, count)
+        is_trade = rng.random(count) < self.trade_ratio
+        at_ask = rng.random(count) < 0.5
+        quote_conditions = rng.choice(QUOTE_CONDITIONS, count)
+        trade_conditions = rng.choice(TRADE_CONDITIONS, count)
+
+        events = []
+        for i in range(count):
+            symbol = self.symbols[symbol_idx[i]]
+            if is_trade[i]:
+                self._trade_id += 1
+                events.append(SyntheticTrade(
+                    symbol, timestamps[i], ask_exchanges[i] if at_ask[i] else bid_exchanges[i],
+                    float(asks[i] if at_ask[i] else bids[i]), float(rng.integers(1, 20)),
+                    self._trade_id, [trade_conditions[i]], None))
+            else:
+                events.append(SyntheticQuote(
+                    symbol, timestamps[i], float(bids[i]), float(bid_sizes[i]), bid_exchanges[i],
+                    float(asks[i]), float(ask_sizes[i]), ask_exchanges[i], [quote_conditions[i]], None))
+        return events
+
+    def seconds(self, duration: int) -> Iterator[List[Union[SyntheticQuote, SyntheticTrade]]]:
+        """Generate the events of duration seconds, one list per second."""
+        for idx in range(duration):
+            yield self.second(idx)
+
+
+async def publish(events, mkt_data_state, portfolio_manager=None) -> None:
+    """Feed events to the websocket handlers, quotes to MktDataState and trades to PortfolioManager."""
+    for event in events:
+        if isinstance(event, SyntheticQuote):
+            await mkt_data_state.update_quote_data(event)
+        elif portfolio_manager is not None:
+            await portfolio_manager.update_trade_data(event)
+
+
+def run_soak(mkt_data_state,
+             feed: SyntheticOptionFeed,
+             duration: int,
+             portfolio_manager=None,
+             batch_seconds: int = 10,
+             sample_every: int = 60) -> pd.DataFrame:
+    """Replay a session through the websocket handlers and update_state as fast as possible.
+
+    The events of every batch_seconds seconds are published and then ingested with one
+    update_state call, as the trading loop does when it falls behind the feed. Memory
+    is sampled with tracemalloc throughout.
+
+    Args:
+        mkt_data_state: MktDataState to feed
+        feed (SyntheticOptionFeed): Event generator
+        duration (int): Session length in seconds, e.g. 23400 for 6.5 hours
+        portfolio_manager: Optional PortfolioManager receiving the trades
+        batch_seconds (int): Session seconds of events per update_state call
+        sample_every (int): Session seconds between memory samples
+
+    Returns:
+        pd.DataFrame: One row per sample with the session time, ticks stored, wall time and memory in MB
+    """
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+
+    loop = asyncio.new_event_loop()
+    samples = []
+    quotes = 0
+    pending = 0
+    wall_start = time.perf_counter()
+    try:
+        for idx, events in enumerate(feed.seconds(duration)):
+            loop.run_until_complete(publish(events, mkt_data_state, portfolio_manager))
+            pending += sum(isinstance(event, SyntheticQuote) for event in events)
+
+            if pending and ((idx + 1) % batch_seconds == 0 or idx + 1 == duration):
+                mkt_data_state.update_state()
+                quotes += pending
+                pending = 0
+
+            if (idx + 1) % sample_every == 0 or idx + 1 == duration:
+                current, peak = tracemalloc.get_traced_memory()
+                samples.append({
+                    'session_seconds': idx + 1,
+                    'quotes': quotes,
+                    'ticks_stored': len(mkt_data_state.market_data),
+                    'wall_seconds': time.perf_counter() - wall_start,
+                    'memory_mb': current / 1e6,
+                    'peak_memory_mb': peak / 1e6,
+                })
+                logging.debug(f"Soak: {samples[-1]}")
+    finally:
+        loop.close()
+        if started_tracing:
+            tracemalloc.stop()
+
+    return pd.DataFrame(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Soak test MktDataState with a synthetic option feed.")
+    parser.add_argument('--config', default='run.cfg')
+    parser.add_argument('--hours', type=float, default=6.5, help="Session length")
+    parser.add_argument('--rate', type=float, default=25.0, help="Quotes and trades per second per symbol")
+    parser.add_argument('--symbols', type=int, default=1)
+    parser.add_argument('--volatility', type=float, default=0.002)
+    parser.add_argument('--burst-probability', type=float, default=0.01)
+    parser.add_argument('--burst-multiplier', type=float, default=10.0)
+    parser.add_argument('--batch-seconds', type=int, default=10, help="Session seconds per update_state call")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    from src.configuration import Configuration
+    from src.mkt_data.mkt_data_state import MktDataState
+
+    config = Configuration(args.config)
+    config.save_market_data = False
+    feed = SyntheticOptionFeed(args.symbols, rate=args.rate, volatility=args.volatility,
+                               burst_probability=args.burst_probability,
+                               burst_multiplier=args.burst_multiplier, seed=args.seed)
+    results = run_soak(MktDataState(config), feed, int(args.hours * 3600),
+                       batch_seconds=args.batch_seconds)
+
+    output_dir = os.path.join(os.getcwd(), "output")
+    os.makedirs(output_dir, exist_ok=True)
+    filepath = os.path.join(output_dir, f"soak_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    results.to_csv(filepath, index=False)
+
+    logging.info(f"Results saved to {filepath}")
+    print(results.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,11 @@ import logging
 from datetime import datetime
 import pytz
 from typing import List
+from src.utilities.profiler import PROFILE_MODES
+from src.utilities.enums import OrderType
+
+
+EXIT_STRATEGIES = ('none', 'trailing_stop', 'volatility_stop', 'time_decay')
 
 
 class Configuration:
@@ -14,6 +19,19 @@ class Configuration:
     It provides access to various trading parameters and performs sanity checks on the configuration.
     """
 
+    # Settings a running engine picks up on reload, the others require a restart
+    RELOADABLE_KEYS = (
+        'log_level',
+        'eod_exit_time',
+        'pre_open_warmup',
+        'profit_targets',
+        'stale_quote_threshold',
+        'expiry_sell_cutoff',
+        'timeout',
+        'snapshot_interval',
+        'positions', # Per-position overrides only, see requires_restart()
+    )
+
     def __init__(self, path_to_config: str) -> None:
         """
         Initialize the Configuration object with settings from a config file.
@@ -24,13 +42,14 @@ class Configuration:
         Raises:
             ValueError: If the configuration is invalid or sanity checks fail.
         """
+        self.path = path_to_config
         self.config = configparser.ConfigParser()
         self.config.read(path_to_config)
 
         # Run section
         self.log_level = self._configure_log(self.config.get('Run', 'log_level'))
-        logger = logging.getLogger()
-        logger.setLevel(self.log_level)
+        self.watch_config = self.config.getboolean('Run', 'watch_config', fallback=False)
+        self.watch_interval = float(self.config.get('Run', 'watch_interval', fallback='1'))
 
         # Trading section
         self.trading_start_time = self.config.get('Trading', 'trading_start_time')
@@ -42,23 +61,145 @@ class Configuration:
 
         self.sell_buckets = int(self.config.get('Trading', 'sell_buckets'))
         self.paper_trading = self.config.getboolean('Trading', 'paper_trading')
-
-        # Positions section
-        self.instrument_id = self.config.get('Positions', 'instrument_id')
-        self.starting_position_quantity = int(self.config.get('Positions', 'starting_position_quantity'))
+        self.pre_open_warmup = int(self.config.get('Trading', 'pre_open_warmup', fallback='5'))
+        self.batch_orders = self.config.getboolean('Trading', 'batch_orders', fallback=False)
+        self.exit_order_type = self._configure_order_type(self.config.get('Trading', 'exit_order_type', fallback='market'))
 
         # Market Data section
         self.save_market_data = self.config.getboolean('Market_Data', 'save_market_data')
         self.store_all_ticks = self.config.getboolean('Market_Data', 'store_all_ticks')
+        self.subscribe_underlying = self.config.getboolean('Market_Data', 'subscribe_underlying', fallback=False)
+        self.stale_quote_threshold = float(self.config.get('Market_Data', 'stale_quote_threshold', fallback='30'))
+        self.warm_start = self.config.getboolean('Market_Data', 'warm_start', fallback=False)
+        self.bar_intervals = [interval.strip() for interval in self.config.get('Market_Data', 'bar_intervals', fallback='').split(',') if interval.strip()]
+        self.max_bars = int(self.config.get('Market_Data', 'max_bars', fallback='0'))
+        self.shared_feed = self.config.get('Market_Data', 'shared_feed', fallback='').strip()
+        self.shared_feed_capacity = int(self.config.get('Market_Data', 'shared_feed_capacity', fallback='262144'))
 
         # Risk Management section
         self.expiry_sell_cutoff = int(self.config.get('Risk_Management', 'expiry_sell_cutoff'))
+        self.exit_strategy = self.config.get('Risk_Management', 'exit_strategy', fallback='none').strip()
+        self.exit_strategy_args = {
+            key: self._optional_float('Risk_Management', key) for key in (
+                'trail_pct', 'trail_amount', 'trail_activation',
+                'volatility_window', 'volatility_multiplier',
+                'decay_initial_target', 'decay_final_target', 'decay_days')}
+
+        # Positions section, with the trading and risk settings above as defaults. The engine trades
+        # the first position, so its overrides replace the defaults
+        self.positions = self._load_positions()
+        self.instrument_id = self.positions.symbols[0]
+        self.starting_position_quantity = int(self.positions.quantity[0])
+        for key, value in self.positions.position_settings(0).items():
+            setattr(self, key, value)
 
         # API section
         self.timeout = int(self.config.get('API', 'timeout'))
+        self.reconnect_max_backoff = float(self.config.get('API', 'reconnect_max_backoff', fallback='60'))
+        self.reconnect_silence_timeout = float(self.config.get('API', 'reconnect_silence_timeout', fallback='30'))
+
+        # Recovery section
+        self.enable_recovery = self.config.getboolean('Recovery', 'enable_recovery', fallback=False)
+        self.snapshot_interval = int(self.config.get('Recovery', 'snapshot_interval', fallback='60'))
+        self.snapshot_max_ticks = int(self.config.get('Recovery', 'snapshot_max_ticks', fallback='10000'))
+
+        # Reconciliation section
+        self.enable_reconciliation = self.config.getboolean('Reconciliation', 'enable_reconciliation', fallback=False)
+        self.reconcile_interval = float(self.config.get('Reconciliation', 'reconcile_interval', fallback='5'))
+        self.full_sweep_interval = float(self.config.get('Reconciliation', 'full_sweep_interval', fallback='60'))
+
+        # Profiling section
+        self.enable_profiling = self.config.getboolean('Profiling', 'enable_profiling', fallback=False)
+        self.profile_mode = self.config.get('Profiling', 'profile_mode', fallback='sample')
+        self.profile_duration = float(self.config.get('Profiling', 'profile_duration', fallback='30'))
+
+        # Metrics section
+        self.enable_metrics = self.config.getboolean('Metrics', 'enable_metrics', fallback=False)
+        self.metrics_port = int(self.config.get('Metrics', 'metrics_port', fallback='9108'))
 
         self._perform_sanity_checks()
 
+        logger = logging.getLogger()
+        logger.setLevel(self.log_level)
+
+    def diff(self, other: "Configuration") -> dict:
+        """
+        Compare the settings of two configurations.
+
+        Args:
+            other (Configuration): Configuration to compare against
+
+        Returns:
+            dict: Changed settings, mapping the attribute name to (self value, other value)
+        """
+        return {key: (value, getattr(other, key)) for key, value in vars(self).items()
+                if key not in ('config', 'path') and getattr(other, key) != value}
+
+    def requires_restart(self, changes: dict) -> List[str]:
+        """
+        List the changed settings a running engine cannot pick up.
+
+        Args:
+            changes (dict): Changes returned by diff()
+
+        Returns:
+            List[str]: Settings outside RELOADABLE_KEYS, and positions if positions or quantities changed
+        """
+        keys = [key for key in changes if key not in self.RELOADABLE_KEYS]
+        if 'positions' in changes and not self.positions.same_positions(changes['positions'][1]):
+            keys.append('positions')
+        return sorted(keys)
+
+    def _load_positions(self):
+        """
+        Compile the configured positions into a PositionBook.
+
+        The book holds the position of instrument_id in [Positions] if set, then the
+        [Position <symbol>] sections, then the rows of positions_file, a CSV path relative
+        to the configuration file.
+
+        Returns:
+            PositionBook: Validated positions
+
+        Raises:
+            ValueError: Listing every invalid position
+        """
+        # Imported here so the configuration module itself stays cheap to import
+        from src.portfolio.position_book import PositionBook, PositionSpec, position_sections, read_positions_file
+
+        specs = []
+        instrument_id = self.config.get('Positions', 'instrument_id', fallback='').strip()
+        if instrument_id:
+            quantity = self.config.get('Positions', 'starting_position_quantity', fallback=None)
+            specs.append(PositionSpec('[Positions]', instrument_id, {'quantity': quantity}))
+
+        specs.extend(position_sections(self.config))
+
+        positions_file = self.config.get('Positions', 'positions_file', fallback='').strip()
+        if positions_file:
+            specs.extend(read_positions_file(os.path.join(os.path.dirname(os.path.abspath(self.path)), positions_file)))
+
+        return PositionBook.compile(specs, {
+            'profit_targets': self.profit_targets,
+            'sell_buckets': self.sell_buckets,
+            'close_strategy': self.close_strategy,
+            'expiry_sell_cutoff': self.expiry_sell_cutoff,
+        })
+
+    def _optional_float(self, section: str, key: str):
+        """
+        Read an optional number.
+
+        Args:
+            section (str): Section of the setting
+            key (str): Name of the setting
+
+        Returns:
+            Optional[float]: The value, None if the setting is missing or empty
+        """
+        value = self.config.get(section, key, fallback='').strip()
+        return float(value) if value else None
+
     def _configure_log(self, log_level: str) -> int:
         """
         Convert string log level to logging module level.
@@ -83,6 +224,24 @@ class Configuration:
         else:
             raise ValueError("Log level not recognized")
         
+    def _configure_order_type(self, order_type: str) -> OrderType:
+        """
+        Convert a string order type to an OrderType.
+
+        Args:
+            order_type (str): Order type, market or limit
+
+        Returns:
+            OrderType: Corresponding order type
+
+        Raises:
+            ValueError: If order_type is not recognized
+        """
+        try:
+            return OrderType(order_type.strip().upper())
+        except ValueError:
+            raise ValueError(f"Order type must be one of {[member.value.lower() for member in OrderType]}, got {order_type}")
+
     def _confirm_paper_trading(self) -> bool:
         """
         Verify that paper trading is enabled.
@@ -107,6 +266,10 @@ class Configuration:
         """
         self._confirm_sell_buckets()
         self._confirm_paper_trading()
+        self._confirm_trading_hours()
+        self._confirm_timezone()
+        self._confirm_profile_mode()
+        self._confirm_exit_strategy()
 
     def _confirm_sell_buckets(self) -> None:
         """
@@ -119,8 +282,76 @@ class Configuration:
             msg = f"Sell buckets must be equal to the number of profit targets - 1."
             msg += f"The last bucket is used for runners."
             raise ValueError(msg)
-        
-        
 
-        
-    
+    def _confirm_trading_hours(self) -> None:
+        """
+        Verify that the trading hours are in 24h HHMM format.
+
+        Raises:
+            ValueError: If a trading time cannot be parsed
+        """
+        for key in ('trading_start_time', 'trading_end_time', 'eod_exit_time'):
+            value = getattr(self, key)
+            try:
+                datetime.strptime(value, "%H%M")
+            except ValueError:
+                raise ValueError(f"{key} must be in 24h HHMM format, got {value}")
+
+    def _confirm_timezone(self) -> None:
+        """
+        Verify that the timezone is known.
+
+        Raises:
+            ValueError: If the timezone is not in the tz database
+        """
+        try:
+            pytz.timezone(self.timezone)
+        except pytz.UnknownTimeZoneError:
+            raise ValueError(f"Unknown timezone {self.timezone}")
+
+    def _confirm_profile_mode(self) -> None:
+        """
+        Verify that the profile mode is supported.
+
+        Raises:
+            ValueError: If profile_mode is not one of PROFILE_MODES
+        """
+        if self.profile_mode not in PROFILE_MODES:
+            raise ValueError(f"profile_mode must be one of {PROFILE_MODES}, got {self.profile_mode}")
+
+    def _confirm_exit_strategy(self) -> None:
+        """
+        Verify that the exit strategy is supported and has the settings it needs.
+
+        Raises:
+            ValueError: If exit_strategy is unknown, used with limit exit orders, or misses settings
+        """
+        if self.exit_strategy not in EXIT_STRATEGIES:
+            raise ValueError(f"exit_strategy must be one of {EXIT_STRATEGIES}, got {self.exit_strategy}")
+        if self.exit_strategy == 'none':
+            return
+
+        if self.exit_order_type == OrderType.LIMIT:
+            raise ValueError("exit_strategy requires exit_order_type = market, the limit ladder does not evaluate quotes")
+
+        args = self.exit_strategy_args
+        if self.exit_strategy == 'trailing_stop':
+            if (args['trail_pct'] is None) == (args['trail_amount'] is None):
+                raise ValueError("trailing_stop requires exactly one of trail_pct and trail_amount")
+            if args['trail_pct'] is not None and not 0 < args['trail_pct'] < 1:
+                raise ValueError(f"trail_pct must be between 0 and 1, got {args['trail_pct']}")
+            if args['trail_amount'] is not None and args['trail_amount'] <= 0:
+                raise ValueError(f"trail_amount must be greater than 0, got {args['trail_amount']}")
+
+        required = {
+            'trailing_stop': (),
+            'volatility_stop': ('volatility_window', 'volatility_multiplier'),
+            'time_decay': ('decay_initial_target', 'decay_final_target', 'decay_days'),
+        }[self.exit_strategy]
+        for key in required:
+            if args[key] is None:
+                raise ValueError(f"{self.exit_strategy} requires {key}")
+
+        for key in ('volatility_window', 'volatility_multiplier', 'decay_days'):
+            if key in required and args[key] <= 0:
+                raise ValueError(f"{key} must be greater than 0, got {args[key]}")
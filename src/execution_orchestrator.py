@@ -5,18 +5,35 @@ import time
 from datetime import datetime
 import logging
 from src.configuration import Configuration
-from src.utilities.enums import Signal
+from src.utilities.enums import Signal, OrderType
 import pandas as pd
 import os
 import shutil
 from src.api.alpaca_api import AlpacaAPI    
 from src.trading_session_manager import TradingSessionManager
+from src.utilities.session_scheduler import SessionScheduler
 from src.portfolio.portfolio_manager import PortfolioManager
+from src.portfolio.position_reconciler import PositionReconciler
+from src.portfolio.limit_ladder import LimitLadder
 from src.mkt_data.mkt_data_state import MktDataState
+from src.mkt_data.warm_start_loader import WarmStartLoader
+from src.mkt_data.shared_quote_ring import SharedQuoteReader
+from src.pricing.black_scholes import parse_option_symbol
 from src.strategys.take_profit_strategy import TakeProfitStrategy
+from src.strategys.stateful_exit_strategy import StatefulExitStrategy
+from src.strategys.exit_strategy_factory import build_exit_strategy
+from src.recovery.recovery_store import RecoveryStore
+from src.utilities.profiler import Profiler
+from src.utilities.config_watcher import ConfigWatcher
+from src.utilities.metrics import REGISTRY, MetricsServer
+from src.utilities.timestamps import now_ns, to_ns_array, to_timestamp
 from typing import List, Optional
 
 
+LOOP_ITERATIONS = REGISTRY.counter("engine_loop_iterations_total", "Iterations of the trading loop")
+LOOP_SECONDS = REGISTRY.histogram("engine_loop_iteration_seconds", "Duration of a trading loop iteration, including the wait for ticks")
+
+
 class ExecutionOrchestrator:
     """Orchestrates the execution of trading strategies and position management.
     
@@ -40,10 +57,36 @@ class ExecutionOrchestrator:
             cfg.timezone,
             cfg.trading_start_time,
             cfg.trading_end_time)
+        self.scheduler = SessionScheduler(self.trading_session_manager.stop_event)
         self.portfolio_manager = PortfolioManager(cfg, self.api)
         self.mkt_data_state = MktDataState(cfg)
 
         self.expiry_day = False
+        self.profit_target_levels = None
+        self._entry_price = None
+
+        self.recovery_store = RecoveryStore(os.path.join(os.getcwd(), "output")) if cfg.enable_recovery else None
+        self._recovered = False
+        self._entry_order_id = None
+        self._last_snapshot = 0.0
+
+        self.position_reconciler = PositionReconciler(
+            self.api,
+            cfg.reconcile_interval,
+            full_sweep_interval=cfg.full_sweep_interval) if cfg.enable_reconciliation else None
+
+        output_dir = os.path.join(os.getcwd(), "output")
+        self.profiler = Profiler(
+            output_dir,
+            cfg.profile_mode,
+            cfg.profile_duration,
+            control_file=os.path.join(output_dir, "profile.request")) if cfg.enable_profiling else None
+        self.metrics_server = MetricsServer(REGISTRY, cfg.metrics_port) if cfg.enable_metrics else None
+        self.shared_feed_reader = SharedQuoteReader(
+            cfg.shared_feed,
+            self.mkt_data_state.update_quote_records,
+            [cfg.instrument_id]) if cfg.shared_feed else None
+        self.config_watcher = ConfigWatcher(cfg, cfg.watch_interval) if cfg.watch_config else None
 
     def start(self) -> None:
         """Start the trading system and initialize all components.
@@ -62,20 +105,55 @@ class ExecutionOrchestrator:
             self._save_config()
             logging.info("Starting trading system...")
 
+            if self.profiler is not None:
+                self.profiler.install()
+
+            if self.metrics_server is not None:
+                self.metrics_server.start()
+
+            if self.config_watcher is not None:
+                self.config_watcher.start()
+
+            if len(self.config.positions) > 1:
+                logging.warning(f"{len(self.config.positions)} positions configured. Only {self.config.instrument_id} is traded")
+
             if self.config.paper_trading:
                 logging.info("Paper trading mode enabled")
             else:
                 logging.info("Live trading mode enabled")
 
             self.portfolio_manager.populate_from_csv()
+            self._recover()
 
             self.api.connect(self.config)
+            if self._recovered:
+                self.portfolio_manager.refresh_order_statuses()
+
+            if self.config.warm_start:
+                self._warm_start()
+
+            self._take_snapshot()
+
+            if self.position_reconciler is not None:
+                self.portfolio_manager.reconciler = self.position_reconciler
+                self.position_reconciler.start()
+
             self.api.subscribe_trade_updates(self.portfolio_manager.update_order_status)
-            self.api.subscribe_option_md_updates(
-                self.mkt_data_state.update_quote_data, 
-                self.portfolio_manager.update_trade_data, 
-                [self.config.instrument_id]
-                )
+            if self.shared_feed_reader is not None:
+                # Option quotes come from the feed handler's ring, only the underlyings are streamed here
+                self.shared_feed_reader.start()
+                if self.config.subscribe_underlying:
+                    self.api.subscribe_underlying_md_updates(
+                        self.mkt_data_state.update_underlying_quote_data,
+                        [parse_option_symbol(self.config.instrument_id).underlying])
+            else:
+                self.api.subscribe_option_md_updates(
+                    self.mkt_data_state.update_quote_data, 
+                    self.portfolio_manager.update_trade_data, 
+                    [self.config.instrument_id],
+                    self.mkt_data_state.update_underlying_quote_data if self.config.subscribe_underlying else None,
+                    self.mkt_data_state.backfill_quote_data
+                    )
 
             time.sleep(3)   #Seems important to wait for the websocket to connect! 
                             #Unclear why this is needed over the pause in the api.connect()
@@ -97,6 +175,24 @@ class ExecutionOrchestrator:
             logging.error(f"Unexpected error within trading system: {str(e)}")
 
         finally:
+            if self.position_reconciler is not None:
+                self.position_reconciler.stop()
+
+            if self.profiler is not None:
+                self.profiler.uninstall()
+
+            if self.metrics_server is not None:
+                self.metrics_server.stop()
+
+            if self.shared_feed_reader is not None:
+                self.shared_feed_reader.stop()
+
+            if self.config_watcher is not None:
+                self.config_watcher.stop()
+
+            if self.portfolio_manager.batcher is not None:
+                self.portfolio_manager.batcher.close()
+
             logging.info("Trading system shut down")
             
     def _trading_session_loop(self) -> None:
@@ -117,23 +213,58 @@ class ExecutionOrchestrator:
         if not check_options_level(self.api, 3):
             raise ValueError("Options trading level is too low. Requier level 3Exiting...")
 
-        while True:
+        while not self.trading_session_manager.stop_event.is_set():
             logging.info(f"Starting trading loop")
+            self._reload_config()
 
             now = pd.Timestamp.now(tz=self.config.timezone)
             if now.date() > previous_day:
                 Logger(now.date()) # Create new log file for new day to avoid excessively large files
                 previous_day = now.date()
 
-            if self.trading_session_manager.is_trading_day(now) and self.trading_session_manager.is_trading_hours(now):
+            if self.trading_session_manager.is_open(now):
 
                 if self._trading_execution():
                     break
 
-            else:
+            elif not self._wait_for_next_session_event(now):
+                logging.info("Session scheduler cancelled. Leaving trading loop")
+                break
+
+    def _wait_for_next_session_event(self, now: pd.Timestamp) -> bool:
+        """Sleep until the next session event (warmup, open, EOD exit, close or day rollover).
+        
+        Args:
+            now (pd.Timestamp): Current timestamp
+            
+        Returns:
+            bool: False if the wait was cancelled for shutdown, True otherwise
+        """
+        self.scheduler.clear()
+        self.trading_session_manager.schedule_session_events(
+            self.scheduler, 
+            now, 
+            self.config.eod_exit_time, 
+            self.config.pre_open_warmup)
+
+        deadline_ns, event = self.scheduler.peek()
+        wake_up = pd.Timestamp(deadline_ns, tz='UTC').tz_convert(self.config.timezone)
+        logging.warning(f"Outside trading schedule. Sleeping until {event} at {wake_up}")
+
+        event = self.scheduler.wait_next()
+        if event is None:
+            return False
+
+        logging.info(f"Session event: {event}")
+        return True
 
-                logging.warning("Outside trading schedule. Waiting...")
-                time.sleep(60)
+    def stop(self) -> None:
+        """Request a shutdown, interrupting any pending session wait or the trading loop.
+
+        Called from the SIGTERM and SIGINT handlers, it only sets the stop event.
+        """
+        logging.info("Stop requested")
+        self.scheduler.cancel()
 
     def _trading_execution(self) -> bool:
         """Execute the core trading logic.
@@ -152,19 +283,36 @@ class ExecutionOrchestrator:
         Returns:
             bool: True once all positions are closed
         """
-        ## Place sample order & wait for response
-        order = self.api.place_market_order(
-            self.config.instrument_id, 
-            self.config.starting_position_quantity, 
-            Signal.BUY)
-        self.portfolio_manager.wait_for_order_response(order.id, self.config.timeout)
+        ## Place sample order & wait for response. A recovered session already holds the position.
+        if not self._recovered:
+            order = self.api.place_market_order(
+                self.config.instrument_id, 
+                self.config.starting_position_quantity, 
+                Signal.BUY)
+            self._entry_order_id = order.id
+            if self.recovery_store is not None:
+                self.recovery_store.append("orchestrator.entry", order.id)
+            self.portfolio_manager.wait_for_order_response(order.id, self.config.timeout)
 
         # Get position from API
         native_position = self.api.get_open_position_by_id(self.config.instrument_id)
 
-        # Define profit targets and sell quantity buckets
-        profit_target_levels = [float(native_position.avg_entry_price) * (1 + target) for target in self.config.profit_targets]
-        logging.info(f"Profit target levels: {profit_target_levels}")
+        # Check existing position has enough quantity to sell
+        if native_position is None:
+            logging.error(f"No position found for {self.config.instrument_id}")
+            return
+        else:
+            logging.info(f"Position found for {self.config.instrument_id}")
+            logging.debug(f"{native_position}")
+            self._entry_price = float(native_position.avg_entry_price)
+
+        # Define profit targets and sell quantity buckets. The ladder is kept across restarts.
+        if self.profit_target_levels is None:
+            self.profit_target_levels = [self._entry_price * (1 + target) for target in self.config.profit_targets]
+            if self.recovery_store is not None:
+                self.recovery_store.append("orchestrator.ladder", self.profit_target_levels)
+
+        logging.info(f"Profit target levels: {self.profit_target_levels}")
 
         original_sell_quantity_buckets = quantity_buckets(self.config.starting_position_quantity, 
                                                  self.config.sell_buckets, 
@@ -175,15 +323,12 @@ class ExecutionOrchestrator:
 
         sell_quantity_buckets = original_sell_quantity_buckets[:-1]
 
-        # Check existing position has enough quantity to sell
-        if native_position is None:
-            logging.error(f"No position found for {self.config.instrument_id}")
-            return
-        else:
-            logging.info(f"Position found for {self.config.instrument_id}")
-            logging.debug(f"{native_position}")
+        if self.expiry_day:
+            expiry_sell_cutoff = self._expiry_sell_cutoff()
+            expiry_sell_cutoff_ns = expiry_sell_cutoff.value
 
-        required_qty = sum(original_sell_quantity_buckets[self.portfolio_manager.starting_idx:])
+        required_qty = sum(self.portfolio_manager.bucket_remaining(idx, qty) for idx, qty in enumerate(original_sell_quantity_buckets) 
+                           if not self.portfolio_manager.bucket_filled(idx))
         if int(native_position.qty) < required_qty:
             logging.error(f"Position quantity mismatch. Expected at least {required_qty}, got {native_position.qty}")
             logging.error("Will not be able to close positions as requested.")
@@ -191,69 +336,131 @@ class ExecutionOrchestrator:
             raise ValueError("Position quantity mismatch. Please check.")
         else:
             logging.info(f"Position quantity sufficient. Expected {required_qty}, got {native_position.qty}")
-     
+
+        # Optional stop alongside the profit targets, closing every remaining bucket but the runners once it triggers
+        exit_strategy = self._build_exit_strategy(native_position.symbol)
+        exit_triggered = False
   
         try:
 
-            for idx, (cur_bucket_qty, cur_profit_target) in enumerate(zip(sell_quantity_buckets, profit_target_levels)):
+            if self.config.exit_order_type == OrderType.LIMIT:
+                return self._run_limit_ladder(native_position.symbol, sell_quantity_buckets)
+
+            # The runners have no profit target. Targets are read per bucket, as a reload may move them
+            for idx, cur_bucket_qty in enumerate(sell_quantity_buckets[:len(self.profit_target_levels)]):
+                cur_profit_target = self.profit_target_levels[idx]
                 logging.info(f"Current bucket quantity: {cur_bucket_qty}, Current profit target: {cur_profit_target}")
 
-                if idx < self.portfolio_manager.starting_idx:
+                if self.portfolio_manager.bucket_filled(idx):
                     logging.info(f"Skipping bucket {idx} as it has already been closed")
                     continue
 
                 if cur_bucket_qty > 0:
 
                     loop_counter = 0
+                    iteration_start = None
                     while True:
 
                         loop_counter += 1
+                        LOOP_ITERATIONS.inc()
+                        # Iterations end at several breaks, so each one is timed when the next starts
+                        iteration_end = time.perf_counter()
+                        if iteration_start is not None:
+                            LOOP_SECONDS.observe(iteration_end - iteration_start)
+                        iteration_start = iteration_end
 
                         if self.portfolio_manager.process_latest_order():
                             break
 
+                        if self.trading_session_manager.stop_event.is_set():
+                            logging.info("Stop requested. Leaving the trading loop")
+                            return False
+
                         self.mkt_data_state.update_state()
+                        self._maybe_take_snapshot()
+                        if self.profiler is not None:
+                            self.profiler.checkpoint()
+
+                        # Settings reloaded between ticks apply from this iteration on
+                        if self._reload_config():
+                            cur_profit_target = self.profit_target_levels[idx]
+                            if self.expiry_day:
+                                expiry_sell_cutoff = self._expiry_sell_cutoff()
+                                expiry_sell_cutoff_ns = expiry_sell_cutoff.value
 
                         # Log every 100 iterations for debugging
                         if loop_counter % 100 == 0:
                             latest_quote = self.mkt_data_state.latest_quote()
 
-                            msg = f"Using quote: timestamp: {latest_quote.name}, bid_price: {latest_quote.bid_price}"
+                            msg = f"Using quote: timestamp: {latest_quote.name.tz_convert(self.config.timezone)}, bid_price: {latest_quote.bid_price}"
                             msg += f", target: {cur_profit_target}"
                             logging.info(msg)
 
-                        signal = TakeProfitStrategy.generate_signals(self.mkt_data_state, self.config, {'profit_target': cur_profit_target})
+                        if loop_counter % 1000 == 0:
+                            self.mkt_data_state.latency_monitor.log_summary()
+
+                        # Evaluate every tick of the drained batch so intra-batch crossings are not missed
+                        batch = self.mkt_data_state.latest_batch()
+                        trigger_idx = TakeProfitStrategy.first_trigger(
+                            batch['bid_price'].to_numpy(), 
+                            to_ns_array(batch.index), 
+                            self.config, 
+                            {'profit_target': cur_profit_target})
+
+                        # The exit strategy consumes every batch to keep its running state current
+                        exit_idx = -1
+                        if exit_strategy is not None and not exit_triggered:
+                            exit_idx = exit_strategy.first_trigger(
+                                batch['bid_price'].to_numpy(), 
+                                to_ns_array(batch.index), 
+                                self.config)
+
+                        if self.mkt_data_state.is_stale():
+                            # Do not act on a frozen feed, the last quote may be far from the market
+                            if loop_counter % 100 == 0:
+                                logging.warning(f"Market data is stale. Suppressing signals for {native_position.symbol}")
+                            signal = Signal.HOLD
+                        elif trigger_idx >= 0:
+                            logging.info(f"Bid {batch['bid_price'].iloc[trigger_idx]} at {batch.index[trigger_idx].tz_convert(self.config.timezone)} >= {cur_profit_target}")
+                            signal = Signal.SELL
+                        else:
+                            signal = Signal.HOLD
+
+                        if exit_idx >= 0 and not self.mkt_data_state.is_stale():
+                            logging.info(f"{self.config.exit_strategy} triggered by bid {batch['bid_price'].iloc[exit_idx]} at {batch.index[exit_idx].tz_convert(self.config.timezone)}. Closing the remaining buckets")
+                            exit_triggered = True
 
                         # Selling logic
                         if signal == Signal.SELL and not self.portfolio_manager.latest_order_pending():
-                        
-                            logging.info(f"Closing position {native_position.symbol} with quantity {cur_bucket_qty}")
 
-                            #close position
-                            self.portfolio_manager.close_position_by_id(native_position.symbol, cur_bucket_qty, idx)
+                            #close position, with the later buckets crossed by the same batch when orders are batched
+                            self._close_buckets(native_position.symbol, sell_quantity_buckets, idx, batch['bid_price'].iloc[trigger_idx:].max())
 
                             if self.portfolio_manager.process_latest_order():
                                 break
 
                         if self.expiry_day:
 
-                            now = pd.Timestamp.now(tz=self.config.timezone)
-                            expiry_sell_cutoff = self.trading_session_manager.trading_end - pd.Timedelta(minutes=self.config.expiry_sell_cutoff)
+                            now = now_ns()
 
                             if loop_counter % 100 == 0:
                                 logging.info(f"Expiry day. Checking if we should close positions. Cutoff time: {expiry_sell_cutoff}")
 
-                            if now >= expiry_sell_cutoff and not self.portfolio_manager.latest_order_pending():
+                            if now >= expiry_sell_cutoff_ns and not self.portfolio_manager.latest_order_pending():
 
-                                msg = f"Current time {now} >= expiry cutoff {expiry_sell_cutoff}."
-                                msg += f" Closing position {native_position.symbol} with quantity {cur_bucket_qty}"
-                                logging.info(msg)
-                            
-                                self.portfolio_manager.close_position_by_id(native_position.symbol, cur_bucket_qty, idx)
+                                logging.info(f"Current time {to_timestamp(now, self.config.timezone)} >= expiry cutoff {expiry_sell_cutoff}.")
+                                self._close_buckets(native_position.symbol, sell_quantity_buckets, idx)
                                 
                                 if self.portfolio_manager.process_latest_order():
                                     break
 
+                        if exit_triggered and not self.portfolio_manager.latest_order_pending():
+
+                            self._close_buckets(native_position.symbol, sell_quantity_buckets, idx)
+
+                            if self.portfolio_manager.process_latest_order():
+                                break
+
                 else:
                     raise ValueError(f"Current bucket quantity is {cur_bucket_qty}. Exiting loop.")
                 
@@ -267,6 +474,224 @@ class ExecutionOrchestrator:
 
             self.api.close_all_positions()
 
+    def _run_limit_ladder(self, symbol: str, sell_quantity_buckets: List[int]) -> bool:
+        """Sell the open buckets through resting limit orders at their profit targets.
+        
+        Instead of evaluating every quote, the loop sleeps until a trade update arrives, or
+        for at most a second to check the expiry cutoff, after which the remaining buckets
+        are closed with market orders. The quotes received in the meantime are still
+        ingested on every wake up, so they are recorded and do not pile up in the queue.
+        The resting orders are cancelled if the loop exits before every bucket is filled.
+        
+        Args:
+            symbol (str): Option symbol
+            sell_quantity_buckets (List[int]): Quantities of the sell buckets, without the runners
+            
+        Returns:
+            bool: True once all buckets are filled, False if stopped before
+        """
+        ladder = LimitLadder(self.api, self.portfolio_manager, symbol)
+        expiry_sell_cutoff_ns = self._expiry_sell_cutoff().value if self.expiry_day else None
+        stop_event = self.trading_session_manager.stop_event
+
+        try:
+            ladder.post([(idx, self.portfolio_manager.bucket_remaining(idx, qty), self.profit_target_levels[idx])
+                         for idx, qty in enumerate(sell_quantity_buckets) if not self.portfolio_manager.bucket_filled(idx)])
+
+            while not ladder.process():
+                if stop_event.is_set():
+                    logging.info("Stop requested. Leaving the limit ladder")
+                    return False
+
+                self.portfolio_manager.order_updated.wait(1.0)
+                self.portfolio_manager.order_updated.clear()
+                LOOP_ITERATIONS.inc()
+
+                if self.mkt_data_state.has_pending_quotes():
+                    self.mkt_data_state.update_state()
+                self._maybe_take_snapshot()
+                if self.profiler is not None:
+                    self.profiler.checkpoint()
+
+                if self._reload_config():
+                    ladder.reprice(dict(enumerate(self.profit_target_levels)))
+                    if self.expiry_day:
+                        expiry_sell_cutoff_ns = self._expiry_sell_cutoff().value
+
+                if expiry_sell_cutoff_ns is not None and now_ns() >= expiry_sell_cutoff_ns:
+                    ladder.switch_to_market()
+
+            logging.info(f"All positions closed. Only runners left. Terminating...")
+            return True
+
+        finally:
+            if ladder.open_buckets:
+                ladder.cancel()
+
+    def _build_exit_strategy(self, symbol: str) -> Optional[StatefulExitStrategy]:
+        """Build the configured exit strategy, warmed up with the seeded session-to-date bars.
+        
+        Args:
+            symbol (str): Option symbol
+            
+        Returns:
+            Optional[StatefulExitStrategy]: The exit strategy, None if exit_strategy is none
+        """
+        exit_strategy = build_exit_strategy(self.config, symbol, self._entry_price)
+        if exit_strategy is None:
+            return None
+
+        bars = self.mkt_data_state.historical_bars(symbol)
+        if not bars.empty:
+            exit_strategy.warm_up(bars['close'].to_numpy(), bars.index)
+        logging.info(f"Exit strategy {self.config.exit_strategy} warmed up with {len(bars)} bars")
+        return exit_strategy
+
+    def _close_buckets(self, symbol: str, sell_quantity_buckets: List[int], idx: int, bid: Optional[float] = None) -> None:
+        """Close the current bucket, and with order batching the later open buckets in the same orders.
+        
+        Args:
+            symbol (str): Option symbol
+            sell_quantity_buckets (List[int]): Quantities of the sell buckets, without the runners
+            idx (int): Current bucket
+            bid (Optional[float]): Highest bid of the triggering ticks. Later buckets are closed if it crossed
+                their profit target, or all of them if None
+        """
+        # Contracts sold by partially filled orders of a bucket are not sold again
+        remaining = self.portfolio_manager.bucket_remaining
+        if self.portfolio_manager.batcher is None:
+            logging.info(f"Closing position {symbol} with quantity {remaining(idx, sell_quantity_buckets[idx])}")
+            self.portfolio_manager.close_position_by_id(symbol, remaining(idx, sell_quantity_buckets[idx]), idx)
+            return
+
+        intents = [(symbol, remaining(bucket, sell_quantity_buckets[bucket]), bucket) for bucket in range(idx, len(sell_quantity_buckets))
+                   if bucket == idx or (not self.portfolio_manager.bucket_filled(bucket) 
+                                        and (bid is None or bid >= self.profit_target_levels[bucket]))]
+        logging.info(f"Closing position {symbol} buckets {[bucket for _, _, bucket in intents]} with quantity {sum(qty for _, qty, _ in intents)}")
+        self.portfolio_manager.close_buckets(intents)
+
+    def _expiry_sell_cutoff(self) -> pd.Timestamp:
+        """Return the time after which positions are closed on expiry day.
+        
+        The session close accounts for early closes on half-days.
+        """
+        session_close = self.trading_session_manager.session_close(pd.Timestamp.now(tz=self.config.timezone))
+        expiry_sell_cutoff = session_close - pd.Timedelta(minutes=self.config.expiry_sell_cutoff)
+        logging.info(f"Expiry day. Session closes at {session_close}. Expiry sell cutoff: {expiry_sell_cutoff}")
+        return expiry_sell_cutoff
+
+    def _reload_config(self) -> bool:
+        """Apply changes of the configuration file to the running engine.
+        
+        Called at safe points of the trading loop. Settings read on use take effect
+        through the shared Configuration, derived state is rebuilt here.
+
+        Returns:
+            bool: True if settings were changed
+        """
+        if self.config_watcher is None:
+            return False
+
+        changes = self.config_watcher.checkpoint()
+
+        if 'stale_quote_threshold' in changes:
+            self.mkt_data_state.latency_monitor.stale_threshold_ns = int(self.config.stale_quote_threshold * 1_000_000_000)
+
+        if 'profit_targets' in changes and self._entry_price is not None:
+            self.profit_target_levels = [self._entry_price * (1 + target) for target in self.config.profit_targets]
+            if self.recovery_store is not None:
+                self.recovery_store.append("orchestrator.ladder", self.profit_target_levels)
+            logging.info(f"Profit target levels: {self.profit_target_levels}")
+
+        return bool(changes)
+
+    def _warm_start(self) -> None:
+        """Seed market data with the session-to-date bars and latest quote before the live feed starts.
+        
+        Failures are logged and trading continues from an empty frame.
+        """
+        now = pd.Timestamp.now(tz=self.config.timezone)
+        session_open = self.trading_session_manager.session_open(now)
+        if session_open is None or now < session_open:
+            logging.info("Session not started yet. Skipping warm start.")
+            return
+
+        try:
+            loader = WarmStartLoader(self.api, os.path.join(os.getcwd(), "output", "cache"))
+            loader.seed(self.mkt_data_state, [self.config.instrument_id], session_open, now)
+        except Exception as e:
+            logging.warning(f"Warm start failed, starting from an empty frame: {str(e)}")
+
+    def _recover(self) -> None:
+        """Restore the orchestrator, portfolio and market data state of an interrupted session.
+        
+        The latest snapshot is loaded and the journal events recorded after it are replayed.
+        State from a previous day is discarded. The session only counts as recovered once
+        its entry order was journaled, otherwise the entry is still placed.
+        """
+        if self.recovery_store is None:
+            return
+
+        state, events = self.recovery_store.load()
+        today = pd.Timestamp.now(tz=self.config.timezone).date()
+
+        if state is None or state["orchestrator"]["session_date"] != today:
+            if state is not None or events:
+                logging.info("No recoverable state for the current session. Starting fresh.")
+            self.recovery_store.clear()
+            return
+
+        self.profit_target_levels = state["orchestrator"]["profit_target_levels"]
+        self._entry_order_id = state["orchestrator"].get("entry_order_id")
+        self.portfolio_manager.restore_state(state["portfolio"])
+        self.mkt_data_state.restore_state(state["mkt_data"])
+
+        for kind, payload in events:
+            component, _, event = kind.partition(".")
+            if kind == "orchestrator.entry":
+                self._entry_order_id = payload
+            elif kind == "orchestrator.ladder":
+                self.profit_target_levels = payload
+            elif component == "portfolio":
+                self.portfolio_manager.apply_event(event, payload)
+            elif component == "mkt_data":
+                self.mkt_data_state.apply_event(event, payload)
+            else:
+                logging.warning(f"Unknown journal event {kind}")
+
+        if self._entry_order_id is None:
+            logging.info("No entry order journaled for the current session. The entry will be placed.")
+            return
+
+        self._recovered = True
+        msg = f"Recovered session state: entry order {self._entry_order_id}, {len(self.portfolio_manager.orders)} orders, "
+        msg += f"filled buckets {self.portfolio_manager.filled_buckets}, "
+        msg += f"{len(self.mkt_data_state.market_data)} ticks, profit targets {self.profit_target_levels}"
+        logging.info(msg)
+
+    def _take_snapshot(self) -> None:
+        """Snapshot all components and attach the journal for subsequent events."""
+        if self.recovery_store is None:
+            return
+
+        self.recovery_store.save_snapshot(lambda: {
+            "orchestrator": {
+                "session_date": pd.Timestamp.now(tz=self.config.timezone).date(),
+                "profit_target_levels": self.profit_target_levels,
+                "entry_order_id": self._entry_order_id,
+            },
+            "portfolio": self.portfolio_manager.snapshot_state(),
+            "mkt_data": self.mkt_data_state.snapshot_state(),
+        })
+        self.portfolio_manager.journal = self.recovery_store
+        self.mkt_data_state.journal = self.recovery_store
+        self._last_snapshot = time.monotonic()
+
+    def _maybe_take_snapshot(self) -> None:
+        """Take a snapshot once the snapshot interval has elapsed."""
+        if self.recovery_store is not None and time.monotonic() - self._last_snapshot >= self.config.snapshot_interval:
+            self._take_snapshot()
+
     def _save_config(self) -> None:
         """Save the current configuration to the output directory for audit purposes.
         
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+from src.utilities.period import Period
+from src.utilities.timestamps import to_datetime_index
+
+
+BAR_FIELDS = ('open', 'high', 'low', 'close', 'ticks')
+
+
+class BarAggregator:
+    """Incremental OHLC bars of a single symbol at a fixed interval.
+
+    Bars are stored in preallocated arrays and updated in place as ticks arrive, so
+    consumers never resample the tick history. Bars are aligned to multiples of the
+    interval since the epoch, which puts them on the session open for the usual
+    intervals. The quote feed carries no traded volume, so each bar counts its ticks
+    instead.
+
+    With max_bars set, the arrays are a ring buffer holding only the latest max_bars
+    bars. Otherwise they start at the given capacity and double when full.
+    """
+
+    def __init__(self, period: Period, capacity: int, max_bars: Optional[int] = None) -> None:
+        """Initialize the aggregator.
+
+        Args:
+            period (Period): Intraday bar interval
+            capacity (int): Initial number of bars, typically the number of intervals in a session
+            max_bars (Optional[int]): Number of bars kept in bounded mode, unbounded if None
+        """
+        self.period = period
+        self.interval_ns = period.to_timedelta().value
+        self.max_bars = max_bars
+        capacity = max_bars if max_bars else max(capacity, 1)
+
+        self.start_ns = np.zeros(capacity, dtype=np.int64)
+        self.open = np.zeros(capacity)
+        self.high = np.zeros(capacity)
+        self.low = np.zeros(capacity)
+        self.close = np.zeros(capacity)
+        self.ticks = np.zeros(capacity, dtype=np.int64)
+
+        self._count = 0 # Bars created so far, including bars dropped from the ring
+
+    def __len__(self) -> int:
+        return min(self._count, self.max_bars) if self.max_bars else self._count
+
+    @property
+    def capacity(self) -> int:
+        return self.start_ns.size
+
+    def update(self, timestamps_ns: np.ndarray, prices: np.ndarray) -> None:
+        """Add a batch of ticks in timestamp order.
+
+        Ticks falling into the current bar update it in place. Late ticks update the bar
+        they belong to if it is still held, and are dropped otherwise.
+
+        Args:
+            timestamps_ns (np.ndarray): Tick timestamps in UTC nanoseconds
+            prices (np.ndarray): Tick prices
+        """
+        timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+        prices = np.asarray(prices, dtype=float)
+        if not timestamps_ns.size:
+            return
+
+        bar_starts = timestamps_ns - timestamps_ns % self.interval_ns
+        boundaries = np.flatnonzero(np.diff(bar_starts)) + 1
+        firsts = np.concatenate([[0], boundaries])
+        lasts = np.concatenate([boundaries, [bar_starts.size]]) - 1
+
+        highs = np.maximum.reduceat(prices, firsts)
+        lows = np.minimum.reduceat(prices, firsts)
+        counts = lasts - firsts + 1
+
+        for idx in range(firsts.size):
+            self._add(int(bar_starts[firsts[idx]]), prices[firsts[idx]], highs[idx], lows[idx], prices[lasts[idx]], int(counts[idx]))
+
+    def _add(self, start_ns: int, open_: float, high: float, low: float, close: float, ticks: int) -> None:
+        last_start = self.start_ns[self._slot(self._count - 1)] if self._count else None
+
+        if last_start is None or start_ns > last_start:
+            if not self.max_bars and self._count == self.capacity:
+                self._grow()
+            slot = self._slot(self._count)
+            self._count += 1
+            self.start_ns[slot] = start_ns
+            self.open[slot] = open_
+            self.high[slot] = high
+            self.low[slot] = low
+            self.close[slot] = close
+            self.ticks[slot] = ticks
+            return
+
+        if start_ns == last_start:
+            slot = self._slot(self._count - 1)
+            self.close[slot] = close
+        else:
+            # Late tick, find its bar among the bars still held
+            order = self._order()
+            pos = int(np.searchsorted(self.start_ns[order], start_ns))
+            if pos == order.size or self.start_ns[order[pos]] != start_ns:
+                return
+            slot = order[pos]
+
+        self.high[slot] = max(self.high[slot], high)
+        self.low[slot] = min(self.low[slot], low)
+        self.ticks[slot] += ticks
+
+    def _slot(self, bar_idx: int) -> int:
+        return bar_idx % self.max_bars if self.max_bars else bar_idx
+
+    def _order(self) -> np.ndarray:
+        """Slots of the held bars from oldest to newest"""
+        bar_idx = np.arange(self._count - len(self), self._count)
+        return bar_idx % self.max_bars if self.max_bars else bar_idx
+
+    def _grow(self) -> None:
+        for field in ('start_ns',) + BAR_FIELDS:
+            array = getattr(self, field)
+            grown = np.zeros(array.size * 2, dtype=array.dtype)
+            grown[:array.size] = array
+            setattr(self, field, grown)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Held bars from oldest to newest as arrays, keyed by start_ns and the bar fields"""
+        if not self.max_bars:
+            size = self._count
+            return {field: getattr(self, field)[:size] for field in ('start_ns',) + BAR_FIELDS}
+
+        order = self._order()
+        return {field: getattr(self, field)[order] for field in ('start_ns',) + BAR_FIELDS}
+
+    def to_frame(self, timezone: Optional[str] = None) -> pd.DataFrame:
+        """Held bars as a DataFrame indexed by bar start time"""
+        arrays = self.arrays()
+        index = to_datetime_index(arrays.pop('start_ns'), timezone).rename('datetime')
+        return pd.DataFrame(arrays, index=index)
@@ -0,0 +1,98 @@
+import signal
+import logging
+import argparse
+import threading
+from typing import List
+from src.configuration import Configuration
+from src.api.alpaca_api import AlpacaAPI
+from src.mkt_data.shared_quote_ring import SharedQuoteRing
+
+
+class FeedHandler:
+    """Single option market data connection per host, fanned out through shared memory.
+
+    The feed handler owns the only option quote websocket of the host and writes every
+    quote into a SharedQuoteRing. Orchestrator processes configured with the ring's
+    name as shared_feed read quotes from it instead of opening their own websocket.
+    Quotes fetched after a websocket reconnect are written to the ring as well.
+    """
+
+    def __init__(self, config: Configuration, symbols: List[str], ring_name: str, capacity: int, api=None) -> None:
+        """Initialize the feed handler.
+
+        Args:
+            config (Configuration): Configuration with the API settings
+            symbols (List[str]): Option symbols to stream
+            ring_name (str): Shared memory block name of the ring
+            capacity (int): Records held by the ring
+            api: AlpacaAPI instance, created if None
+        """
+        self.config = config
+        self.symbols = list(symbols)
+        self.ring_name = ring_name
+        self.capacity = capacity
+        self.api = api if api is not None else AlpacaAPI()
+        self.ring = None
+
+        self._lock = threading.Lock() # Backfills are written from the websocket supervisor thread
+
+    def start(self) -> None:
+        self.ring = SharedQuoteRing(self.ring_name, self.capacity)
+        logging.info(f"FeedHandler: Created ring {self.ring_name} with {self.capacity} records")
+
+        self.api.connect_market_data(self.config)
+        self.api.subscribe_option_md_updates(self.on_quote, self.on_trade, self.symbols, backfill_handler=self.on_backfill)
+
+    def stop(self) -> None:
+        self.api.close_websockets()
+        if self.ring is not None:
+            logging.info(f"FeedHandler: Wrote {self.ring.write_seq} quotes. Removing ring {self.ring_name}")
+            self.ring.close()
+            self.ring.unlink()
+            self.ring = None
+
+    async def on_quote(self, quote) -> None:
+        with self._lock:
+            self.ring.write([quote])
+
+    async def on_trade(self, trade) -> None:
+        """Option trades are not consumed by the orchestrator and are not shared"""
+
+    def on_backfill(self, quotes, bars=None) -> None:
+        """The ring holds quotes only, the minute bars of the missed interval are not shared"""
+        with self._lock:
+            self.ring.write(quotes)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stream option quotes into a shared memory ring.")
+    parser.add_argument('--config', default='run.cfg')
+    parser.add_argument('--symbols', nargs='+', default=None, help="Option symbols, defaults to the configured instrument")
+    parser.add_argument('--ring', default=None, help="Ring name, defaults to the configured shared_feed")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    from src.utilities.logger import Logger
+
+    load_dotenv()
+    Logger()
+    config = Configuration(args.config)
+
+    ring_name = args.ring or config.shared_feed
+    if not ring_name:
+        raise ValueError("No ring name. Set shared_feed in [Market_Data] or pass --ring")
+
+    feed_handler = FeedHandler(config, args.symbols or [config.instrument_id], ring_name, config.shared_feed_capacity)
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
+
+    feed_handler.start()
+    try:
+        stop_event.wait()
+    finally:
+        feed_handler.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import time
+import logging
+import numpy as np
+from typing import Dict, Optional
+
+
+class StreamingHistogram:
+    """Fixed-memory histogram with log-spaced buckets for latency measurements.
+
+    Values are counted into buckets between min_value and max_value, with overflow
+    buckets on both ends, so memory stays constant however many ticks are recorded.
+    Percentiles are reported as the upper edge of the bucket they fall in.
+    """
+
+    def __init__(self, min_value: float = 0.01, max_value: float = 600_000.0, buckets_per_decade: int = 10) -> None:
+        """Initialize the histogram.
+
+        Args:
+            min_value (float): Upper edge of the lowest bucket, in milliseconds
+            max_value (float): Upper edge of the highest regular bucket, in milliseconds
+            buckets_per_decade (int): Number of buckets per factor of 10
+        """
+        decades = np.log10(max_value / min_value)
+        self.edges = np.geomspace(min_value, max_value, int(round(decades * buckets_per_decade)) + 1)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = float('-inf')
+
+    def record(self, values) -> None:
+        """Record one or more values.
+
+        Args:
+            values: Value or array of values, in milliseconds
+        """
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        if not values.size:
+            return
+
+        np.add.at(self.counts, np.searchsorted(self.edges, values), 1)
+        self.count += values.size
+        self.total += float(values.sum())
+        self.max = max(self.max, float(values.max()))
+
+    def percentile(self, q: float) -> float:
+        """Approximate percentile.
+
+        Args:
+            q (float): Percentile between 0 and 100
+
+        Returns:
+            float: Upper edge of the bucket containing the percentile, NaN if empty
+        """
+        if not self.count:
+            return float('nan')
+
+        idx = int(np.searchsorted(np.cumsum(self.counts), q / 100 * self.count))
+        return float(self.edges[idx]) if idx < len(self.edges) else self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float('nan')
+
+
+class FeedLatencyMonitor:
+    """Per-symbol feed latency and quote staleness tracking.
+
+    For every ingested tick the gap between the exchange timestamp and the local receive
+    time, and the gap to the previous tick of the same symbol, are recorded in streaming
+    histograms. A symbol is stale once its latest exchange timestamp is older than the
+    threshold, which is used to suppress signals on frozen data.
+    """
+
+    def __init__(self, stale_threshold: float) -> None:
+        """Initialize the monitor.
+
+        Args:
+            stale_threshold (float): Age in seconds after which the latest quote of a symbol is stale
+        """
+        self.stale_threshold_ns = int(stale_threshold * 1_000_000_000)
+
+        self.latency: Dict[str, StreamingHistogram] = {}
+        self.inter_arrival: Dict[str, StreamingHistogram] = {}
+        self._last_exchange_ns: Dict[str, int] = {}
+
+    def record_batch(self, symbols: np.ndarray, exchange_ns: np.ndarray, receive_ns: np.ndarray) -> None:
+        """Record a batch of ticks in arrival order.
+
+        Args:
+            symbols (np.ndarray): Symbol of each tick
+            exchange_ns (np.ndarray): Exchange timestamps in UTC nanoseconds
+            receive_ns (np.ndarray): Local receive times in UTC nanoseconds
+        """
+        symbols = np.asarray(symbols, dtype=object)
+        exchange_ns = np.asarray(exchange_ns, dtype=np.int64)
+        receive_ns = np.asarray(receive_ns, dtype=np.int64)
+
+        for symbol in dict.fromkeys(symbols.tolist()):
+            mask = symbols == symbol
+            sym_exchange_ns = exchange_ns[mask]
+
+            if symbol not in self.latency:
+                self.latency[symbol] = StreamingHistogram()
+                self.inter_arrival[symbol] = StreamingHistogram()
+
+            self.latency[symbol].record((receive_ns[mask] - sym_exchange_ns) / 1e6)
+
+            previous = self._last_exchange_ns.get(symbol)
+            previous = sym_exchange_ns[:1] if previous is None else np.array([previous], dtype=np.int64)
+            gaps = np.diff(np.concatenate([previous, sym_exchange_ns]))
+            self.inter_arrival[symbol].record(np.maximum(gaps, 0) / 1e6)
+
+            self._last_exchange_ns[symbol] = max(int(sym_exchange_ns.max()), self._last_exchange_ns.get(symbol, 0))
+
+    def quote_age(self, symbol: str, now_ns: Optional[int] = None) -> float:
+        """Age of the latest quote of a symbol in seconds, infinite if none was received."""
+        if symbol not in self._last_exchange_ns:
+            return float('inf')
+        now_ns = time.time_ns() if now_ns is None else now_ns
+        return (now_ns - self._last_exchange_ns[symbol]) / 1e9
+
+    def is_stale(self, symbol: Optional[str] = None, now_ns: Optional[int] = None) -> bool:
+        """Check if the latest quote is older than the threshold.
+
+        Args:
+            symbol (Optional[str]): Symbol to check, all recorded symbols if None
+            now_ns (Optional[int]): Current time in UTC nanoseconds, defaults to the wall clock
+
+        Returns:
+            bool: True if the quote (or any quote when symbol is None) is stale
+        """
+        now_ns = time.time_ns() if now_ns is None else now_ns
+        if symbol is not None:
+            last = self._last_exchange_ns.get(symbol)
+            return last is None or now_ns - last > self.stale_threshold_ns
+
+        return any(now_ns - last > self.stale_threshold_ns for last in self._last_exchange_ns.values())
+
+    def summary(self) -> Dict[str, dict]:
+        """Latency and inter-arrival statistics per symbol, in milliseconds."""
+        return {
+            symbol: {
+                'ticks': self.latency[symbol].count,
+                'latency_mean': self.latency[symbol].mean,
+                'latency_p50': self.latency[symbol].percentile(50),
+                'latency_p99': self.latency[symbol].percentile(99),
+                'latency_max': self.latency[symbol].max,
+                'gap_p50': self.inter_arrival[symbol].percentile(50),
+                'gap_p99': self.inter_arrival[symbol].percentile(99),
+                'gap_max': self.inter_arrival[symbol].max,
+            }
+            for symbol in self.latency
+        }
+
+    def log_summary(self) -> None:
+        """Log the latency statistics of every symbol."""
+        for symbol, stats in self.summary().items():
+            msg = f"FeedLatencyMonitor: {symbol} ticks: {stats['ticks']}, "
+            msg += f"latency ms p50/p99/max: {stats['latency_p50']:.1f}/{stats['latency_p99']:.1f}/{stats['latency_max']:.1f}, "
+            msg += f"gap ms p50/p99/max: {stats['gap_p50']:.1f}/{stats['gap_p99']:.1f}/{stats['gap_max']:.1f}"
+            logging.info(msg)
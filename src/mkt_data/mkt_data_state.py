@@ -1,61 +1,198 @@
+import numpy as np
 import pandas as pd
 import queue
+import itertools
+from collections import deque
 from src.configuration import Configuration
 import logging
 import os
 from datetime import datetime
+from src.pricing.black_scholes import parse_option_symbol
+from src.mkt_data.feed_latency_monitor import FeedLatencyMonitor
+from src.mkt_data.bar_aggregator import BarAggregator
+from src.utilities.period import Period
+from src.utilities.utils import calc_intraday_time_points
+from src.utilities.timestamps import now_ns, to_ns, to_ns_array, to_datetime_index
+from src.utilities.metrics import REGISTRY
+
+
+TICKS = REGISTRY.counter("mkt_data_ticks_total", "Quotes drained from the websocket queue by update_state")
+QUEUE_DEPTH = REGISTRY.gauge("mkt_data_queue_depth", "Quotes waiting in the websocket queue")
+FRAME_ROWS = REGISTRY.gauge("mkt_data_frame_rows", "Rows of the stored tick history")
 
 
 class MktDataState:
 
+    QUOTE_POLL_TIMEOUT = 1.0 # Seconds update_state waits for ticks before returning an empty batch
+    RECENT_BATCHES = 1000 # Ingested batches kept for batches_since
+
     def __init__(self, config: Configuration):
         self.config = config
 
         self._quote_data = queue.Queue()
+        self._backfill_data = queue.Queue() # Quotes and bars fetched after a websocket reconnect
         self._market_data = pd.DataFrame()
+        self._latest_batch = pd.DataFrame()
+        self._recent_batches = deque(maxlen=self.RECENT_BATCHES)
+        self._batch_count = 0 # Batches ingested by update_state
+        self._bars = {} # symbol -> session-to-date bars seeded at startup and backfilled after reconnects
+        self._bar_periods = {interval: Period(interval) for interval in config.bar_intervals}
+        self._bar_aggregators = {} # (symbol, interval) -> BarAggregator fed by the ingested ticks
+        for interval, period in self._bar_periods.items():
+            if not period.is_intraday:
+                raise ValueError(f"Bar interval {interval} is not an intraday interval")
+
+        self._underlying_quotes = {} # underlying symbol -> latest underlying quote
+        self._underlying_symbols = {} # option symbol -> underlying symbol
+
+        self.journal = None # Optional RecoveryStore the parsed ticks are journaled to
+        self.latency_monitor = FeedLatencyMonitor(config.stale_quote_threshold)
+
+        QUEUE_DEPTH.set_function(self._quote_data.qsize)
+        FRAME_ROWS.set_function(lambda: len(self._market_data))
 
     @property
     def market_data(self):
         return self._market_data
 
-    def update_state(self):
-        """Update market data state"""
-
-        while True:
-                
-            # Handle tick data
-            if self.config.store_all_ticks:
+    def update_state(self) -> bool:
+        """Update market data state
 
-                latest_ticks = []
-                while not self._quote_data.empty():
-                    latest_ticks.append(self._quote_data.get_nowait())
+        Blocks until ticks arrive. Once market data exists, returns False with an empty
+        latest batch when no tick arrived within QUOTE_POLL_TIMEOUT seconds, so callers
+        keep running and can detect a stalled feed.
+        """
+        self._merge_backfill()
 
-                if not latest_ticks:
+        while True:
+            try:
+                latest_ticks = [self._quote_data.get(timeout=self.QUOTE_POLL_TIMEOUT)]
+            except queue.Empty:
+                if self._market_data.empty:
                     continue
 
-                latest_tick_df = self._parse_tick_data(latest_ticks)
-                break
-
-            else: 
+                self._latest_batch = self._market_data.iloc[0:0]
+                return False
 
-                latest_quote = None
-                while not self._quote_data.empty():
-                    latest_quote = self._quote_data.get_nowait()
+            while not self._quote_data.empty():
+                latest_ticks.append(self._quote_data.get_nowait())
+            break
 
-                if not latest_quote:
-                    continue
+        # Records read from a SharedQuoteRing are queued in batches, websocket quotes one by one
+        from_ring = isinstance(latest_ticks[0], tuple) and isinstance(latest_ticks[0][0], np.ndarray)
+        TICKS.inc(sum(len(records) for records, _ in latest_ticks) if from_ring else len(latest_ticks))
 
-                latest_tick_df = self._parse_tick_data(latest_quote)
-                break
+        # Handle tick data
+        if from_ring:
+            latest_tick_df = self._parse_quote_records(latest_ticks)
+        elif self.config.store_all_ticks:
+            latest_tick_df = self._parse_tick_data(latest_ticks)
+        else:
+            latest_tick_df = self._parse_tick_data(latest_ticks[-1])
 
+        self._latest_batch = latest_tick_df
+        self._recent_batches.append(latest_tick_df)
+        self._batch_count += 1
         self._market_data = pd.concat([self._market_data, latest_tick_df])
+        self._aggregate_bars(latest_tick_df)
+        if self.journal is not None:
+            self.journal.append("mkt_data.ticks", latest_tick_df, sync=False)
+
         if self.config.save_market_data and self._market_data.shape[0] % 100 == 0:
             self._save_market_data()
 
-    def _parse_tick_data(self, latest_quote):
+        return True
+
+    def has_pending_quotes(self) -> bool:
+        """True if quotes are waiting for update_state, which then returns without blocking"""
+        return not self._quote_data.empty()
+
+    def _aggregate_bars(self, tick_df):
+        """Update the bars of every configured interval with the bid prices of new ticks"""
+        if not self._bar_periods or tick_df.empty:
+            return
+
+        timestamps_ns = to_ns_array(tick_df.index)
+        bids = tick_df['bid_price'].to_numpy(dtype=float)
+        symbols = tick_df['symbol'].to_numpy(dtype=object)
+
+        for symbol in dict.fromkeys(symbols.tolist()):
+            mask = symbols == symbol
+            for interval in self._bar_periods:
+                self.bar_aggregator(symbol, interval).update(timestamps_ns[mask], bids[mask])
+
+    def bar_aggregator(self, symbol, interval):
+        """Incremental bars of a symbol at one of the configured bar intervals"""
+        key = (symbol, interval)
+        if key not in self._bar_aggregators:
+            period = self._bar_periods[interval]
+            start = pd.Timestamp(f"2000-01-03 {self.config.trading_start_time}")
+            end = pd.Timestamp(f"2000-01-03 {self.config.trading_end_time}")
+            if end <= start:
+                end += pd.Timedelta(days=1)
+            capacity = calc_intraday_time_points(period.frequency, start, end)
+            self._bar_aggregators[key] = BarAggregator(period, capacity, self.config.max_bars or None)
+        return self._bar_aggregators[key]
+
+    def bars(self, symbol, interval):
+        """Bars of a symbol at one of the configured bar intervals, built from the ingested ticks"""
+        return self.bar_aggregator(symbol, interval).to_frame(self.config.timezone)
+
+    def _merge_backfill(self):
+        """Merge quotes and bars queued by backfill_quote_data into the market data"""
+        backfill, bars = [], {}
+        while not self._backfill_data.empty():
+            quotes, symbol_bars = self._backfill_data.get_nowait()
+            backfill.extend(quotes)
+            for symbol, df in symbol_bars.items():
+                bars[symbol] = pd.concat([bars[symbol], df]) if symbol in bars else df
+
+        if bars:
+            self._merge_bars(bars)
+            if self.journal is not None:
+                self.journal.append("mkt_data.backfill_bars", bars, sync=False)
+
+        if not backfill:
+            return
+
+        backfill_df = self._parse_tick_data(backfill, record_latency=False)
+        self._merge_ticks(backfill_df)
+        if self.journal is not None:
+            self.journal.append("mkt_data.backfill", backfill_df, sync=False)
+
+    def _merge_bars(self, bars):
+        """Merge minute bars of a missed interval into the session bars, newer bars replacing older ones"""
+        for symbol, df in bars.items():
+            if df.empty:
+                continue
+            merged = pd.concat([self._bars[symbol], df]) if symbol in self._bars else df
+            self._bars[symbol] = merged[~merged.index.duplicated(keep='last')].sort_index(kind='stable')
+            logging.info(f"MktDataState: Merged {len(df)} backfilled bars of {symbol}")
+
+    def _merge_ticks(self, tick_df):
+        """Merge ticks into the market data in timestamp order, dropping ticks already stored"""
+        merged = pd.concat([self._market_data, tick_df])
+
+        keys = merged[['symbol', 'bid_price', 'bid_size', 'ask_price', 'ask_size']].assign(timestamp=merged.index)
+        merged = merged[~keys.duplicated().to_numpy()]
+
+        added = len(merged) - len(self._market_data)
+        self._market_data = merged.sort_index(kind='stable')
+        logging.info(f"MktDataState: Merged {added} of {len(tick_df)} backfilled ticks")
+
+    def _parse_tick_data(self, latest_quote, record_latency=True):
         latest_quote = latest_quote if isinstance(latest_quote, list) else [latest_quote]
+
+        # Quotes from the WS handler are queued together with the underlying quote they were joined with
+        # and the local receive time
+        receive_ns = now_ns()
+        pairs = [item if isinstance(item, tuple) else (item, None, receive_ns) for item in latest_quote]
+        latest_quote = [tick for tick, _, _ in pairs]
+
+        # Timestamps stay int64 UTC nanoseconds, converted to the configured timezone only when saved or displayed
+        timestamps_ns = np.fromiter((to_ns(tick.timestamp) for tick in latest_quote), dtype=np.int64, count=len(latest_quote))
+
         df = pd.DataFrame({
-            'datetime': [pd.to_datetime(tick.timestamp, format='%Y%m%d %H:%M:%S %Z') for tick in latest_quote],
             'symbol': [tick.symbol for tick in latest_quote],
             'bid_price': [tick.bid_price for tick in latest_quote],
             'bid_size': [tick.bid_size for tick in latest_quote],
@@ -65,20 +202,184 @@ class MktDataState:
             'ask_exchange': [tick.ask_exchange for tick in latest_quote],
             'conditions': [tick.conditions for tick in latest_quote],
             'tape': [tick.tape for tick in latest_quote]
-        })
-        df.set_index('datetime', inplace=True)
-        df.sort_index(ascending=True, inplace=True)
-        df.index = df.index.tz_convert(self.config.timezone)
+        }, index=to_datetime_index(timestamps_ns).rename('datetime'))
+
+        if self.config.subscribe_underlying:
+            underlying = [underlying_quote for _, underlying_quote, _ in pairs]
+            df['underlying_bid_price'] = [u.bid_price if u is not None else float('nan') for u in underlying]
+            df['underlying_ask_price'] = [u.ask_price if u is not None else float('nan') for u in underlying]
+            underlying_ns = np.fromiter((to_ns(u.timestamp) if u is not None else np.iinfo(np.int64).min for u in underlying), 
+                                        dtype=np.int64, count=len(underlying))
+            df['underlying_timestamp'] = to_datetime_index(underlying_ns)
+
+        if record_latency:
+            self.latency_monitor.record_batch(df['symbol'].to_numpy(),
+                                              timestamps_ns,
+                                              [receive_ns for _, _, receive_ns in pairs])
+
+        if not df.index.is_monotonic_increasing:
+            df.sort_index(ascending=True, kind='stable', inplace=True)
         return df
     
+    def _parse_quote_records(self, batches):
+        """Build the tick frame of quote records read from a SharedQuoteRing without per-tick objects"""
+        records = np.concatenate([records for records, _ in batches])
+        if not self.config.store_all_ticks:
+            records = records[-1:]
+
+        timestamps_ns = records['timestamp_ns']
+        symbols = np.char.decode(records['symbol']).astype(object)
+
+        df = pd.DataFrame({
+            'symbol': symbols,
+            'bid_price': records['bid_price'],
+            'bid_size': records['bid_size'],
+            'bid_exchange': np.char.decode(records['bid_exchange']).astype(object),
+            'ask_price': records['ask_price'],
+            'ask_size': records['ask_size'],
+            'ask_exchange': np.char.decode(records['ask_exchange']).astype(object),
+            'conditions': [conditions.split(',') if conditions else [] for conditions in np.char.decode(records['conditions']).tolist()],
+            'tape': [tape or None for tape in np.char.decode(records['tape']).tolist()]
+        }, index=to_datetime_index(timestamps_ns).rename('datetime'))
+
+        if self.config.subscribe_underlying:
+            # Batches are joined with the underlying quotes latest when they were read from the ring
+            underlying = {}
+            for _, underlying_quotes in batches:
+                underlying.update(underlying_quotes)
+
+            bid = np.full(len(df), np.nan)
+            ask = np.full(len(df), np.nan)
+            underlying_ns = np.full(len(df), np.iinfo(np.int64).min, dtype=np.int64)
+            for symbol, quote in underlying.items():
+                if quote is not None:
+                    mask = symbols == symbol
+                    bid[mask], ask[mask], underlying_ns[mask] = quote.bid_price, quote.ask_price, to_ns(quote.timestamp)
+            df['underlying_bid_price'] = bid
+            df['underlying_ask_price'] = ask
+            df['underlying_timestamp'] = to_datetime_index(underlying_ns)
+
+        self.latency_monitor.record_batch(df['symbol'].to_numpy(), timestamps_ns, records['receive_ns'])
+
+        if not df.index.is_monotonic_increasing:
+            df.sort_index(ascending=True, kind='stable', inplace=True)
+        return df
+
+    def update_quote_records(self, records):
+        """Queue quote records read from a SharedQuoteRing, called by SharedQuoteReader"""
+        symbols = dict.fromkeys(np.char.decode(np.unique(records['symbol'])).tolist())
+        underlying = {symbol: self.latest_underlying_quote(symbol) for symbol in symbols}
+        self._quote_data.put((records, underlying))
+
     async def update_quote_data(self, data):
         """Update quote data from WS"""
         # logging.debug(f"Quote data received from WS for {data.symbol} at {data.timestamp}")
-        self._quote_data.put(data)
+        self._quote_data.put((data, self.latest_underlying_quote(data.symbol), now_ns()))
+
+    def seed(self, bars, quotes):
+        """Seed session-to-date bars and quotes before the live feed starts
+
+        Args:
+            bars (dict): Symbol -> bars DataFrame indexed by bar start time
+            quotes (list): Latest quotes, merged into the market data
+        """
+        self._bars.update(bars)
+
+        if quotes:
+            self._merge_ticks(self._parse_tick_data(quotes, record_latency=False))
+
+    def historical_bars(self, symbol):
+        """Bars of a symbol seeded at startup, empty if none were seeded"""
+        bars = self._bars.get(symbol)
+        return bars.tz_convert(self.config.timezone) if bars is not None else pd.DataFrame()
+
+    def backfill_quote_data(self, quotes, bars=None):
+        """Queue data fetched after a websocket reconnect, merged by the next update_state
+
+        Args:
+            quotes (list): Latest quotes, merged into the market data
+            bars (dict): Symbol -> minute bars of the missed interval, merged into the session bars
+        """
+        self._backfill_data.put((list(quotes), bars or {}))
+
+    async def update_underlying_quote_data(self, data):
+        """Update the latest underlying quote from WS"""
+        self._underlying_quotes[data.symbol] = data
+
+    def underlying_symbol(self, symbol):
+        """Underlying symbol of an option symbol, None if it cannot be parsed"""
+        if symbol not in self._underlying_symbols:
+            try:
+                self._underlying_symbols[symbol] = parse_option_symbol(symbol).underlying
+            except ValueError:
+                logging.warning(f"MktDataState: Cannot determine the underlying of {symbol}")
+                self._underlying_symbols[symbol] = None
+        return self._underlying_symbols[symbol]
+
+    def latest_underlying_quote(self, symbol):
+        """Latest underlying quote received before now for an option symbol (as-of join)"""
+        if not self._underlying_quotes:
+            return None
+        return self._underlying_quotes.get(self.underlying_symbol(symbol))
 
     def latest_quote(self):
         return self._market_data.iloc[-1]
+
+    def is_stale(self, now_ns=None) -> bool:
+        """True if the latest quote of any symbol is older than the stale quote threshold"""
+        return self.latency_monitor.is_stale(now_ns=now_ns)
+
+    def latest_batch(self):
+        """Ticks ingested by the latest update_state call, in timestamp order"""
+        return self._latest_batch
     
+    def batches_since(self, count):
+        """Batches ingested after the first count batches, for consumers that poll less often than update_state
+
+        Args:
+            count (int): Batches consumed so far, 0 on the first call
+
+        Returns:
+            tuple: Number of batches ingested so far and the list of new batches in ingestion order
+        """
+        missed = self._batch_count - count
+        if missed > len(self._recent_batches):
+            logging.warning(f"MktDataState: {missed - len(self._recent_batches)} batches were dropped before they were consumed")
+        start = max(len(self._recent_batches) - missed, 0)
+        return self._batch_count, list(itertools.islice(self._recent_batches, start, None))
+
+    def snapshot_state(self) -> dict:
+        """Return the state needed to resume market data after a restart
+
+        Only the latest snapshot_max_ticks ticks are kept, so snapshots do not grow with the session.
+        """
+        return {"market_data": self._market_data.iloc[-self.config.snapshot_max_ticks:], "bars": self._bars, "bar_aggregators": self._bar_aggregators}
+
+    def restore_state(self, state: dict) -> None:
+        """Restore market data from a snapshot"""
+        self._market_data = state["market_data"]
+        self._bars = state.get("bars", {})
+        self._bar_aggregators = state.get("bar_aggregators", {})
+
+    def apply_event(self, event: str, payload) -> None:
+        """Replay a journaled market data event"""
+        if event == "ticks":
+            self._market_data = pd.concat([self._market_data, payload])
+            self._aggregate_bars(payload)
+        elif event == "backfill":
+            self._merge_ticks(payload)
+        elif event == "backfill_bars":
+            self._merge_bars(payload)
+        else:
+            logging.warning(f"MktDataState: Unknown journal event {event}")
+
+    def _market_data_for_display(self):
+        """Market data with the timestamps converted to the configured timezone"""
+        df = self._market_data.tz_convert(self.config.timezone)
+        if 'underlying_timestamp' in df.columns:
+            df = df.assign(underlying_timestamp=df['underlying_timestamp'].dt.tz_convert(self.config.timezone))
+        return df
+
     def _save_market_data(self):
         """Save data to CSV file"""
         if not self._market_data.empty:
@@ -93,5 +394,5 @@ class MktDataState:
             filename = f"market_data_{self.config.instrument_id}_{timestamp}.csv"
             filepath = os.path.join(output_dir, filename)
             
-            self._market_data.to_csv(filepath, index=True)
+            self._market_data_for_display().to_csv(filepath, index=True)
             logging.info(f"Market data saved to {filepath}")
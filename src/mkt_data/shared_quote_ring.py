@@ -0,0 +1,241 @@
+import logging
+import threading
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+from typing import Callable, Iterable, Optional
+from src.utilities.timestamps import now_ns, to_ns
+
+
+RING_MAGIC = 0x51554F5445524E47 # "QUOTERNG"
+
+# Header: capacity, then the claimed and committed sequence numbers, padded to a cache line
+RING_HEADER = np.dtype([
+    ('magic', np.uint64),
+    ('capacity', np.uint64),
+    ('claim_seq', np.uint64),
+    ('write_seq', np.uint64),
+])
+HEADER_SIZE = 64
+
+_created = set() # Names of the rings created by this process
+
+QUOTE_RECORD = np.dtype([
+    ('seq', np.uint64),
+    ('timestamp_ns', np.int64),
+    ('receive_ns', np.int64),
+    ('bid_price', np.float64),
+    ('bid_size', np.float64),
+    ('ask_price', np.float64),
+    ('ask_size', np.float64),
+    ('symbol', 'S32'),
+    ('bid_exchange', 'S4'),
+    ('ask_exchange', 'S4'),
+    ('conditions', 'S16'), # Comma separated, truncated to the field width
+    ('tape', 'S4'),
+])
+
+
+def quotes_to_records(quotes: Iterable, receive_ns: Optional[int] = None) -> np.ndarray:
+    """Pack quote objects into fixed-width quote records.
+
+    Args:
+        quotes (Iterable): Quotes with the attributes of alpaca.data.models.Quote
+        receive_ns (Optional[int]): Local receive time in UTC nanoseconds, defaults to now
+
+    Returns:
+        np.ndarray: Records of dtype QUOTE_RECORD, with seq left to the ring
+    """
+    quotes = list(quotes)
+    records = np.zeros(len(quotes), dtype=QUOTE_RECORD)
+    records['timestamp_ns'] = [to_ns(quote.timestamp) for quote in quotes]
+    records['receive_ns'] = receive_ns if receive_ns is not None else now_ns()
+    for field in ('bid_price', 'bid_size', 'ask_price', 'ask_size'):
+        records[field] = [getattr(quote, field) for quote in quotes]
+    for field in ('symbol', 'bid_exchange', 'ask_exchange', 'tape'):
+        records[field] = [(getattr(quote, field) or '').encode() for quote in quotes]
+    records['conditions'] = [','.join(quote.conditions or []).encode() for quote in quotes]
+    return records
+
+
+class SharedQuoteRing:
+    """Ring buffer of fixed-width quote records in shared memory.
+
+    A single feed handler process writes quotes, and any number of processes on the
+    host read them without parsing, straight from a numpy view of the shared block.
+    Every record carries its sequence number. The writer claims the sequence numbers
+    of a batch in the header before overwriting their slots and commits them after,
+    so readers detect records overwritten while they were copied and drop them rather
+    than returning torn records. Readers that fall more than a ring behind skip ahead
+    and count the records they missed.
+    """
+
+    def __init__(self, name: str, capacity: Optional[int] = None) -> None:
+        """Create the ring if capacity is given, otherwise attach to an existing one.
+
+        Args:
+            name (str): Shared memory block name
+            capacity (Optional[int]): Number of records, only when creating the ring
+        """
+        self.name = name
+        self.owner = capacity is not None
+
+        if self.owner:
+            self._shm = shared_memory.SharedMemory(name, create=True, size=HEADER_SIZE + capacity * QUOTE_RECORD.itemsize)
+            _created.add(name)
+        else:
+            self._shm = self._attach(name)
+
+        self._header = np.ndarray(1, dtype=RING_HEADER, buffer=self._shm.buf)
+        if self.owner:
+            self._header[0] = (RING_MAGIC, capacity, 0, 0)
+        elif self._header['magic'][0] != RING_MAGIC:
+            self._shm.close()
+            raise ValueError(f"Shared memory block {name} is not a quote ring")
+
+        self.capacity = int(self._header['capacity'][0])
+        self.records = np.ndarray(self.capacity, dtype=QUOTE_RECORD, buffer=self._shm.buf, offset=HEADER_SIZE)
+
+    @staticmethod
+    def _attach(name: str) -> shared_memory.SharedMemory:
+        try:
+            return shared_memory.SharedMemory(name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the block with this process's resource
+            # tracker, which would unlink it for every process when this one exits
+            shm = shared_memory.SharedMemory(name)
+            if name not in _created:
+                resource_tracker.unregister(shm._name, "shared_memory")
+            return shm
+
+    @property
+    def write_seq(self) -> int:
+        """Number of records committed since the ring was created"""
+        return int(self._header['write_seq'][0])
+
+    def write(self, quotes: Iterable, receive_ns: Optional[int] = None) -> None:
+        """Write quote objects. Only the owner process may write."""
+        self.write_records(quotes_to_records(quotes, receive_ns))
+
+    def write_records(self, records: np.ndarray) -> None:
+        """Write quote records, keeping the latest capacity records of a larger batch."""
+        if not records.size:
+            return
+
+        start = self.write_seq
+        end = start + records.size
+        records = records[-self.capacity:]
+        seqs = np.arange(end - records.size, end, dtype=np.uint64)
+
+        self._header['claim_seq'] = end
+        slots = seqs % self.capacity
+        self.records[slots] = records
+        self.records['seq'][slots] = seqs
+        self._header['write_seq'] = end
+
+    def reader(self, symbols: Optional[Iterable[str]] = None, from_start: bool = False) -> "RingCursor":
+        """Cursor over the records written from now on, or from the oldest record held."""
+        return RingCursor(self, symbols, from_start)
+
+    def close(self) -> None:
+        self.records = None
+        self._header = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Remove the shared memory block. Only the owner should unlink."""
+        self._shm.unlink()
+        _created.discard(self.name)
+
+
+class RingCursor:
+    """Read position of one consumer in a SharedQuoteRing."""
+
+    def __init__(self, ring: SharedQuoteRing, symbols: Optional[Iterable[str]] = None, from_start: bool = False) -> None:
+        self.ring = ring
+        self.symbols = np.array([symbol.encode() for symbol in symbols], dtype='S32') if symbols is not None else None
+        self.next_seq = max(ring.write_seq - ring.capacity, 0) if from_start else ring.write_seq
+        self.dropped = 0 # Records overwritten before they were read
+
+    def read(self) -> np.ndarray:
+        """Copy the records committed since the last read, filtered to the cursor's symbols.
+
+        Returns:
+            np.ndarray: Records of dtype QUOTE_RECORD in sequence order
+        """
+        ring = self.ring
+        end = ring.write_seq
+        if end - self.next_seq > ring.capacity:
+            self.dropped += end - ring.capacity - self.next_seq
+            self.next_seq = end - ring.capacity
+        if end == self.next_seq:
+            return np.empty(0, dtype=QUOTE_RECORD)
+
+        seqs = np.arange(self.next_seq, end, dtype=np.uint64)
+        records = ring.records[seqs % ring.capacity]
+
+        # Slots claimed by the writer during the copy may hold torn records
+        oldest_intact = max(int(ring._header['claim_seq'][0]) - ring.capacity, 0)
+        valid = (records['seq'] == seqs) & (seqs >= oldest_intact)
+        if not valid.all():
+            self.dropped += int((~valid).sum())
+            records = records[valid]
+
+        self.next_seq = end
+        if self.symbols is not None:
+            records = records[np.isin(records['symbol'], self.symbols)]
+        return records
+
+
+class SharedQuoteReader:
+    """Background thread handing the records of a SharedQuoteRing to a handler."""
+
+    def __init__(self, name: str, handler: Callable[[np.ndarray], None], symbols: Optional[Iterable[str]] = None, poll_interval: float = 0.001) -> None:
+        """Initialize the reader.
+
+        Args:
+            name (str): Shared memory block name of the ring
+            handler (Callable[[np.ndarray], None]): Called with each non-empty batch of records
+            symbols (Optional[Iterable[str]]): Symbols to read, all if None
+            poll_interval (float): Seconds between polls of the ring
+        """
+        self.name = name
+        self.handler = handler
+        self.symbols = list(symbols) if symbols is not None else None
+        self.poll_interval = poll_interval
+
+        self._ring = None
+        self._cursor = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def dropped(self) -> int:
+        return self._cursor.dropped if self._cursor is not None else 0
+
+    def start(self) -> None:
+        self._ring = SharedQuoteRing(self.name)
+        self._cursor = self._ring.reader(self.symbols)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="SharedQuoteReader", daemon=True)
+        self._thread.start()
+        logging.info(f"SharedQuoteReader: Reading {self.symbols or 'all symbols'} from ring {self.name}")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+
+    def _run(self) -> None:
+        dropped = 0
+        while not self._stop_event.wait(self.poll_interval):
+            records = self._cursor.read()
+            if records.size:
+                self.handler(records)
+
+            if self._cursor.dropped > dropped:
+                logging.warning(f"SharedQuoteReader: {self._cursor.dropped - dropped} quotes overwritten before they were read")
+                dropped = self._cursor.dropped
@@ -0,0 +1,122 @@
+import os
+import logging
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from src.utilities.timestamps import to_datetime_index, to_ns_array
+
+
+BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'trade_count', 'vwap']
+
+
+def bars_to_frame(bars: list) -> pd.DataFrame:
+    """Convert the bars of one symbol returned by the option market data API into a frame.
+
+    Args:
+        bars (list): Bars of a BarSet
+
+    Returns:
+        pd.DataFrame: Bars indexed by their UTC start time
+    """
+    df = pd.DataFrame({column: [getattr(bar, column) for bar in bars] for column in BAR_COLUMNS},
+                      index=pd.DatetimeIndex([bar.timestamp for bar in bars], name='datetime'),
+                      dtype=float)
+    df.index = pd.to_datetime(df.index, utc=True).as_unit('ns')
+    return df
+
+
+class WarmStartLoader:
+    """Loads the session-to-date history of option contracts to warm up market data.
+
+    Minute bars are fetched through the option market data API and cached in one
+    compressed .npz file per symbol and session date, holding one array per column.
+    Repeat calls are served from the cache, and only bars after the last cached bar
+    are fetched when the session has moved on.
+    """
+
+    def __init__(self, api, cache_dir: str) -> None:
+        """Initialize the loader.
+
+        Args:
+            api: AlpacaAPI instance with a connected option market data API
+            cache_dir (str): Directory of the bar cache
+        """
+        self.api = api
+        self.cache_dir = cache_dir
+
+    def cache_path(self, symbol: str, day) -> str:
+        """Path of the cached bars of a symbol on a session date."""
+        return os.path.join(self.cache_dir, f"bars_{symbol}_{day.strftime('%Y%m%d')}.npz")
+
+    def load_bars(self, symbol: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """Return the minute bars of a symbol between start and end.
+
+        Args:
+            symbol (str): Option symbol
+            start (pd.Timestamp): Session open
+            end (pd.Timestamp): End of the requested interval, usually now
+
+        Returns:
+            pd.DataFrame: Bars indexed by their UTC start time
+        """
+        path = self.cache_path(symbol, start)
+        bars, fetched_until_ns = self._read_cache(path)
+
+        if bars is None:
+            bars = self._fetch_bars(symbol, start, end)
+        elif fetched_until_ns < end.value:
+            # The last cached bar may have been incomplete, so it is fetched again
+            resume = bars.index[-1] if not bars.empty else start
+            bars = pd.concat([bars, self._fetch_bars(symbol, resume, end)])
+            bars = bars[~bars.index.duplicated(keep='last')]
+        else:
+            logging.info(f"WarmStartLoader: Serving {len(bars)} bars of {symbol} from {path}")
+            return bars[(bars.index >= start) & (bars.index < end)]
+
+        self._write_cache(path, bars, max(end.value, fetched_until_ns or 0))
+        return bars[(bars.index >= start) & (bars.index < end)]
+
+    def seed(self, mkt_data_state, symbols: List[str], start: pd.Timestamp, end: pd.Timestamp) -> None:
+        """Seed market data with the session-to-date bars and the latest quote of each symbol.
+
+        Args:
+            mkt_data_state: MktDataState to seed, before the live feed starts
+            symbols (List[str]): Option symbols
+            start (pd.Timestamp): Session open
+            end (pd.Timestamp): Current time
+        """
+        bars = {symbol: self.load_bars(symbol, start, end) for symbol in symbols}
+        quotes = self.api.get_option_latest_quotes(symbols)
+        mkt_data_state.seed(bars, list(quotes.values()))
+
+        msg = f"WarmStartLoader: Seeded {sum(len(df) for df in bars.values())} bars"
+        msg += f" and {len(quotes)} quotes for {symbols}"
+        logging.info(msg)
+
+    def _fetch_bars(self, symbol: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        barset = self.api.get_option_bars([symbol], start.to_pydatetime(), end.to_pydatetime())
+        bars = barset.data.get(symbol, [])
+        logging.info(f"WarmStartLoader: Fetched {len(bars)} bars of {symbol} from {start} to {end}")
+        return bars_to_frame(bars)
+
+    @staticmethod
+    def _read_cache(path: str) -> Tuple[Optional[pd.DataFrame], Optional[int]]:
+        if not os.path.exists(path):
+            return None, None
+
+        with np.load(path) as data:
+            index = to_datetime_index(data['timestamp']).rename('datetime')
+            df = pd.DataFrame({column: data[column] for column in BAR_COLUMNS}, index=index)
+            return df, int(data['fetched_until'])
+
+    def _write_cache(self, path: str, bars: pd.DataFrame, fetched_until_ns: int) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        columns = {column: bars[column].to_numpy(dtype=float) for column in BAR_COLUMNS}
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f,
+                                timestamp=to_ns_array(bars.index),
+                                fetched_until=np.int64(fetched_until_ns),
+                                **columns)
+        os.replace(tmp_path, path)
@@ -0,0 +1,156 @@
+import os
+import sqlite3
+import logging
+import pandas as pd
+from typing import Optional
+from src.utilities.timestamps import to_ns
+
+
+LEDGER_COLUMNS = [
+    "order_id",
+    "symbol",
+    "order_status",
+    "bucket_qty",
+    "fill_price",
+    "timestamp",
+    "reason"]
+
+
+class ClosedBucketsLedger:
+    """Append-only ledger of closed bucket events backed by SQLite in WAL mode.
+
+    Every fill or cancel processed by the PortfolioManager is appended as a new row
+    instead of rewriting a full CSV file. Rows are never updated in place, so a crash
+    can at most lose the event being written. Indexes on symbol and order status keep
+    the queries used on start-up cheap as the ledger grows.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the ledger. The database is only opened on first use.
+
+        Args:
+            path (str): Path to the SQLite database file
+        """
+        self.path = path
+        self._conn = None
+
+    def exists(self) -> bool:
+        """Check if the ledger file exists on disk.
+
+        Returns:
+            bool: True if the ledger file exists, False otherwise
+        """
+        return os.path.exists(self.path)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use and create the schema if needed.
+
+        Returns:
+            sqlite3.Connection: Open connection to the ledger
+        """
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # The orchestrator loop and the websocket handlers run on different threads
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS closed_buckets (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    bucket_idx INTEGER NOT NULL,
+                    order_id TEXT,
+                    symbol TEXT NOT NULL,
+                    order_status TEXT NOT NULL,
+                    bucket_qty REAL,
+                    fill_price REAL,
+                    timestamp INTEGER,
+                    reason TEXT
+                )""")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_closed_buckets_symbol_status "
+                "ON closed_buckets (symbol, order_status)")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_closed_buckets_status "
+                "ON closed_buckets (order_status)")
+            self._conn.commit()
+
+        return self._conn
+
+    def append(self,
+               bucket_idx: int,
+               order_id,
+               symbol: str,
+               order_status: str,
+               bucket_qty,
+               fill_price,
+               timestamp,
+               reason: str) -> None:
+        """Append a closed bucket event to the ledger in its own transaction.
+
+        Args:
+            bucket_idx (int): Index of the sell bucket the order belongs to
+            order_id: Broker order id
+            symbol (str): Instrument symbol
+            order_status (str): Order status (e.g. 'filled', 'cancelled')
+            bucket_qty: Quantity of the order
+            fill_price: Average fill price, None if not filled
+            timestamp: Time the event was processed, stored as UTC nanoseconds
+            reason (str): Reason the bucket was closed
+        """
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT INTO closed_buckets "
+                "(bucket_idx, order_id, symbol, order_status, bucket_qty, fill_price, timestamp, reason) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (int(bucket_idx),
+                 None if order_id is None else str(order_id),
+                 symbol,
+                 str(order_status),
+                 None if bucket_qty is None else float(bucket_qty),
+                 None if fill_price is None else float(fill_price),
+                 None if timestamp is None else to_ns(timestamp),
+                 reason))
+
+        logging.debug(f"Ledger: Appended {order_status} order {order_id} for {symbol} at bucket {bucket_idx}")
+
+    def query(self, symbol: Optional[str] = None, order_status: Optional[str] = None) -> pd.DataFrame:
+        """Query ledger events, optionally filtered by symbol and order status.
+
+        Args:
+            symbol (Optional[str]): Only return events for this symbol
+            order_status (Optional[str]): Only return events with this order status
+
+        Returns:
+            pd.DataFrame: Matching events in insertion order, indexed by bucket index
+        """
+        clauses = []
+        params = []
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if order_status is not None:
+            clauses.append("order_status = ?")
+            params.append(order_status)
+
+        sql = f"SELECT bucket_idx, {', '.join(LEDGER_COLUMNS)} FROM closed_buckets"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY seq"
+
+        rows = self._connection().execute(sql, params).fetchall()
+        df = pd.DataFrame(rows, columns=["bucket_idx"] + LEDGER_COLUMNS)
+        # Ledgers written before timestamps were stored as nanoseconds hold text timestamps
+        df["timestamp"] = pd.array([None if ts is None else to_ns(ts) for ts in df["timestamp"]], dtype="Int64")
+        df.set_index("bucket_idx", inplace=True)
+        df.index.name = None
+        return df
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,138 @@
+import logging
+from typing import Dict, Iterable, Tuple
+from src.api.api_utils import round_to_tick
+from src.portfolio.portfolio_manager import CANCELLED_STATUSES
+from src.utilities.enums import Signal
+from src.utilities.timestamps import now_ns
+
+
+class LimitLadder:
+    """Resting limit sells at the profit target of every open sell bucket.
+
+    Each bucket's order rests at the broker, so a crossing bid fills it without a
+    detect-and-submit round trip from the engine. Fills and cancels arrive through the
+    portfolio manager's trade updates and are recorded in the ledger bucket by bucket.
+    A bucket whose order is cancelled, expired or rejected is posted again. After
+    switch_to_market() the remaining orders are cancelled and their buckets closed with
+    market orders instead.
+    """
+
+    def __init__(self, api, portfolio_manager, symbol: str) -> None:
+        """Initialize the ladder.
+
+        Args:
+            api: AlpacaAPI the orders are placed with
+            portfolio_manager: PortfolioManager tracking the orders and the ledger
+            symbol (str): Option symbol of the position
+        """
+        self.api = api
+        self.portfolio_manager = portfolio_manager
+        self.symbol = symbol
+        self.market = False
+
+        self._quantities: Dict[int, int] = {} # Bucket idx -> quantity left to sell
+        self._prices: Dict[int, float] = {} # Bucket idx -> limit price
+        self._resting: Dict[int, object] = {} # Bucket idx -> working order
+
+    @property
+    def open_buckets(self) -> list:
+        """Buckets not filled yet"""
+        return sorted(self._quantities)
+
+    def post(self, buckets: Iterable[Tuple[int, int, float]]) -> None:
+        """Place a limit sell for each bucket.
+
+        Open sell orders of the symbol left at the broker, e.g. by a previous session,
+        are cancelled first so the position is never offered twice.
+
+        Args:
+            buckets (Iterable[Tuple[int, int, float]]): (bucket idx, quantity, profit target level) of the open buckets
+        """
+        for order in self.api.get_orders(Signal.SELL, "open"):
+            if order.symbol == self.symbol:
+                logging.warning(f"LimitLadder: Cancelling open sell order {order.id} for {order.qty} {self.symbol}")
+                self.api.cancel_order_by_id(order.id)
+
+        for idx, qty, target in buckets:
+            self._quantities[idx] = qty
+            self._prices[idx] = round_to_tick(target, Signal.SELL)
+            self._place(idx)
+
+    def reprice(self, targets: Dict[int, float]) -> None:
+        """Move the resting orders to new profit target levels.
+
+        Orders whose price changes are cancelled and posted again at the new price once
+        the cancel is confirmed.
+
+        Args:
+            targets (Dict[int, float]): Profit target level of each bucket
+        """
+        for idx, target in targets.items():
+            price = round_to_tick(target, Signal.SELL)
+            if idx in self._quantities and price != self._prices[idx]:
+                logging.info(f"LimitLadder: Repricing bucket {idx} from {self._prices[idx]} to {price}")
+                self._prices[idx] = price
+                self._cancel(idx)
+
+    def switch_to_market(self) -> None:
+        """Close the open buckets with market orders, as on the expiry cutoff."""
+        if self.market:
+            return
+        self.market = True
+        logging.info(f"LimitLadder: Switching buckets {self.open_buckets} of {self.symbol} to market orders")
+        for idx in self.open_buckets:
+            self._cancel(idx)
+
+    def cancel(self) -> None:
+        """Cancel the resting orders, e.g. on shutdown."""
+        for idx in list(self._resting):
+            self._cancel(idx)
+
+    def process(self) -> bool:
+        """Handle the orders that reached a final status since the last call.
+
+        Returns:
+            bool: True once every bucket is filled
+        """
+        for idx, order in list(self._resting.items()):
+            latest = self.portfolio_manager.latest_order(order.id)
+            if latest is None or (latest.status != "filled" and latest.status not in CANCELLED_STATUSES):
+                continue
+
+            del self._resting[idx]
+            if self.portfolio_manager.process_order(order.id):
+                logging.info(f"LimitLadder: Bucket {idx} of {self.symbol} filled")
+                del self._quantities[idx]
+                continue
+
+            # Contracts sold before the cancel are not offered again
+            filled_qty = int(float(getattr(latest, "filled_qty", None) or 0))
+            self._quantities[idx] -= filled_qty
+            if self._quantities[idx] <= 0:
+                del self._quantities[idx]
+                continue
+
+            logging.info(f"LimitLadder: Order {order.id} of bucket {idx} {latest.status}. Posting {self._quantities[idx]} again")
+            self._place(idx)
+
+        return not self._quantities
+
+    def _place(self, idx: int) -> None:
+        submitted_ns = now_ns()
+        if self.market:
+            order = self.api.close_position_by_id(self.symbol, str(self._quantities[idx]))
+        else:
+            order = self.api.place_limit_order(self.symbol, self._quantities[idx], Signal.SELL, self._prices[idx])
+
+        self.portfolio_manager.register_order(order, idx, submitted_ns)
+        self._resting[idx] = order
+
+    def _cancel(self, idx: int) -> None:
+        order = self._resting.get(idx)
+        if order is None:
+            return
+        try:
+            self.api.cancel_order_by_id(order.id)
+        except Exception as e:
+            # The order may have filled in the meantime, its trade update settles the bucket
+            logging.warning(f"LimitLadder: Failed to cancel order {order.id} of bucket {idx}: {e}")
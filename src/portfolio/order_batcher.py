@@ -0,0 +1,97 @@
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
+from src.utilities.metrics import REGISTRY
+
+
+CLOSE_INTENTS = REGISTRY.counter("portfolio_close_intents_total", "Bucket close intents submitted to the order batcher")
+BATCHED_ORDERS = REGISTRY.counter("portfolio_batched_orders_total", "Close orders placed by the order batcher")
+
+
+class CloseIntent(NamedTuple):
+    """Request to close one sell bucket of a position"""
+    symbol: str
+    qty: int
+    bucket_idx: int
+
+
+class OrderBatcher:
+    """Merge bucket close intents raised within a short window into one order per symbol.
+
+    Intents are collected with add() and sent by flush(). With a single producer every
+    intent of a decision is added before it flushes, so flush sends at once. With more
+    producers, flush waits until the window opened by the first pending intent has
+    elapsed, so intents raised by the others in the meantime join the batch. Intents of
+    the same symbol become a single close order for their total quantity, and the orders
+    of different symbols are placed concurrently, so the exit takes one REST round trip
+    however many buckets or positions triggered together.
+    """
+
+    def __init__(self, api, window: float = 0.05, max_workers: int = 4, producers: int = 1) -> None:
+        """Initialize the batcher.
+
+        Args:
+            api: AlpacaAPI the close orders are placed with
+            window (float): Seconds intents are collected for before they are sent, with several producers
+            max_workers (int): Orders of different symbols placed at the same time
+            producers (int): Threads adding intents
+        """
+        self.api = api
+        self.window = window
+        self.producers = producers
+
+        self._pending: List[CloseIntent] = []
+        self._opened: Optional[float] = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="OrderBatcher")
+
+    def add(self, symbol: str, qty: int, bucket_idx: int) -> None:
+        """Queue a bucket close until the next flush."""
+        with self._lock:
+            if not self._pending:
+                self._opened = time.monotonic()
+            self._pending.append(CloseIntent(symbol, qty, bucket_idx))
+        CLOSE_INTENTS.inc()
+
+    def flush(self) -> List[Tuple[object, List[CloseIntent]]]:
+        """Place the merged orders of the pending intents, after the window with several producers.
+
+        Orders that fail are logged and their intents dropped, so the buckets stay open
+        and can be closed again.
+
+        Returns:
+            List[Tuple[object, List[CloseIntent]]]: Each placed order with the intents it closes,
+                in the order the symbols were first added
+        """
+        with self._lock:
+            opened = self._opened
+        # Other producers may still add intents until the window has elapsed
+        if opened is not None and self.producers > 1:
+            time.sleep(max(opened + self.window - time.monotonic(), 0))
+
+        with self._lock:
+            pending, self._pending, self._opened = self._pending, [], None
+
+        batches = {}
+        for intent in pending:
+            batches.setdefault(intent.symbol, []).append(intent)
+
+        futures = [(self._executor.submit(self.api.close_position_by_id, symbol, str(sum(intent.qty for intent in intents))), intents)
+                   for symbol, intents in batches.items()]
+
+        placed = []
+        for future, intents in futures:
+            try:
+                placed.append((future.result(), intents))
+            except Exception as e:
+                logging.error(f"OrderBatcher: Failed to close {intents[0].symbol} buckets {[intent.bucket_idx for intent in intents]}: {e}")
+
+        BATCHED_ORDERS.inc(len(placed))
+        if len(pending) > len(batches):
+            logging.info(f"OrderBatcher: Merged {len(pending)} close intents into {len(batches)} orders")
+        return placed
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
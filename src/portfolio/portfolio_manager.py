@@ -2,8 +2,26 @@ import pandas as pd
 import os
 import queue
 from src.configuration import Configuration
+from src.portfolio.closed_buckets_ledger import ClosedBucketsLedger, LEDGER_COLUMNS
+from src.portfolio.order_batcher import OrderBatcher
 import logging
 import time
+import threading
+from types import SimpleNamespace
+from src.utilities.timestamps import now_ns
+from src.utilities.metrics import REGISTRY
+
+
+ORDERS_PENDING = REGISTRY.gauge("portfolio_orders_pending", "Orders placed and not handled yet")
+ORDER_ACK_SECONDS = REGISTRY.histogram(
+    "portfolio_order_ack_seconds",
+    "Seconds from order submission to its first trade update",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+
+# Final statuses of orders that did not fill. The broker reports cancels as "canceled"
+CANCELLED_STATUSES = ("cancelled", "canceled", "expired", "rejected")
+# Ledger status of a bucket's contracts sold by an order cancelled before it filled the bucket
+PARTIALLY_FILLED = "partially_filled"
 
 
 class PortfolioManager:
@@ -15,68 +33,136 @@ class PortfolioManager:
         self.orders = [] # (order, order idx, handled) - handled is a boolean to check if the order has been processed to csv
         self._order_statuses = {}
         self._trade_data = queue.Queue()
+        self._submitted_ns = {} # order id -> submission time, until the first trade update
+        self._allocations = {} # order id -> [(bucket idx, bucket qty)] of orders closing several buckets
+        self._latest_order_ids = [] # Orders placed by the latest close, several when batched
+        self._filled_buckets = set() # Bucket idx filled, in this session or before a restart
+        self._partial_fills = {} # Bucket idx -> contracts sold by cancelled orders of buckets not filled yet
+        self.order_updated = threading.Event() # Set on every trade update
+
+        self.closed_buckets = pd.DataFrame(columns = LEDGER_COLUMNS)
+        self.ledger = ClosedBucketsLedger(os.path.join("output", "positions_closed.db"))
 
-        self.closed_buckets = pd.DataFrame(columns = [
-            "order_id",
-            "symbol", 
-            "order_status", 
-            "bucket_qty", 
-            "fill_price", 
-            "timestamp",
-            "reason"])
-        self._starting_idx = 0
+        self.journal = None # Optional RecoveryStore the portfolio events are journaled to
+        self.reconciler = None # Optional PositionReconciler fed with trade update fills
+        # The trading loop is the batcher's only producer, so its orders are sent without a collection window
+        self.batcher = OrderBatcher(api) if config.batch_orders else None
+
+        ORDERS_PENDING.set_function(lambda: sum(not handled for _, _, handled in self.orders))
 
     @property
-    def starting_idx(self):
-        return self._starting_idx
+    def filled_buckets(self):
+        """Filled bucket idx in ascending order. Buckets fill out of order, so there may be gaps"""
+        return sorted(self._filled_buckets)
     
     def close_position_by_id(self, symbol, qty, idx):
+        submitted_ns = now_ns()
         order = self.api.close_position_by_id(symbol, str(qty))
 
-        self.orders.append((order, idx, False))
+        self.register_order(order, idx, submitted_ns)
+        self._latest_order_ids = [order.id]
         self.wait_for_order_response(order.id, self.config.timeout)
 
+    def register_order(self, order, idx, submitted_ns):
+        """Track an order placed for a bucket, without waiting for it"""
+        # The first trade update may arrive before the REST call returns
+        self._submitted_ns[order.id] = submitted_ns
+        if order.id in self._order_statuses:
+            self._observe_ack(order.id)
+
+        self.orders.append((order, idx, False))
+        self._journal_event("portfolio.order_placed", (order, idx))
+
+    def latest_order(self, order_id):
+        """Latest state of an order from the trade updates, None before its first update"""
+        data = self._order_statuses.get(order_id)
+        return data.order if data is not None else None
+
+    def close_buckets(self, intents):
+        """Close several buckets through the order batcher.
+
+        Buckets of the same symbol are closed by one order, and the fills of that order
+        are allocated back to the buckets in the order given.
+
+        Args:
+            intents: (symbol, qty, bucket idx) of each bucket to close
+        """
+        submitted_ns = now_ns()
+        for symbol, qty, idx in intents:
+            self.batcher.add(symbol, qty, idx)
+
+        placed = self.batcher.flush()
+        for order, batch in placed:
+            self._submitted_ns[order.id] = submitted_ns
+            if order.id in self._order_statuses:
+                self._observe_ack(order.id)
+
+            allocations = [(intent.bucket_idx, intent.qty) for intent in batch]
+            self._place_batched_order(order, allocations)
+            self._journal_event("portfolio.order_batched", (order, allocations))
+
+        self._latest_order_ids = [order.id for order, _ in placed]
+        for order, _ in placed:
+            self.wait_for_order_response(order.id, self.config.timeout)
+
+    def _place_batched_order(self, order, allocations):
+        if len(allocations) > 1:
+            self._allocations[order.id] = allocations
+        for idx, _ in allocations:
+            self.orders.append((order, idx, False))
+
+    def bucket_filled(self, idx):
+        """Check if a bucket has been closed by a filled order"""
+        return idx in self._filled_buckets
+
+    def bucket_remaining(self, idx, qty):
+        """Quantity of a bucket of qty contracts left to sell after the partial fills of cancelled orders"""
+        return qty - self._partial_fills.get(idx, 0)
+
     def process_latest_order(self):
-        """Process the latest order"""
+        """Process the orders of the latest close
+
+        Returns:
+            bool: True if an order filled a bucket
+        """
         if not self.orders:
             return False
-        
-        placed_order, order_idx, handled = self.orders[-1]
-        order = self._order_statuses[placed_order.id].order
 
-        if order.status == "filled" and not handled:
+        filled = False
+        for order_id in self._latest_order_ids or [self.orders[-1][0].id]:
+            filled |= self.process_order(order_id)
+        return filled
 
-            logging.debug(f"PtfMgr: Adding filled order {order.id} at idx {order_idx} to csv")
+    def process_order(self, order_id):
+        """Record a filled or cancelled order in the ledger once
 
-            self.closed_buckets.loc[order_idx] = [
-                order.id, 
-                order.symbol,
-                order.status, 
-                order.qty,
-                order.filled_avg_price,
-                pd.Timestamp.now(tz=self.config.timezone),
-                "profit_target"]
-            
-            self.closed_buckets.to_csv(os.path.join("output", "positions_closed.csv"), index=False)
-            self.orders[-1] = (order, order_idx, True)
+        Returns:
+            bool: True if the order filled a bucket
+        """
+        order_idx, handled = next((idx, handled) for order, idx, handled in reversed(self.orders) if order.id == order_id)
+        order = self._order_statuses[order_id].order
+
+        if order.id in self._allocations and not handled and (order.status == "filled" or order.status in CANCELLED_STATUSES):
+            return self._record_allocations(order, self._allocations.pop(order.id))
+
+        elif order.status == "filled" and not handled:
+
+            logging.debug(f"PtfMgr: Adding filled order {order.id} at idx {order_idx} to ledger")
+
+            self._record_closed_bucket(order, order_idx, "profit_target")
 
             return True
         
-        elif order.status == "cancelled" and not handled:
+        elif order.status in CANCELLED_STATUSES and not handled:
 
-            logging.debug(f"PtfMgr: Adding cancelled order {order.id} at idx {order_idx} to csv")
+            logging.debug(f"PtfMgr: Adding cancelled order {order.id} at idx {order_idx} to ledger")
 
-            self.closed_buckets.loc[order_idx] = [
-            order.id, 
-            order.symbol,
-            order.status, 
-            order.qty, 
-            order.filled_avg_price,
-            pd.Timestamp.now(tz=self.config.timezone),
-            "profit_target"]
-        
-            self.closed_buckets.to_csv(os.path.join("output", "positions_closed.csv"), index=False)
-            self.orders[-1] = (order, order_idx, True)
+            filled_qty = int(float(getattr(order, "filled_qty", None) or 0))
+            if filled_qty > 0:
+                logging.warning(f"PtfMgr: Order {order.id} {order.status} after selling {filled_qty} of {order.qty} in bucket {order_idx}")
+                self._record_closed_bucket(order, order_idx, "profit_target", PARTIALLY_FILLED, filled_qty)
+            else:
+                self._record_closed_bucket(order, order_idx, "profit_target")
 
             return False #If an order is cancelled, we need to reprocess the bucket
         
@@ -84,6 +170,64 @@ class PortfolioManager:
             
             return False
     
+    def _record_allocations(self, order, allocations):
+        """Allocate the fills of an order closing several buckets, in bucket order
+
+        A bucket is filled once its whole quantity is allocated. The others are recorded
+        as cancelled so they are closed again, a bucket allocated part of the fills as
+        partially filled so only its remaining quantity is.
+
+        Returns:
+            bool: True if a bucket was filled
+        """
+        remaining = float(order.qty if order.status == "filled" else getattr(order, "filled_qty", None) or 0)
+
+        filled = False
+        for idx, qty in allocations:
+            if remaining >= qty:
+                self._record_closed_bucket(order, idx, "profit_target", "filled", qty)
+                filled = True
+            else:
+                if remaining > 0:
+                    logging.warning(f"PtfMgr: Order {order.id} filled {remaining} of {qty} in bucket {idx}")
+                    self._record_closed_bucket(order, idx, "profit_target", PARTIALLY_FILLED, int(remaining))
+                else:
+                    self._record_closed_bucket(order, idx, "profit_target", "cancelled", qty)
+            remaining -= min(remaining, qty)
+
+        return filled
+
+    def _record_closed_bucket(self, order, order_idx, reason, status=None, qty=None):
+        """Record a processed order in memory and append it to the ledger
+
+        status and qty default to the order's, and are given when an order closes several buckets.
+        """
+        timestamp = now_ns()
+        status = status or order.status
+        row = [
+            order.id, 
+            order.symbol,
+            status, 
+            float(qty if qty is not None else order.qty), # As stored in the ledger, a bucket's rows mix order and fill quantities
+            order.filled_avg_price if status in ("filled", PARTIALLY_FILLED) or qty is None else None,
+            timestamp,
+            reason]
+
+        self.closed_buckets.loc[order_idx] = row
+        self._count_closed_bucket(order_idx, status, row[3])
+        position = next(pos for pos in range(len(self.orders) - 1, -1, -1)
+                        if self.orders[pos][0].id == order.id and self.orders[pos][1] == order_idx)
+        self.orders[position] = (order, order_idx, True)
+        self.ledger.append(order_idx, *row)
+        self._journal_event("portfolio.order_handled", (order, order_idx, row))
+
+    def _count_closed_bucket(self, order_idx, status, qty):
+        if status == "filled":
+            self._filled_buckets.add(order_idx)
+            self._partial_fills.pop(order_idx, None)
+        elif status == PARTIALLY_FILLED:
+            self._partial_fills[order_idx] = self._partial_fills.get(order_idx, 0) + int(float(qty))
+
     def latest_order_pending(self):
         if not self.orders:
             return False
@@ -92,15 +236,29 @@ class PortfolioManager:
         order_status = self._order_statuses[order_id].order.status
 
         if (order_status != 'filled' and
-            order_status != 'cancelled'):
+            order_status not in CANCELLED_STATUSES):
 
                     return True
                 
         return False
 
     def populate_from_csv(self):
-        logging.info("PortfolioManager: Populating orders from csv.")
+        logging.info("PortfolioManager: Populating orders from ledger or csv.")
         
+        # The ledger supersedes positions_closed.csv, which is only read for older sessions
+        if self.ledger.exists():
+
+            loaded_buckets_closed = self.ledger.query(symbol=self.config.instrument_id, order_status='filled')
+            logging.info(f"Loaded existing ledger {self.ledger.path} with {len(loaded_buckets_closed)} records: {loaded_buckets_closed}")
+            self._load_closed_buckets(loaded_buckets_closed)
+
+            partial_fills = self.ledger.query(symbol=self.config.instrument_id, order_status=PARTIALLY_FILLED)
+            sold = partial_fills[~partial_fills.index.isin(loaded_buckets_closed.index)].groupby(level=0)['bucket_qty'].sum()
+            self._partial_fills = {int(idx): int(qty) for idx, qty in sold.items()}
+            if self._partial_fills:
+                logging.info(f"Contracts sold by partially filled orders of open buckets: {self._partial_fills}")
+            return
+
         # Check if positions_closed.csv exists and load it
         positions_closed_path = os.path.join("output", "positions_closed.csv")
         if os.path.exists(positions_closed_path):
@@ -109,29 +267,44 @@ class PortfolioManager:
 
             query = (loaded_buckets_closed['symbol'] == self.config.instrument_id) & \
                     (loaded_buckets_closed['order_status'] == 'filled')
-            loaded_buckets_closed = loaded_buckets_closed[query]
+            # Older sessions filled the buckets in order and did not store their idx
+            loaded_buckets_closed = loaded_buckets_closed[query].reset_index(drop=True)
 
             logging.info(f"Loaded existing positions_closed.csv with {len(loaded_buckets_closed)} records: {loaded_buckets_closed}")
-            logging.info(f"{len(loaded_buckets_closed)} positions have been closed with a total qty {sum(loaded_buckets_closed['bucket_qty'])} sold")
+            self._load_closed_buckets(loaded_buckets_closed)
 
-            self._starting_idx = len(loaded_buckets_closed)
+    def _load_closed_buckets(self, loaded_buckets_closed):
+        """Restore the filled buckets from previously filled orders, indexed by bucket idx"""
+        logging.info(f"{len(loaded_buckets_closed)} positions have been closed with a total qty {sum(loaded_buckets_closed['bucket_qty'])} sold")
 
-            missing = [col for col in self.closed_buckets.columns if col not in loaded_buckets_closed.columns]
-            if missing:
-                logging.error(f"Missing columns in loaded positions_closed.csv: {missing}")
-            else:
-                self.closed_buckets = loaded_buckets_closed
+        self._filled_buckets = {int(idx) for idx in loaded_buckets_closed.index}
+
+        missing = [col for col in self.closed_buckets.columns if col not in loaded_buckets_closed.columns]
+        if missing:
+            logging.error(f"Missing columns in loaded closed buckets: {missing}")
+        else:
+            self.closed_buckets = loaded_buckets_closed
 
     async def update_order_status(self, data):
         """Update order status"""
         # logging.debug(f"Order update received from WS. Id: {data.order.id}. Status: {data.order.status}")
         self._order_statuses[data.order.id] = data
+        self._observe_ack(data.order.id)
+        self._journal_event("portfolio.order_update", data)
+        if self.reconciler is not None:
+            self.reconciler.on_trade_update(data)
+        self.order_updated.set()
 
     async def update_trade_data(self, data):
         """Update trade data from WS"""
         # logging.debug(f"Trade data received from WS: {data}")
         self._trade_data.put(data)
 
+    def _observe_ack(self, order_id):
+        submitted_ns = self._submitted_ns.pop(order_id, None)
+        if submitted_ns is not None:
+            ORDER_ACK_SECONDS.observe((now_ns() - submitted_ns) / 1e9)
+
     def wait_for_order_response(self, order_id, timeout):
         cur_timeout = timeout
         while cur_timeout > 0:
@@ -140,4 +313,67 @@ class PortfolioManager:
                 time.sleep(1)
             else:
                 break
-        
+
+    def _journal_event(self, kind, payload):
+        if self.journal is not None:
+            self.journal.append(kind, payload)
+
+    def snapshot_state(self) -> dict:
+        """Return the state needed to resume the portfolio after a restart"""
+        return {
+            "orders": list(self.orders),
+            "order_statuses": dict(self._order_statuses),
+            "closed_buckets": self.closed_buckets.copy(),
+            "allocations": dict(self._allocations),
+            "filled_buckets": set(self._filled_buckets),
+            "partial_fills": dict(self._partial_fills),
+        }
+
+    def restore_state(self, state: dict) -> None:
+        """Restore the portfolio from a snapshot"""
+        self.orders = list(state["orders"])
+        self._order_statuses = dict(state["order_statuses"])
+        self.closed_buckets = state["closed_buckets"]
+        self._allocations = dict(state.get("allocations", {}))
+        self._latest_order_ids = []
+        # Snapshots written before partial fills were recorded have none
+        self._partial_fills = dict(state.get("partial_fills", {}))
+        if "filled_buckets" in state:
+            self._filled_buckets = set(state["filled_buckets"])
+        else:
+            # Snapshots written before the filled buckets were kept, closed_buckets is indexed by bucket idx
+            filled = self.closed_buckets[self.closed_buckets['order_status'] == 'filled']
+            self._filled_buckets = {int(idx) for idx in filled.index}
+
+    def apply_event(self, event: str, payload) -> None:
+        """Replay a journaled portfolio event"""
+        if event == "order_placed":
+            order, idx = payload
+            self.orders.append((order, idx, False))
+            self._latest_order_ids = [order.id]
+
+        elif event == "order_batched":
+            order, allocations = payload
+            self._place_batched_order(order, allocations)
+            self._latest_order_ids = [order.id]
+
+        elif event == "order_update":
+            self._order_statuses[payload.order.id] = payload
+
+        elif event == "order_handled":
+            order, order_idx, row = payload
+            self.closed_buckets.loc[order_idx] = row
+            self._allocations.pop(order.id, None)
+            self._count_closed_bucket(order_idx, row[2], row[3])
+            self.orders = [(o, i, True) if o.id == order.id else (o, i, h) for o, i, h in self.orders]
+
+        else:
+            logging.warning(f"PtfMgr: Unknown journal event {event}")
+
+    def refresh_order_statuses(self):
+        """Fetch the status of unhandled orders missed while the process was down"""
+        for order, idx, handled in self.orders:
+            if not handled:
+                latest = self.api.get_order_by_id(order.id)
+                logging.info(f"PtfMgr: Refreshed order {order.id} at idx {idx}. Status: {latest.status}")
+                self._order_statuses[order.id] = SimpleNamespace(order=latest)
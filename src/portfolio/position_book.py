@@ -0,0 +1,276 @@
+import os
+import csv
+import math
+import numpy as np
+from configparser import ConfigParser
+from typing import List, NamedTuple, Optional, Sequence
+
+
+CLOSE_STRATEGIES = ('risk_on', 'risk_off')
+POSITION_FIELDS = ('quantity', 'profit_targets', 'sell_buckets', 'close_strategy', 'expiry_sell_cutoff')
+SECTION_PREFIX = 'Position '
+
+
+class PositionSpec(NamedTuple):
+    """One position as written in the configuration, before validation.
+
+    fields maps POSITION_FIELDS to their raw string values. Missing or empty fields
+    take the defaults of the [Trading] and [Risk_Management] sections.
+    """
+    source: str
+    symbol: str
+    fields: dict
+
+
+def position_sections(config: ConfigParser) -> List[PositionSpec]:
+    """Read the [Position <symbol>] sections of a configuration, in file order.
+
+    Args:
+        config (ConfigParser): Parsed configuration file
+
+    Returns:
+        List[PositionSpec]: One spec per section
+    """
+    return [PositionSpec(f"[{section}]", section[len(SECTION_PREFIX):].strip(), dict(config.items(section)))
+            for section in config.sections() if section.startswith(SECTION_PREFIX)]
+
+
+def read_positions_file(path: str) -> List[PositionSpec]:
+    """Read a CSV positions table with a symbol column and any of POSITION_FIELDS.
+
+    Profit targets are comma separated within their cell, so the cell is quoted.
+
+    Args:
+        path (str): Path to the CSV file
+
+    Returns:
+        List[PositionSpec]: One spec per row
+
+    Raises:
+        ValueError: If the file does not exist or has no symbol column
+    """
+    if not os.path.exists(path):
+        raise ValueError(f"Positions file {path} not found")
+
+    name = os.path.basename(path)
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f, skipinitialspace=True)
+        if 'symbol' not in (reader.fieldnames or []):
+            raise ValueError(f"Positions file {path} has no symbol column")
+
+        return [PositionSpec(f"{name}:{reader.line_num}",
+                             (row.pop('symbol') or '').strip(),
+                             {key: value for key, value in row.items() if key is not None})
+                for row in reader]
+
+
+def bucket_quantities(quantity: np.ndarray, sell_buckets: np.ndarray, risk_off: np.ndarray) -> np.ndarray:
+    """Split every position quantity into its sell buckets at once.
+
+    Rows follow quantity_buckets, with the runners in the last bucket of each position.
+    A single contract is a runner.
+
+    Args:
+        quantity (np.ndarray): Position quantities
+        sell_buckets (np.ndarray): Number of buckets of each position
+        risk_off (np.ndarray): True where the position rounds up, False where it rounds down
+
+    Returns:
+        np.ndarray: Bucket quantities of shape (positions, max sell_buckets), zero padded
+    """
+    rows = np.arange(len(quantity))
+    last = sell_buckets - 1
+    per_bucket = np.where(risk_off, -(-quantity // sell_buckets), quantity // sell_buckets)
+
+    buckets = np.where(np.arange(sell_buckets.max(initial=1)) < sell_buckets[:, None], per_bucket[:, None], 0)
+    buckets[rows, last] = quantity - per_bucket * last
+
+    single = quantity == 1
+    buckets[single] = 0
+    buckets[rows[single], last[single]] = 1
+    return buckets
+
+
+class PositionBook:
+    """Validated positions compiled into per-position parameter arrays.
+
+    Row i of every array describes symbols[i]. Profit targets are NaN padded and bucket
+    quantities zero padded to the largest number of buckets, so the engine iterates the
+    book by row without looking anything up by name.
+    """
+
+    def __init__(self,
+                 symbols: Sequence[str],
+                 quantity: np.ndarray,
+                 profit_targets: np.ndarray,
+                 sell_buckets: np.ndarray,
+                 close_strategy: np.ndarray,
+                 expiry_sell_cutoff: np.ndarray) -> None:
+        """Initialize the book from compiled arrays. Use compile() to build it from specs.
+
+        Args:
+            symbols (Sequence[str]): Option symbols
+            quantity (np.ndarray): Starting position quantities
+            profit_targets (np.ndarray): Profit targets of shape (positions, max targets), NaN padded
+            sell_buckets (np.ndarray): Number of sell buckets, the last one holding the runners
+            close_strategy (np.ndarray): Indices into CLOSE_STRATEGIES
+            expiry_sell_cutoff (np.ndarray): Minutes before the close at which positions are closed on expiry day
+        """
+        self.symbols = tuple(symbols)
+        self.quantity = quantity
+        self.profit_targets = profit_targets
+        self.sell_buckets = sell_buckets
+        self.close_strategy = close_strategy
+        self.expiry_sell_cutoff = expiry_sell_cutoff
+        self.target_count = sell_buckets - 1
+        self.bucket_quantities = bucket_quantities(quantity, sell_buckets, close_strategy == CLOSE_STRATEGIES.index('risk_off'))
+        self._rows = {symbol: row for row, symbol in enumerate(self.symbols)}
+
+    @classmethod
+    def compile(cls, specs: Sequence[PositionSpec], defaults: dict) -> "PositionBook":
+        """Validate position specs in one pass and compile them.
+
+        Args:
+            specs (Sequence[PositionSpec]): Positions in book order
+            defaults (dict): Values of the fields a spec leaves empty, keyed by field. profit_targets
+                is a list of floats, sell_buckets and expiry_sell_cutoff are ints
+
+        Returns:
+            PositionBook: Compiled book
+
+        Raises:
+            ValueError: Listing every invalid position, or if there are no positions
+        """
+        errors = []
+        rows = []
+        seen = set()
+
+        for spec in specs:
+            row_errors = []
+            fields = {key: value.strip() for key, value in spec.fields.items() if value is not None and value.strip()}
+
+            if not spec.symbol:
+                row_errors.append("symbol is empty")
+            elif spec.symbol in seen:
+                row_errors.append(f"duplicate position {spec.symbol}")
+            seen.add(spec.symbol)
+
+            unknown = sorted(set(fields) - set(POSITION_FIELDS))
+            if unknown:
+                row_errors.append(f"unknown fields {', '.join(unknown)}")
+
+            quantity = _parse(fields, 'quantity', int, None, row_errors)
+            sell_buckets = _parse(fields, 'sell_buckets', int, defaults['sell_buckets'], row_errors)
+            expiry_sell_cutoff = _parse(fields, 'expiry_sell_cutoff', int, defaults['expiry_sell_cutoff'], row_errors)
+            profit_targets = _parse(fields, 'profit_targets', lambda value: [float(target) for target in value.split(',')],
+                                    defaults['profit_targets'], row_errors)
+            close_strategy = fields.get('close_strategy', defaults['close_strategy'])
+
+            if 'quantity' not in fields:
+                row_errors.append("quantity is required")
+            elif quantity is not None and quantity <= 0:
+                row_errors.append(f"quantity must be positive, got {quantity}")
+
+            if close_strategy not in CLOSE_STRATEGIES:
+                row_errors.append(f"close_strategy must be one of {CLOSE_STRATEGIES}, got {close_strategy}")
+
+            if expiry_sell_cutoff is not None and expiry_sell_cutoff < 0:
+                row_errors.append(f"expiry_sell_cutoff must not be negative, got {expiry_sell_cutoff}")
+
+            if sell_buckets is not None and profit_targets is not None:
+                if sell_buckets != len(profit_targets) + 1:
+                    row_errors.append(f"sell_buckets must be the number of profit targets + 1 = {len(profit_targets) + 1}, got {sell_buckets}")
+                elif quantity is not None and quantity > 1:
+                    if quantity < sell_buckets:
+                        row_errors.append(f"quantity {quantity} is smaller than sell_buckets {sell_buckets}")
+                    elif close_strategy == 'risk_off' and quantity <= math.ceil(quantity / sell_buckets) * (sell_buckets - 1):
+                        row_errors.append(f"quantity {quantity} leaves no runners in {sell_buckets} risk_off buckets")
+
+            if row_errors:
+                errors.extend(f"{spec.source} {spec.symbol}: {error}" for error in row_errors)
+            else:
+                rows.append((spec.symbol, quantity, profit_targets, sell_buckets, CLOSE_STRATEGIES.index(close_strategy), expiry_sell_cutoff))
+
+        if errors:
+            raise ValueError(f"{len(errors)} position errors:\n" + "\n".join(errors))
+        if not rows:
+            raise ValueError("No positions configured. Set instrument_id in [Positions], add [Position <symbol>] sections or a positions_file")
+
+        symbols, quantity, profit_targets, sell_buckets, close_strategy, expiry_sell_cutoff = zip(*rows)
+        targets = np.full((len(rows), max(len(row) for row in profit_targets)), np.nan)
+        for row, row_targets in enumerate(profit_targets):
+            targets[row, :len(row_targets)] = row_targets
+
+        return cls(symbols,
+                   np.array(quantity, dtype=np.int64),
+                   targets,
+                   np.array(sell_buckets, dtype=np.int64),
+                   np.array(close_strategy, dtype=np.int8),
+                   np.array(expiry_sell_cutoff, dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PositionBook):
+            return NotImplemented
+        return (self.same_positions(other)
+                and np.array_equal(self.profit_targets, other.profit_targets, equal_nan=True)
+                and np.array_equal(self.sell_buckets, other.sell_buckets)
+                and np.array_equal(self.close_strategy, other.close_strategy)
+                and np.array_equal(self.expiry_sell_cutoff, other.expiry_sell_cutoff))
+
+    def __repr__(self) -> str:
+        return f"PositionBook({len(self)} positions)"
+
+    def same_positions(self, other: "PositionBook") -> bool:
+        """Check if two books hold the same symbols and quantities, in the same order"""
+        return self.symbols == other.symbols and np.array_equal(self.quantity, other.quantity)
+
+    def changes(self, other: "PositionBook") -> List[str]:
+        """Describe the per-position settings changed in a book with the same positions.
+
+        Returns:
+            List[str]: One "<symbol> <field>: <old> -> <new>" line per changed setting
+        """
+        lines = []
+        for row, symbol in enumerate(self.symbols):
+            for field, old_value, new_value in (
+                    ('profit_targets', self.position_targets(row).tolist(), other.position_targets(row).tolist()),
+                    ('close_strategy', CLOSE_STRATEGIES[self.close_strategy[row]], CLOSE_STRATEGIES[other.close_strategy[row]]),
+                    ('expiry_sell_cutoff', int(self.expiry_sell_cutoff[row]), int(other.expiry_sell_cutoff[row]))):
+                if old_value != new_value:
+                    lines.append(f"{symbol} {field}: {old_value} -> {new_value}")
+        return lines
+
+    def row(self, symbol: str) -> Optional[int]:
+        """Row of a symbol in the parameter arrays, None if the book does not hold it"""
+        return self._rows.get(symbol)
+
+    def position_targets(self, row: int) -> np.ndarray:
+        """Profit targets of a position, without padding"""
+        return self.profit_targets[row, :self.target_count[row]]
+
+    def position_settings(self, row: int) -> dict:
+        """Settings of a position in the form of the [Trading] and [Risk_Management] settings they override"""
+        return {
+            'profit_targets': self.position_targets(row).tolist(),
+            'sell_buckets': int(self.sell_buckets[row]),
+            'close_strategy': CLOSE_STRATEGIES[self.close_strategy[row]],
+            'expiry_sell_cutoff': int(self.expiry_sell_cutoff[row]),
+        }
+
+    def position_buckets(self, row: int) -> np.ndarray:
+        """Sell bucket quantities of a position, without padding. The last bucket holds the runners"""
+        return self.bucket_quantities[row, :self.sell_buckets[row]]
+
+
+def _parse(fields: dict, key: str, parser, default, errors: list):
+    """Parse a field, falling back to the default if it is missing and recording parse errors"""
+    if key not in fields:
+        return default
+    try:
+        return parser(fields[key])
+    except ValueError:
+        errors.append(f"{key} is not valid: {fields[key]}")
+        return None
@@ -0,0 +1,166 @@
+import time
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+
+class PositionReconciler:
+    """Background reconciliation of a local position cache against the broker.
+
+    The local cache is updated from trade update fills as they arrive on the trading
+    websocket, which marks their symbols dirty. Every interval the dirty symbols, the
+    suspected and the known mismatches are compared with the broker positions, fetched
+    in a single bulk call, and a run with nothing to compare makes no call at all. Every
+    full_sweep_interval the whole book is compared, which catches trades placed outside
+    the engine. A mismatch is checked again in the next run before it is reported, as a
+    fill landing between the broker fetch and the compare looks like one. Mismatches are
+    reported once when they are confirmed and again when they clear.
+    """
+
+    def __init__(self,
+                 api,
+                 interval: float,
+                 alert_handler: Optional[Callable[[str, float, float], None]] = None,
+                 full_sweep_interval: float = 60) -> None:
+        """Initialize the reconciler.
+
+        Args:
+            api (AlpacaAPI): Connected API used to fetch broker positions
+            interval (float): Seconds between reconciliations
+            alert_handler (Optional[Callable[[str, float, float], None]]): Called with
+                (symbol, local_qty, broker_qty) for each new mismatch
+            full_sweep_interval (float): Seconds between comparisons of the whole book
+        """
+        self.api = api
+        self.interval = interval
+        self.alert_handler = alert_handler
+        self.full_sweep_interval = full_sweep_interval
+
+        self._lock = threading.Lock()
+        self._local: Dict[str, float] = {}
+        self._dirty = set()
+        self._suspects = set() # Mismatched symbols checked again before they are reported
+        self._mismatches: Dict[str, tuple] = {}
+        self._last_sweep = time.monotonic()
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def positions(self) -> Dict[str, float]:
+        """Copy of the local position cache"""
+        with self._lock:
+            return dict(self._local)
+
+    @property
+    def mismatches(self) -> Dict[str, tuple]:
+        """Current mismatches as symbol -> (local_qty, broker_qty)"""
+        with self._lock:
+            return dict(self._mismatches)
+
+    def seed(self) -> None:
+        """Initialize the local cache from the broker positions."""
+        broker = self._fetch_broker_positions()
+        with self._lock:
+            self._local = dict(broker)
+            self._dirty.clear()
+            self._suspects.clear()
+            self._mismatches.clear()
+        self._last_sweep = time.monotonic()
+
+        logging.info(f"PositionReconciler: Seeded local cache with {len(broker)} positions")
+
+    def on_trade_update(self, data) -> None:
+        """Update the local cache from a trade update.
+
+        Args:
+            data (TradeUpdate): Trade update received on the trading websocket
+        """
+        if data.event not in ("fill", "partial_fill") or data.position_qty is None:
+            return
+
+        symbol = data.order.symbol
+        with self._lock:
+            self._local[symbol] = float(data.position_qty)
+            self._dirty.add(symbol)
+
+    def reconcile(self, full_sweep: Optional[bool] = None) -> Dict[str, tuple]:
+        """Diff the local cache against the broker positions.
+
+        Args:
+            full_sweep (Optional[bool]): Compare the whole book instead of the changed symbols.
+                By default once full_sweep_interval has elapsed since the last sweep
+
+        Returns:
+            Dict[str, tuple]: New mismatches confirmed in this run as symbol -> (local_qty, broker_qty)
+        """
+        if full_sweep is None:
+            full_sweep = time.monotonic() - self._last_sweep >= self.full_sweep_interval
+
+        # Fills arriving from here on are compared in the next run
+        with self._lock:
+            symbols = self._dirty | self._suspects | set(self._mismatches)
+            self._dirty = set()
+
+        if not symbols and not full_sweep:
+            return {}
+
+        broker = self._fetch_broker_positions()
+        new_mismatches = {}
+
+        with self._lock:
+            if full_sweep:
+                symbols |= set(broker) | set(self._local)
+                self._last_sweep = time.monotonic()
+
+            for symbol in symbols:
+                local_qty = self._local.get(symbol, 0.0)
+                broker_qty = broker.get(symbol, 0.0)
+
+                if local_qty == broker_qty:
+                    self._suspects.discard(symbol)
+                    if symbol in self._mismatches:
+                        del self._mismatches[symbol]
+                        logging.info(f"PositionReconciler: Position {symbol} reconciled at {local_qty}")
+
+                elif symbol not in self._suspects and symbol not in self._mismatches:
+                    logging.debug(f"PositionReconciler: Position {symbol} differs. Local {local_qty}, broker {broker_qty}. Checking again")
+                    self._suspects.add(symbol)
+
+                else:
+                    self._suspects.discard(symbol)
+                    if self._mismatches.get(symbol) != (local_qty, broker_qty):
+                        new_mismatches[symbol] = (local_qty, broker_qty)
+                    self._mismatches[symbol] = (local_qty, broker_qty)
+
+        for symbol, (local_qty, broker_qty) in new_mismatches.items():
+            logging.error(f"PositionReconciler: Position mismatch for {symbol}. Local {local_qty}, broker {broker_qty}")
+            if self.alert_handler is not None:
+                self.alert_handler(symbol, local_qty, broker_qty)
+
+        return new_mismatches
+
+    def start(self) -> None:
+        """Seed the cache and start reconciling in a background thread."""
+        self.seed()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logging.info(f"PositionReconciler: Reconciling positions every {self.interval} seconds")
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.reconcile()
+            except Exception as e:
+                logging.error(f"PositionReconciler: Reconciliation failed: {e}")
+
+    def _fetch_broker_positions(self) -> Dict[str, float]:
+        return {position.symbol: float(position.qty) for position in self.api.get_all_positions()}
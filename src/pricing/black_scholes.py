@@ -0,0 +1,265 @@
+import re
+import datetime
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import NamedTuple, Sequence
+
+
+OCC_SYMBOL_PATTERN = re.compile(r"^(?P<underlying>[A-Z0-9.]{1,6})(?P<expiry>\d{6})(?P<right>[CP])(?P<strike>\d{8})$")
+EXPIRY_TIME = datetime.time(16, 0)
+EXPIRY_TIMEZONE = "America/New_York"
+NANOSECONDS_PER_YEAR = 365 * 24 * 3600 * 1_000_000_000
+MIN_VOLATILITY = 1e-4
+MAX_VOLATILITY = 10.0
+IV_RESOLUTION = 0.01 # Volatility change that must move the price by more than the tolerance
+
+
+class OptionContractSpec(NamedTuple):
+    underlying: str
+    expiry: datetime.date
+    is_call: bool
+    strike: float
+
+    @property
+    def expiry_ns(self) -> int:
+        """Expiry instant (16:00 New York time on the expiry date) in UTC nanoseconds"""
+        return pd.Timestamp.combine(self.expiry, EXPIRY_TIME).tz_localize(EXPIRY_TIMEZONE).value
+
+
+@lru_cache(maxsize=None)
+def parse_option_symbol(symbol: str) -> OptionContractSpec:
+    """Parse an OCC option symbol such as AAPL250620C00200000.
+
+    Args:
+        symbol (str): OCC option symbol
+
+    Returns:
+        OptionContractSpec: Underlying, expiry date, call/put flag and strike
+
+    Raises:
+        ValueError: If the symbol is not a valid OCC option symbol
+    """
+    match = OCC_SYMBOL_PATTERN.match(symbol)
+    if match is None:
+        raise ValueError(f"Not a valid OCC option symbol: {symbol}")
+
+    return OptionContractSpec(
+        underlying=match.group('underlying'),
+        expiry=datetime.datetime.strptime(match.group('expiry'), "%y%m%d").date(),
+        is_call=match.group('right') == 'C',
+        strike=int(match.group('strike')) / 1000)
+
+
+def year_fraction(expiry_ns, now_ns) -> np.ndarray:
+    """Time to expiry in years, floored at zero.
+
+    Args:
+        expiry_ns: Expiry instants in UTC nanoseconds
+        now_ns: Current instants in UTC nanoseconds
+
+    Returns:
+        np.ndarray: Time to expiry in years
+    """
+    delta = np.asarray(expiry_ns, dtype=np.int64) - np.asarray(now_ns, dtype=np.int64)
+    return np.maximum(delta, 0) / NANOSECONDS_PER_YEAR
+
+
+def norm_pdf(x) -> np.ndarray:
+    """Standard normal probability density."""
+    x = np.asarray(x, dtype=float)
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+
+def norm_cdf(x) -> np.ndarray:
+    """Standard normal cumulative distribution.
+
+    Uses the Abramowitz and Stegun 7.1.26 approximation of erf, accurate to about
+    1e-7, so no dependency beyond NumPy is needed.
+    """
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1 - poly * np.exp(-z * z)
+    return 0.5 * (1 + np.sign(x) * erf)
+
+
+def _d1_d2(spot, strike, t, rate, sigma):
+    sqrt_t = np.sqrt(t)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * sigma * sigma) * t) / (sigma * sqrt_t)
+    return d1, d1 - sigma * sqrt_t
+
+
+def bs_price(spot, strike, t, rate, sigma, is_call) -> np.ndarray:
+    """Black-Scholes price of European options.
+
+    Args:
+        spot: Underlying prices
+        strike: Strike prices
+        t: Times to expiry in years
+        rate: Continuously compounded risk-free rates
+        sigma: Volatilities
+        is_call: True for calls, False for puts
+
+    Returns:
+        np.ndarray: Option prices. Expired options are worth their intrinsic value.
+    """
+    spot, strike, t, rate, sigma = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (spot, strike, t, rate, sigma)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), spot.shape)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1, d2 = _d1_d2(spot, strike, t, rate, sigma)
+        discount = np.exp(-rate * t)
+        call = spot * norm_cdf(d1) - strike * discount * norm_cdf(d2)
+        put = strike * discount * norm_cdf(-d2) - spot * norm_cdf(-d1)
+
+    intrinsic = np.where(is_call, np.maximum(spot - strike, 0), np.maximum(strike - spot, 0))
+    return np.where(t > 0, np.where(is_call, call, put), intrinsic)
+
+
+def bs_delta(spot, strike, t, rate, sigma, is_call) -> np.ndarray:
+    """Black-Scholes delta of European options."""
+    spot, strike, t, rate, sigma = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (spot, strike, t, rate, sigma)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), spot.shape)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1, _ = _d1_d2(spot, strike, t, rate, sigma)
+        delta = np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1)
+
+    expired = np.where(is_call, (spot > strike).astype(float), -(spot < strike).astype(float))
+    return np.where(t > 0, delta, expired)
+
+
+def bs_vega(spot, strike, t, rate, sigma) -> np.ndarray:
+    """Black-Scholes vega (per unit of volatility) of European options."""
+    spot, strike, t, rate, sigma = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (spot, strike, t, rate, sigma)))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1, _ = _d1_d2(spot, strike, t, rate, sigma)
+        vega = spot * norm_pdf(d1) * np.sqrt(t)
+
+    return np.where(t > 0, vega, 0.0)
+
+
+def bs_theta(spot, strike, t, rate, sigma, is_call) -> np.ndarray:
+    """Black-Scholes theta of European options, per calendar day."""
+    spot, strike, t, rate, sigma = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (spot, strike, t, rate, sigma)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), spot.shape)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1, d2 = _d1_d2(spot, strike, t, rate, sigma)
+        decay = -spot * norm_pdf(d1) * sigma / (2 * np.sqrt(t))
+        carry = rate * strike * np.exp(-rate * t)
+        theta = np.where(is_call, decay - carry * norm_cdf(d2), decay + carry * norm_cdf(-d2))
+
+    return np.where(t > 0, theta / 365, 0.0)
+
+
+def implied_volatility(price, spot, strike, t, rate, is_call, tol: float = 1e-6, max_iter: int = 100) -> np.ndarray:
+    """Solve Black-Scholes implied volatilities for arrays of option prices.
+
+    Newton iterations are safeguarded by a bracket that is narrowed on every step.
+    Whenever a Newton step leaves the bracket, the solver bisects instead, so every
+    element converges even far from the money. Where vega is so small that a change of
+    IV_RESOLUTION in volatility moves the price by less than the tolerance, such as deep
+    out of the money or deep in the money close to expiry, the price does not determine
+    the volatility and NaN is returned.
+
+    Args:
+        price: Option prices
+        spot: Underlying prices
+        strike: Strike prices
+        t: Times to expiry in years
+        rate: Continuously compounded risk-free rates
+        is_call: True for calls, False for puts
+        tol (float): Price tolerance
+        max_iter (int): Maximum number of iterations
+
+    Returns:
+        np.ndarray: Implied volatilities, NaN where the price is outside the no-arbitrage bounds
+            or insensitive to volatility
+    """
+    price, spot, strike, t, rate = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (price, spot, strike, t, rate)))
+    is_call = np.broadcast_to(np.asarray(is_call, dtype=bool), price.shape)
+
+    lower_bound = bs_price(spot, strike, t, rate, MIN_VOLATILITY, is_call)
+    upper_bound = bs_price(spot, strike, t, rate, MAX_VOLATILITY, is_call)
+    valid = (t > 0) & (price >= lower_bound - tol) & (price <= upper_bound + tol)
+
+    lo = np.full(price.shape, MIN_VOLATILITY)
+    hi = np.full(price.shape, MAX_VOLATILITY)
+    sigma = np.full(price.shape, 0.3)
+    active = valid.copy()
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+
+        diff = bs_price(spot, strike, t, rate, sigma, is_call) - price
+        active &= np.abs(diff) > tol
+
+        # Price is increasing in volatility
+        hi = np.where(active & (diff > 0), sigma, hi)
+        lo = np.where(active & (diff < 0), sigma, lo)
+
+        vega = bs_vega(spot, strike, t, rate, sigma)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = sigma - diff / vega
+        in_bracket = (vega > 1e-12) & (newton > lo) & (newton < hi)
+        sigma = np.where(active, np.where(in_bracket, newton, 0.5 * (lo + hi)), sigma)
+
+    resolved = bs_vega(spot, strike, t, rate, sigma) * IV_RESOLUTION > tol
+    return np.where(valid & resolved, sigma, np.nan)
+
+
+def price_target_from_underlying(underlying_target, spot, option_price, strike, t, rate, is_call) -> np.ndarray:
+    """Convert underlying price targets into option price targets.
+
+    The implied volatility of the current option price is held constant and the option
+    is repriced at the underlying target, so targets defined on the underlying can be
+    checked against option bids like the existing take-profit levels.
+
+    Args:
+        underlying_target: Underlying price levels to exit at
+        spot: Current underlying prices
+        option_price: Current option prices
+        strike: Strike prices
+        t: Times to expiry in years
+        rate: Continuously compounded risk-free rates
+        is_call: True for calls, False for puts
+
+    Returns:
+        np.ndarray: Option price targets
+    """
+    sigma = implied_volatility(option_price, spot, strike, t, rate, is_call)
+    return bs_price(underlying_target, strike, t, rate, sigma, is_call)
+
+
+def book_greeks(symbols: Sequence[str], option_prices, underlying_prices, now_ns, rate: float = 0.0) -> pd.DataFrame:
+    """Implied volatility, delta and theta for a book of option quotes in one batch.
+
+    Args:
+        symbols (Sequence[str]): OCC option symbols
+        option_prices: Option prices, one per symbol
+        underlying_prices: Underlying prices, one per symbol
+        now_ns: Quote instants in UTC nanoseconds
+        rate (float): Continuously compounded risk-free rate
+
+    Returns:
+        pd.DataFrame: Strike, time to expiry, iv, delta and theta per symbol
+    """
+    specs = [parse_option_symbol(symbol) for symbol in symbols]
+    strike = np.array([spec.strike for spec in specs])
+    is_call = np.array([spec.is_call for spec in specs])
+    t = year_fraction(np.array([spec.expiry_ns for spec in specs]), now_ns)
+
+    iv = implied_volatility(option_prices, underlying_prices, strike, t, rate, is_call)
+    return pd.DataFrame({
+        'strike': strike,
+        'is_call': is_call,
+        'time_to_expiry': t,
+        'iv': iv,
+        'delta': bs_delta(underlying_prices, strike, t, rate, iv, is_call),
+        'theta': bs_theta(underlying_prices, strike, t, rate, iv, is_call),
+    }, index=pd.Index(list(symbols), name='symbol'))
@@ -0,0 +1,162 @@
+import os
+import pickle
+import struct
+import logging
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+
+_RECORD_HEADER = struct.Struct("<I")
+
+
+class RecoveryStore:
+    """Binary snapshots plus an append-only journal of the events since the last snapshot.
+
+    A snapshot is a pickled dict of component states written atomically (temporary
+    file, fsync, rename). Every event recorded afterwards is appended to the journal as
+    a length-prefixed pickle record tagged with a sequence number. On restart the latest
+    snapshot is loaded and only the journal records newer than it are replayed, so a
+    crash between writing a snapshot and truncating the journal is harmless. A torn
+    record at the end of the journal is ignored.
+    """
+
+    def __init__(self, directory: str, name: str = "engine") -> None:
+        """Initialize the recovery store.
+
+        Args:
+            directory (str): Directory holding the snapshot and journal files
+            name (str): Prefix for the snapshot and journal filenames
+        """
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, f"{name}_snapshot.pkl")
+        self.journal_path = os.path.join(directory, f"{name}_journal.bin")
+
+        self._lock = threading.Lock()
+        self._journal = None
+        self._seq = 0
+
+    def save_snapshot(self, capture: Callable[[], dict]) -> None:
+        """Atomically write a snapshot and start a new journal.
+
+        The sequence number is noted before the state is captured, so events appended
+        by other threads while capture() runs are kept in the new journal and replayed
+        after the snapshot. Replaying an event the snapshot already reflects must be
+        harmless.
+
+        Args:
+            capture (Callable[[], dict]): Returns the picklable state of all components
+        """
+        with self._lock:
+            seq = self._seq
+            offset = self._journal.tell() if self._journal is not None else 0
+
+        state = capture()
+
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+
+            tmp_path = self.snapshot_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump({"seq": seq, "state": state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+
+            # Records up to seq are covered by the snapshot, the ones appended since are kept
+            tail = b""
+            if self._journal is not None:
+                self._close_journal()
+                with open(self.journal_path, "rb") as f:
+                    f.seek(offset)
+                    tail = f.read()
+
+            tmp_path = self.journal_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.journal_path)
+            self._journal = open(self.journal_path, "ab")
+
+        logging.debug(f"RecoveryStore: Snapshot saved to {self.snapshot_path} at seq {seq}, {len(tail)} journal bytes kept")
+
+    def append(self, kind: str, payload: Any, sync: bool = True) -> None:
+        """Append an event to the journal.
+
+        Args:
+            kind (str): Event type used to dispatch the event on replay
+            payload (Any): Picklable event payload
+            sync (bool): fsync the journal after writing. High-frequency events such
+                as market data only flush to the OS.
+        """
+        with self._lock:
+            if self._journal is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._journal = open(self.journal_path, "ab")
+
+            self._seq += 1
+            record = pickle.dumps((self._seq, kind, payload), protocol=pickle.HIGHEST_PROTOCOL)
+            self._journal.write(_RECORD_HEADER.pack(len(record)) + record)
+            self._journal.flush()
+            if sync:
+                os.fsync(self._journal.fileno())
+
+    def load(self) -> Tuple[Optional[dict], List[Tuple[str, Any]]]:
+        """Load the latest snapshot and the journal events recorded after it.
+
+        Returns:
+            Tuple[Optional[dict], List[Tuple[str, Any]]]: The snapshot state, or None if
+                there is no snapshot, and the list of (kind, payload) events to replay
+        """
+        state = None
+        snapshot_seq = 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = pickle.load(f)
+            state = snapshot["state"]
+            snapshot_seq = snapshot["seq"]
+
+        events = []
+        last_seq = snapshot_seq
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb") as f:
+                data = f.read()
+
+            offset = 0
+            while offset + _RECORD_HEADER.size <= len(data):
+                (length,) = _RECORD_HEADER.unpack_from(data, offset)
+                start = offset + _RECORD_HEADER.size
+                if start + length > len(data):
+                    logging.warning(f"RecoveryStore: Ignoring torn journal record at offset {offset}")
+                    break
+
+                seq, kind, payload = pickle.loads(data[start:start + length])
+                if seq > snapshot_seq:
+                    events.append((kind, payload))
+                    last_seq = max(last_seq, seq)
+                offset = start + length
+
+        with self._lock:
+            self._seq = max(self._seq, last_seq)
+
+        logging.info(f"RecoveryStore: Loaded snapshot: {state is not None}, journal events: {len(events)}")
+        return state, events
+
+    def clear(self) -> None:
+        """Remove the snapshot and the journal."""
+        with self._lock:
+            self._close_journal()
+            for path in (self.snapshot_path, self.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._seq = 0
+
+    def close(self) -> None:
+        """Close the journal file."""
+        with self._lock:
+            self._close_journal()
+
+    def _close_journal(self) -> None:
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
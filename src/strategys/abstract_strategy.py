@@ -1,16 +1,20 @@
 from abc import ABC, abstractmethod
+import numpy as np
 from src.mkt_data.mkt_data_state import MktDataState
+from src.utilities.enums import Signal
 
 
 class AbstractStrategy(ABC):
     """
     Abstract interface for trading strategies.
 
-    Defines methods for processing market data and generating trade signals.
+    Defines methods for processing market data and generating trade signals. Strategies
+    are called through an instance, so that stateful strategies can carry their running
+    state from one call to the next. Stateless strategies may implement the methods as
+    static methods, which can also be called on the class.
     """
-    @staticmethod
     @abstractmethod
-    def generate_signals(mkt_data: MktDataState, cfg, strategy_args: dict = None):        
+    def generate_signals(self, mkt_data: MktDataState, cfg, strategy_args: dict = None):        
         """
         Generate a trade signal based on the provided market data.
 
@@ -19,3 +23,41 @@ class AbstractStrategy(ABC):
         :return: Signal
         """
         pass
+
+    @abstractmethod
+    def generate_signals_batch(self, bids: np.ndarray, timestamps: np.ndarray, cfg, strategy_args: dict = None) -> np.ndarray:
+        """
+        Generate a trade signal for every tick of a drained batch of quotes.
+
+        :param bids: Array of bid prices in arrival order
+        :param timestamps: Array of tick timestamps aligned with bids
+        :param cfg: Configuration instance
+        :param strategy_args: dict
+        :return: Array of Signal, one per tick
+        """
+        pass
+
+    def first_trigger(self, bids: np.ndarray, timestamps: np.ndarray, cfg, strategy_args: dict = None) -> int:
+        """
+        Return the index of the first SELL signal within a batch.
+
+        :param bids: Array of bid prices in arrival order
+        :param timestamps: Array of tick timestamps aligned with bids
+        :param cfg: Configuration instance
+        :param strategy_args: dict
+        :return: Index of the first SELL signal, -1 if there is none
+        """
+        signals = self.generate_signals_batch(bids, timestamps, cfg, strategy_args)
+        return self.first_sell_index(signals)
+
+    @staticmethod
+    def first_sell_index(signals: np.ndarray) -> int:
+        """
+        Return the index of the first SELL in an array of signals.
+
+        :param signals: Array of Signal
+        :return: Index of the first SELL signal, -1 if there is none
+        """
+        # Compare as objects, numpy would otherwise coerce the enum to a truncated string
+        hits = np.flatnonzero(signals == np.asarray(Signal.SELL, dtype=object))
+        return int(hits[0]) if hits.size else -1
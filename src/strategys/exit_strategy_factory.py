@@ -0,0 +1,46 @@
+import datetime
+import pandas as pd
+from typing import Optional
+from src.configuration import Configuration
+from src.pricing.black_scholes import parse_option_symbol
+from src.strategys.stateful_exit_strategy import StatefulExitStrategy
+from src.strategys.trailing_stop_strategy import TrailingStopStrategy
+from src.strategys.volatility_stop_strategy import VolatilityStopStrategy
+from src.strategys.time_decay_strategy import TimeDecayTargetStrategy
+
+
+def build_exit_strategy(cfg: Configuration, symbol: str, entry_price: float) -> Optional[StatefulExitStrategy]:
+    """
+    Build the exit strategy selected by exit_strategy in [Risk_Management].
+
+    Price levels are configured like the profit targets, as fractions of the entry price.
+    The time decay target decays from decay_days before the expiry session close.
+
+    :param cfg: Configuration instance
+    :param symbol: Option symbol of the position
+    :param entry_price: Average entry price of the position
+    :return: The exit strategy, None if exit_strategy is none
+    """
+    args = cfg.exit_strategy_args
+
+    if cfg.exit_strategy == 'trailing_stop':
+        activation = args['trail_activation']
+        return TrailingStopStrategy(
+            trail_pct=args['trail_pct'],
+            trail_amount=args['trail_amount'],
+            activation_price=entry_price * (1 + activation) if activation is not None else None)
+
+    if cfg.exit_strategy == 'volatility_stop':
+        return VolatilityStopStrategy(int(args['volatility_window']), args['volatility_multiplier'])
+
+    if cfg.exit_strategy == 'time_decay':
+        expiry_date = parse_option_symbol(symbol).expiry
+        close_time = datetime.datetime.strptime(cfg.trading_end_time, "%H%M").time()
+        expiry = pd.Timestamp(datetime.datetime.combine(expiry_date, close_time)).tz_localize(cfg.timezone)
+        return TimeDecayTargetStrategy(
+            entry_price * (1 + args['decay_initial_target']),
+            entry_price * (1 + args['decay_final_target']),
+            expiry - pd.Timedelta(days=args['decay_days']),
+            expiry)
+
+    return None
@@ -0,0 +1,90 @@
+from abc import abstractmethod
+import numpy as np
+from src.strategys.abstract_strategy import AbstractStrategy
+from src.mkt_data.mkt_data_state import MktDataState
+from src.utilities.enums import Signal
+from src.utilities.timestamps import to_ns_array
+
+
+class StatefulExitStrategy(AbstractStrategy):
+    """
+    Base class for exit strategies that carry state from tick to tick.
+
+    Subclasses implement update, which consumes a single tick in O(1) using running
+    aggregates. Every tick is consumed once, in the order the batches were ingested,
+    and the full market data history is never rescanned.
+    """
+    def __init__(self) -> None:
+        self._batches_consumed = 0
+        self._last_signal = Signal.HOLD
+
+    @abstractmethod
+    def update(self, bid: float, timestamp_ns: int) -> Signal:
+        """
+        Consume one tick and return the resulting signal.
+
+        :param bid: Bid price of the tick
+        :param timestamp_ns: Tick timestamp in UTC nanoseconds
+        :return: Signal
+        """
+        pass
+
+    @abstractmethod
+    def reset(self) -> None:
+        """
+        Clear the running state, e.g. when moving on to the next bucket.
+        """
+        pass
+
+    def warm_up(self, bids: np.ndarray, timestamps: np.ndarray) -> None:
+        """
+        Feed historical prices through the running state without acting on their signals,
+        e.g. the close of the seeded session-to-date bars after a restart.
+
+        :param bids: Array of prices in time order
+        :param timestamps: Array of timestamps aligned with bids
+        """
+        bids = np.asarray(bids, dtype=float)
+        timestamps_ns = to_ns_array(timestamps)
+        for idx in range(bids.size):
+            self.update(float(bids[idx]), int(timestamps_ns[idx]))
+        self._last_signal = Signal.HOLD
+
+    def generate_signals(self, mkt_data: MktDataState, cfg, strategy_args: dict = None) -> Signal:
+        """
+        Consume the batches ingested since the previous call and return SELL if any of their ticks triggered.
+
+        :param mkt_data: MktDataState instance
+        :param cfg: Configuration instance
+        :param strategy_args: dict
+        :return: Signal, the previous one if no batch was ingested since
+        """
+        self._batches_consumed, batches = mkt_data.batches_since(self._batches_consumed)
+        if not batches:
+            return self._last_signal
+
+        triggered = False
+        for batch in batches:
+            trigger_idx = self.first_trigger(batch['bid_price'].to_numpy(), to_ns_array(batch.index), cfg, strategy_args)
+            triggered = triggered or trigger_idx >= 0
+
+        self._last_signal = Signal.SELL if triggered else Signal.HOLD
+        return self._last_signal
+
+    def generate_signals_batch(self, bids: np.ndarray, timestamps: np.ndarray, cfg, strategy_args: dict = None) -> np.ndarray:
+        """
+        Consume a batch of ticks and return one signal per tick.
+
+        :param bids: Array of bid prices in arrival order
+        :param timestamps: Array of tick timestamps aligned with bids
+        :param cfg: Configuration instance
+        :param strategy_args: dict
+        :return: Array of Signal, one per tick
+        """
+        bids = np.asarray(bids, dtype=float)
+        timestamps_ns = to_ns_array(timestamps)
+
+        signals = np.empty(bids.shape, dtype=object)
+        for idx in range(bids.size):
+            signals[idx] = self.update(float(bids[idx]), int(timestamps_ns[idx]))
+        return signals
@@ -3,6 +3,7 @@ from src.configuration import Configuration
 from src.utilities.enums import Signal
 from src.mkt_data.mkt_data_state import MktDataState
 import logging
+import numpy as np
 
 
 class TakeProfitStrategy(AbstractStrategy):
@@ -36,3 +37,38 @@ class TakeProfitStrategy(AbstractStrategy):
 
             logging.debug(f"HOLD signal generated")
             return Signal.HOLD
+
+    @staticmethod
+    def generate_signals_batch(bids: np.ndarray, timestamps: np.ndarray, cfg: Configuration, strategy_args: dict = None) -> np.ndarray:
+        """
+        Generate a trade signal for every tick of a drained batch of quotes.
+
+        :param bids: Array of bid prices in arrival order
+        :param timestamps: Array of tick timestamps aligned with bids
+        :param cfg: Configuration instance
+        :param strategy_args: dict
+        :return: Array of Signal, one per tick
+        """
+        hits = np.asarray(bids, dtype=float) >= strategy_args['profit_target']
+        signals = np.empty(hits.shape, dtype=object)
+        signals.fill(Signal.HOLD)
+        signals[hits] = Signal.SELL
+        return signals
+
+    @classmethod
+    def first_trigger(cls, bids: np.ndarray, timestamps: np.ndarray, cfg: Configuration, strategy_args: dict = None) -> int:
+        """
+        Return the index of the first tick in a batch with a bid at or above the profit target.
+
+        :param bids: Array of bid prices in arrival order
+        :param timestamps: Array of tick timestamps aligned with bids
+        :param cfg: Configuration instance
+        :param strategy_args: dict
+        :return: Index of the first SELL signal, -1 if there is none
+        """
+        hits = np.asarray(bids, dtype=float) >= strategy_args['profit_target']
+        if not hits.size:
+            return -1
+
+        idx = int(hits.argmax())
+        return idx if hits[idx] else -1
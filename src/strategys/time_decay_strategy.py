@@ -0,0 +1,59 @@
+import logging
+import pandas as pd
+from src.strategys.stateful_exit_strategy import StatefulExitStrategy
+from src.utilities.enums import Signal
+
+
+class TimeDecayTargetStrategy(StatefulExitStrategy):
+    """
+    Take-profit target that decays as the option approaches expiry.
+
+    The target moves linearly from the initial target at decay_start to the final
+    target at expiry, reflecting the time value the option loses in the meantime.
+    A SELL signal is generated once the bid reaches the current target.
+    """
+    def __init__(self, 
+                 initial_target: float, 
+                 final_target: float, 
+                 decay_start: pd.Timestamp, 
+                 expiry: pd.Timestamp) -> None:
+        """
+        Initialize the time decay target.
+
+        :param initial_target: Target price up to decay_start
+        :param final_target: Target price at expiry
+        :param decay_start: Time the target starts decaying
+        :param expiry: Expiry time of the option
+        """
+        super().__init__()
+        if expiry <= decay_start:
+            raise ValueError("expiry must be after decay_start")
+
+        self.initial_target = initial_target
+        self.final_target = final_target
+        self.decay_start_ns = decay_start.value
+        self.expiry_ns = expiry.value
+        self._slope = (final_target - initial_target) / (self.expiry_ns - self.decay_start_ns)
+        self.reset()
+
+    def reset(self) -> None:
+        self.current_target = self.initial_target
+
+    def target_at(self, timestamp_ns: int) -> float:
+        """
+        Return the target price at a given time.
+
+        :param timestamp_ns: Time in UTC nanoseconds
+        :return: Target price
+        """
+        elapsed = min(max(timestamp_ns - self.decay_start_ns, 0), self.expiry_ns - self.decay_start_ns)
+        return self.initial_target + self._slope * elapsed
+
+    def update(self, bid: float, timestamp_ns: int) -> Signal:
+        self.current_target = self.target_at(timestamp_ns)
+
+        if bid >= self.current_target:
+            logging.info(f"Time decay target hit: bid {bid} >= target {self.current_target}")
+            return Signal.SELL
+
+        return Signal.HOLD
@@ -0,0 +1,58 @@
+import logging
+from typing import Optional
+from src.strategys.stateful_exit_strategy import StatefulExitStrategy
+from src.utilities.enums import Signal
+
+
+class TrailingStopStrategy(StatefulExitStrategy):
+    """
+    Trailing stop that follows the running maximum of the bid.
+
+    A SELL signal is generated once the bid falls below the running maximum by more
+    than the trailing distance. The stop can be armed only after the running maximum
+    has reached an activation price, so it does not fire before the position is in profit.
+    """
+    def __init__(self, 
+                 trail_pct: Optional[float] = None, 
+                 trail_amount: Optional[float] = None, 
+                 activation_price: Optional[float] = None) -> None:
+        """
+        Initialize the trailing stop. Exactly one of trail_pct and trail_amount must be set.
+
+        :param trail_pct: Trailing distance as a fraction of the running maximum
+        :param trail_amount: Trailing distance in price units
+        :param activation_price: Running maximum at which the stop is armed
+        """
+        super().__init__()
+        if (trail_pct is None) == (trail_amount is None):
+            raise ValueError("Exactly one of trail_pct and trail_amount must be set")
+        if trail_pct is not None and not 0 < trail_pct < 1:
+            raise ValueError("trail_pct must be between 0 and 1")
+        if trail_amount is not None and trail_amount <= 0:
+            raise ValueError("trail_amount must be greater than 0")
+
+        self.trail_pct = trail_pct
+        self.trail_amount = trail_amount
+        self.activation_price = activation_price
+        self.reset()
+
+    def reset(self) -> None:
+        self.running_max = float('-inf')
+
+    @property
+    def stop_price(self) -> float:
+        """Current stop level"""
+        if self.trail_pct is not None:
+            return self.running_max * (1 - self.trail_pct)
+        return self.running_max - self.trail_amount
+
+    def update(self, bid: float, timestamp_ns: int) -> Signal:
+        if bid > self.running_max:
+            self.running_max = bid
+
+        armed = self.activation_price is None or self.running_max >= self.activation_price
+        if armed and bid <= self.stop_price:
+            logging.info(f"Trailing stop hit: bid {bid} <= stop {self.stop_price} (max {self.running_max})")
+            return Signal.SELL
+
+        return Signal.HOLD
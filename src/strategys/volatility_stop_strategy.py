@@ -0,0 +1,65 @@
+import logging
+from collections import deque
+from src.strategys.stateful_exit_strategy import StatefulExitStrategy
+from src.utilities.enums import Signal
+
+
+class VolatilityStopStrategy(StatefulExitStrategy):
+    """
+    ATR-style volatility stop trailing the running maximum of the bid.
+
+    The average true range is approximated by the mean absolute bid change over a
+    rolling window of ticks, maintained with a running sum. A SELL signal is generated
+    once the bid falls below the running maximum by more than multiplier times that
+    range. The stop is only armed once the window is full.
+    """
+    def __init__(self, window: int, multiplier: float) -> None:
+        """
+        Initialize the volatility stop.
+
+        :param window: Number of ticks in the rolling range window
+        :param multiplier: Number of average ranges the bid may fall from its maximum
+        """
+        super().__init__()
+        if window <= 0:
+            raise ValueError("window must be greater than 0")
+        if multiplier <= 0:
+            raise ValueError("multiplier must be greater than 0")
+
+        self.window = window
+        self.multiplier = multiplier
+        self.reset()
+
+    def reset(self) -> None:
+        self.running_max = float('-inf')
+        self._ranges = deque()
+        self._range_sum = 0.0
+        self._previous_bid = None
+
+    @property
+    def average_range(self) -> float:
+        """Mean absolute bid change over the rolling window"""
+        return self._range_sum / len(self._ranges) if self._ranges else 0.0
+
+    @property
+    def stop_price(self) -> float:
+        """Current stop level"""
+        return self.running_max - self.multiplier * self.average_range
+
+    def update(self, bid: float, timestamp_ns: int) -> Signal:
+        if self._previous_bid is not None:
+            tick_range = abs(bid - self._previous_bid)
+            self._ranges.append(tick_range)
+            self._range_sum += tick_range
+            if len(self._ranges) > self.window:
+                self._range_sum -= self._ranges.popleft()
+        self._previous_bid = bid
+
+        if bid > self.running_max:
+            self.running_max = bid
+
+        if len(self._ranges) == self.window and bid < self.stop_price:
+            logging.info(f"Volatility stop hit: bid {bid} < stop {self.stop_price} (max {self.running_max}, range {self.average_range})")
+            return Signal.SELL
+
+        return Signal.HOLD
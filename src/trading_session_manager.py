@@ -1,9 +1,11 @@
 import logging
 import pandas as pd
-import holidays
 import pytz
 import time
+import threading
 from typing import Optional
+from src.utilities.exchange_calendar import ExchangeCalendar
+from src.utilities.session_scheduler import SessionScheduler
 
 
 class TradingSessionManager:
@@ -17,7 +19,8 @@ class TradingSessionManager:
     
     The trading session logic handles overnight sessions that span across days,
     as well as regular market hour sessions. It accounts for US holidays and
-    weekend trading restrictions. It also manages the orderly closing of positions
+    weekend trading restrictions using a precomputed NYSE calendar that includes
+    early closes, built once per year. It also manages the orderly closing of positions
     and cancellation of orders as market close approaches.
     """
     
@@ -30,8 +33,31 @@ class TradingSessionManager:
             trading_end_time (str): End time in HHMM format (e.g. '1600' for 4:00 PM)
         """
         self.timezone = timezone
+        self.trading_start_time = trading_start_time
+        self.trading_end_time = trading_end_time
         self.trading_start = pd.to_datetime(trading_start_time, format='%H%M').tz_localize(self.timezone).time()
         self.trading_end = pd.to_datetime(trading_end_time, format='%H%M').tz_localize(self.timezone).time()
+
+        self._calendars = {}
+        self.stop_event = threading.Event()
+
+    def calendar(self, year: int) -> ExchangeCalendar:
+        """Return the exchange calendar of a year, building it on first use
+        
+        Args:
+            year (int): Calendar year
+            
+        Returns:
+            ExchangeCalendar: Precomputed sessions of the year
+        """
+        if year not in self._calendars:
+            logging.debug(f"TradingSessionManager: Building exchange calendar for {year}")
+            self._calendars[year] = ExchangeCalendar(
+                year, 
+                self.timezone, 
+                self.trading_start_time, 
+                self.trading_end_time)
+        return self._calendars[year]
     
     def is_trading_hours(self, now: pd.Timestamp) -> bool:
         """Check if current time is within trading hours
@@ -51,7 +77,7 @@ class TradingSessionManager:
             return current_time >= self.trading_start or current_time < self.trading_end
             
     def is_trading_day(self, now_timestamp: pd.Timestamp) -> bool:
-        """Check if today is a trading day (Sunday through Friday)
+        """Check if today is an NYSE trading day (weekdays excluding exchange holidays)
         
         Args:
             now_timestamp (pd.Timestamp): Current timestamp to check
@@ -60,19 +86,102 @@ class TradingSessionManager:
             bool: True if it's a trading day, False otherwise
         """
         logging.debug(f"TradingSessionManager: Checking trading day. Current timestamp: {now_timestamp}")
-        us_holidays = holidays.UnitedStates()
-        weekday = now_timestamp.weekday()
+        return self.calendar(now_timestamp.year).is_trading_day(now_timestamp.date())
 
-        if now_timestamp.date() in us_holidays:
-            return False
+    def is_open(self, now: pd.Timestamp) -> bool:
+        """Check if a trading session is open, accounting for holidays and early closes
         
-        # Monday through Friday (0-4)
-        elif 0 <= weekday <= 4:
+        Args:
+            now (pd.Timestamp): Current timestamp to check
+            
+        Returns:
+            bool: True if a session is open, False otherwise
+        """
+        if self.calendar(now.year).is_open(now.value):
             return True
+
+        # An overnight session may have started on the last day of the previous year
+        return now.dayofyear == 1 and self.calendar(now.year - 1).is_open(now.value)
+
+    def next_open(self, now: pd.Timestamp) -> pd.Timestamp:
+        """Return the start of the next trading session after now
+        
+        Args:
+            now (pd.Timestamp): Current timestamp
             
-        else:
-            return False 
+        Returns:
+            pd.Timestamp: Next session open in the trading timezone
+        """
+        next_open_ns = self.calendar(now.year).next_open(now.value)
+        if next_open_ns is None:
+            next_open_ns = self.calendar(now.year + 1).next_open(now.value)
+        return pd.Timestamp(next_open_ns, tz='UTC').tz_convert(self.timezone)
+
+    def session_open(self, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+        """Return the open of the session starting on the date of now
         
+        Args:
+            now (pd.Timestamp): Current timestamp
+            
+        Returns:
+            Optional[pd.Timestamp]: Session open in the trading timezone, None if not a trading day
+        """
+        bounds = self.calendar(now.year).session_bounds(now.date())
+        if bounds is None:
+            return None
+        return pd.Timestamp(bounds[0], tz='UTC').tz_convert(self.timezone)
+
+    def session_close(self, now: pd.Timestamp) -> Optional[pd.Timestamp]:
+        """Return the close of the session starting on the date of now, including early closes
+        
+        Args:
+            now (pd.Timestamp): Current timestamp
+            
+        Returns:
+            Optional[pd.Timestamp]: Session close in the trading timezone, None if not a trading day
+        """
+        bounds = self.calendar(now.year).session_bounds(now.date())
+        if bounds is None:
+            return None
+        return pd.Timestamp(bounds[1], tz='UTC').tz_convert(self.timezone)
+        
+    def schedule_session_events(self, 
+                                scheduler: SessionScheduler, 
+                                now: pd.Timestamp, 
+                                eod_exit_time: str, 
+                                warmup_minutes: int) -> None:
+        """Schedule the upcoming events of the current or next session.
+        
+        Events are 'warmup', 'open', 'eod_exit', 'close' and 'day_rollover'. Events
+        in the past are skipped. The EOD exit keeps its offset to the close on half-days.
+        
+        Args:
+            scheduler (SessionScheduler): Scheduler to add the events to
+            now (pd.Timestamp): Current timestamp
+            eod_exit_time (str): Time to start EOD procedures in HHMM format
+            warmup_minutes (int): Minutes before the open to wake up for warmup
+        """
+        bounds = self.calendar(now.year).session_bounds(now.date())
+        if bounds is None or now.value >= bounds[1]:
+            next_open = self.next_open(now)
+            bounds = self.calendar(next_open.year).session_bounds(next_open.date())
+        open_ns, close_ns = bounds
+
+        eod_offset = (int(self.trading_end_time[:2]) - int(eod_exit_time[:2])) * 60 + \
+                     int(self.trading_end_time[2:]) - int(eod_exit_time[2:])
+        rollover = (now.normalize() + pd.DateOffset(days=1)).value
+
+        events = [
+            (open_ns - warmup_minutes * 60 * 1_000_000_000, "warmup"),
+            (open_ns, "open"),
+            (close_ns - eod_offset * 60 * 1_000_000_000, "eod_exit"),
+            (close_ns, "close"),
+            (rollover, "day_rollover"),
+        ]
+        for deadline_ns, event in events:
+            if deadline_ns > now.value:
+                scheduler.schedule(deadline_ns, event)
+
     def perform_eod_close(self, 
                          now: pd.Timestamp, 
                          eod_exit_time: str, 
@@ -111,7 +220,8 @@ class TradingSessionManager:
 
             seconds_until_close = (market_close_time - now).total_seconds()
             logging.info(f"Sleeping for {seconds_until_close} seconds until market close")
-            time.sleep(seconds_until_close)
+            # Waiting on the stop event lets a shutdown interrupt the sleep
+            self.stop_event.wait(seconds_until_close)
             return True
         
         return False
@@ -0,0 +1,104 @@
+import os
+import logging
+import threading
+import configparser
+from typing import Optional, Tuple
+from src.configuration import Configuration
+
+
+class ConfigWatcher:
+    """Reload the running configuration when its file changes.
+
+    A background thread polls the modification time and size of the configuration
+    file and only flags a change. The trading loop calls checkpoint() between ticks,
+    which re-parses and validates the file on the loop thread and copies the changed
+    settings into the running Configuration, so components holding it see either all
+    of the new values or none of them.
+
+    A reload is rejected as a whole if the file is invalid or changes a setting that
+    requires a restart, see Configuration.requires_restart(), and the running
+    configuration is kept.
+    """
+
+    def __init__(self, config: Configuration, poll_interval: float = 1.0) -> None:
+        """Initialize the watcher.
+
+        Args:
+            config (Configuration): Running configuration, updated in place on reload
+            poll_interval (float): Seconds between polls of the configuration file
+        """
+        self.config = config
+        self.path = config.path
+        self.poll_interval = poll_interval
+
+        self._signature = self._stat()
+        self._changed = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        self._signature = self._stat()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ConfigWatcher", daemon=True)
+        self._thread.start()
+        logging.info(f"ConfigWatcher: Watching {self.path} for changes")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def checkpoint(self) -> dict:
+        """Apply a pending change of the configuration file. Called by the trading loop.
+
+        Returns:
+            dict: Applied changes, mapping the setting to (old value, new value). Empty if nothing was applied
+        """
+        if not self._changed.is_set():
+            return {}
+        self._changed.clear()
+
+        try:
+            new_config = Configuration(self.path)
+        except (ValueError, configparser.Error) as e:
+            logging.error(f"ConfigWatcher: Keeping the running configuration, {self.path} is invalid: {e}")
+            return {}
+
+        changes = self.config.diff(new_config)
+        restart_keys = self.config.requires_restart(changes)
+        if restart_keys:
+            # Parsing the new file already applied its log level
+            logging.getLogger().setLevel(self.config.log_level)
+            logging.warning(f"ConfigWatcher: Not reloading {self.path}, changing {', '.join(restart_keys)} requires a restart")
+            return {}
+
+        if not changes:
+            logging.info(f"ConfigWatcher: {self.path} changed without changing any setting")
+            return {}
+
+        for key, (old_value, new_value) in changes.items():
+            setattr(self.config, key, new_value)
+            if key == 'positions':
+                for line in old_value.changes(new_value):
+                    logging.info(f"ConfigWatcher: {line}")
+            else:
+                logging.info(f"ConfigWatcher: {key}: {old_value} -> {new_value}")
+        self.config.config = new_config.config
+
+        logging.info(f"ConfigWatcher: Reloaded {len(changes)} settings from {self.path}")
+        return changes
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None # Editors may replace the file by renaming a new one over it
+        return stat.st_mtime_ns, stat.st_size
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.poll_interval):
+            signature = self._stat()
+            if signature is not None and signature != self._signature:
+                self._signature = signature
+                self._changed.set()
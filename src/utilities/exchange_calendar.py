@@ -0,0 +1,147 @@
+import datetime
+from array import array
+from bisect import bisect_right
+from typing import Optional
+import pandas as pd
+
+
+EXCHANGE_TIMEZONE = "America/New_York"
+EARLY_CLOSE_TIME = datetime.time(13, 0)
+
+
+def nyse_early_closes(year: int, exchange_holidays) -> set:
+    """Return the NYSE early close (13:00 ET) dates of a year.
+
+    The exchange closes early on the day before Independence Day, the day after
+    Thanksgiving and Christmas Eve, unless that day is a weekend or a holiday itself.
+
+    Args:
+        year (int): Calendar year
+        exchange_holidays: NYSE holidays covering the year
+
+    Returns:
+        set: Dates with an early close
+    """
+    november_first = datetime.date(year, 11, 1)
+    thanksgiving = november_first + datetime.timedelta(days=(3 - november_first.weekday()) % 7 + 21)
+
+    candidates = [
+        datetime.date(year, 7, 3),
+        thanksgiving + datetime.timedelta(days=1),
+        datetime.date(year, 12, 24),
+    ]
+    return {day for day in candidates if day.weekday() < 5 and day not in exchange_holidays}
+
+
+class ExchangeCalendar:
+    """Precomputed NYSE trading sessions for one calendar year.
+
+    Sessions are built once from the NYSE holiday calendar and the configured trading
+    hours, and stored as sorted arrays of open and close instants in int64 UTC
+    nanoseconds. Early closes cap the session at 13:00 ET. Queries use bisect on
+    these arrays, so no calendar is rebuilt while the trading loop is running.
+    """
+
+    def __init__(self, year: int, timezone: str, trading_start_time: str, trading_end_time: str) -> None:
+        """Build the sessions of a year.
+
+        Args:
+            year (int): Calendar year
+            timezone (str): Timezone the trading hours are expressed in
+            trading_start_time (str): Session start time in HHMM format
+            trading_end_time (str): Session end time in HHMM format
+        """
+        self.year = year
+        self.timezone = timezone
+
+        start = datetime.time(int(trading_start_time[:2]), int(trading_start_time[2:]))
+        end = datetime.time(int(trading_end_time[:2]), int(trading_end_time[2:]))
+        overnight = start >= end
+
+        # Overnight sessions end in the next year, so include its holidays
+        import holidays
+        exchange_holidays = holidays.NYSE(years=[year, year + 1])
+        self.early_closes = nyse_early_closes(year, exchange_holidays)
+
+        self.opens = array('q')
+        self.closes = array('q')
+        self._session_dates = []
+        self._session_index = {}
+
+        day = datetime.date(year, 1, 1)
+        while day.year == year:
+            if day.weekday() < 5 and day not in exchange_holidays:
+                open_ts = pd.Timestamp.combine(day, start).tz_localize(timezone)
+                close_day = day + datetime.timedelta(days=1) if overnight else day
+                close_ts = pd.Timestamp.combine(close_day, end).tz_localize(timezone)
+
+                if day in self.early_closes and not overnight:
+                    early_close = pd.Timestamp.combine(day, EARLY_CLOSE_TIME).tz_localize(EXCHANGE_TIMEZONE)
+                    close_ts = min(close_ts, early_close)
+
+                self._session_index[day] = len(self.opens)
+                self._session_dates.append(day)
+                self.opens.append(open_ts.value)
+                self.closes.append(close_ts.value)
+
+            day += datetime.timedelta(days=1)
+
+    def is_trading_day(self, day: datetime.date) -> bool:
+        """Check if a date has a trading session.
+
+        Args:
+            day (datetime.date): Date to check
+
+        Returns:
+            bool: True if the exchange trades on that date, False otherwise
+        """
+        return day in self._session_index
+
+    def is_early_close(self, day: datetime.date) -> bool:
+        """Check if a date has an early close.
+
+        Args:
+            day (datetime.date): Date to check
+
+        Returns:
+            bool: True if the session closes early, False otherwise
+        """
+        return day in self.early_closes
+
+    def is_open(self, now_ns: int) -> bool:
+        """Check if an instant falls within a session.
+
+        Args:
+            now_ns (int): Instant in UTC nanoseconds
+
+        Returns:
+            bool: True if a session is open, False otherwise
+        """
+        idx = bisect_right(self.opens, now_ns) - 1
+        return idx >= 0 and now_ns < self.closes[idx]
+
+    def next_open(self, now_ns: int) -> Optional[int]:
+        """Return the first session open strictly after an instant.
+
+        Args:
+            now_ns (int): Instant in UTC nanoseconds
+
+        Returns:
+            Optional[int]: Session open in UTC nanoseconds, None if past the last session of the year
+        """
+        idx = bisect_right(self.opens, now_ns)
+        return self.opens[idx] if idx < len(self.opens) else None
+
+    def session_bounds(self, day: datetime.date) -> Optional[tuple]:
+        """Return the open and close of the session starting on a date.
+
+        Args:
+            day (datetime.date): Session date
+
+        Returns:
+            Optional[tuple]: (open, close) in UTC nanoseconds, None if the date has no session
+        """
+        idx = self._session_index.get(day)
+        if idx is None:
+            return None
+        return self.opens[idx], self.closes[idx]
@@ -2,6 +2,9 @@ import pandas as pd
 from src.utilities.utils import split_tenor_string
 
 
+INTRADAY_TENORS = ("s", "min", "h")
+
+
 class Period:
 
     def __init__(self, tenor_str: str):
@@ -12,10 +15,24 @@ class Period:
     def _check_frequency(self, tenor: str):
         if tenor == "m":
             raise ValueError("Superfluous 'm' tenor. Use min for minutes or M for month.")
-        elif tenor not in ("min", "b", "d", "W", "M", "Q", "SA", "Y", "D", "B"):
+        elif tenor not in ("s", "min", "h", "b", "d", "W", "M", "Q", "SA", "Y", "D", "B"):
             raise ValueError("tenor not recognized")
         
         return tenor
 
+    @property
+    def is_intraday(self) -> bool:
+        return self.tenor in INTRADAY_TENORS
+
+    @property
+    def frequency(self) -> str:
+        """Pandas frequency string, e.g. 5min"""
+        return str(self.units) + self.tenor
+
+    def to_timedelta(self) -> pd.Timedelta:
+        if not self.is_intraday:
+            raise ValueError(f"Period {self} has no fixed length")
+        return pd.Timedelta(self.frequency)
+
     def __str__(self):
         return str(self.units) + " " + self.tenor
@@ -0,0 +1,225 @@
+import os
+import sys
+import time
+import signal
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+PROFILE_MODES = ('sample', 'cprofile', 'tracemalloc')
+
+
+class Profiler:
+    """On-demand profiling of a running trading loop.
+
+    A profile is requested with SIGUSR1 or by writing a control file containing
+    "<mode> [seconds]", or "stop" to end a running profile early. The request only sets
+    a flag. The trading loop calls checkpoint() on every iteration, which starts and
+    finishes the profile on the loop thread, so an idle profiler costs one attribute
+    check per iteration.
+
+    Modes:
+        sample: A background thread samples the loop thread's stack every sample_interval
+            seconds and writes the folded stacks, readable by flamegraph tools.
+        cprofile: Deterministic cProfile of the loop thread, written as pstats and text.
+        tracemalloc: Top allocators by line between the start and the end of the profile.
+    """
+
+    def __init__(self,
+                 output_dir: str,
+                 default_mode: str = 'sample',
+                 default_duration: float = 30.0,
+                 sample_interval: float = 0.005,
+                 control_file: Optional[str] = None,
+                 control_poll: float = 1.0) -> None:
+        """Initialize the profiler.
+
+        Args:
+            output_dir (str): Directory of the profile files
+            default_mode (str): Mode of requests without a mode, including SIGUSR1
+            default_duration (float): Seconds profiled when a request has no duration
+            sample_interval (float): Seconds between stack samples in sample mode
+            control_file (Optional[str]): Path polled for requests, disabled if None
+            control_poll (float): Seconds between polls of the control file
+        """
+        if default_mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {default_mode}. Expected one of {PROFILE_MODES}")
+
+        self.output_dir = output_dir
+        self.default_mode = default_mode
+        self.default_duration = default_duration
+        self.sample_interval = sample_interval
+        self.control_file = control_file
+        self.control_poll = control_poll
+
+        self._request: Optional[Tuple[str, float]] = None
+        self._stop_requested = False
+        self._active: Optional[dict] = None
+
+        self._stop_event = threading.Event()
+        self._watcher = None
+
+    @property
+    def active(self) -> bool:
+        return self._active is not None
+
+    def install(self) -> None:
+        """Register the SIGUSR1 handler and start polling the control file."""
+        if hasattr(signal, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, self._on_signal)
+            logging.info(f"Profiler: Send SIGUSR1 to pid {os.getpid()} to profile for {self.default_duration}s")
+
+        if self.control_file is not None:
+            self._stop_event.clear()
+            self._watcher = threading.Thread(target=self._watch_control_file, name="ProfilerControl", daemon=True)
+            self._watcher.start()
+            logging.info(f"Profiler: Watching {self.control_file} for profile requests")
+
+    def uninstall(self) -> None:
+        """Stop polling the control file and finish any running profile."""
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+        if self._active is not None:
+            self._finish()
+
+    def request(self, mode: Optional[str] = None, duration: Optional[float] = None) -> None:
+        """Request a profile, started at the next checkpoint.
+
+        Args:
+            mode (Optional[str]): One of PROFILE_MODES, defaults to default_mode
+            duration (Optional[float]): Seconds to profile, defaults to default_duration
+        """
+        mode = mode or self.default_mode
+        if mode not in PROFILE_MODES:
+            logging.warning(f"Profiler: Ignoring request for unknown mode {mode}")
+            return
+        self._request = (mode, duration or self.default_duration)
+
+    def request_stop(self) -> None:
+        """Finish the running profile at the next checkpoint."""
+        self._stop_requested = True
+
+    def checkpoint(self) -> None:
+        """Start or finish a profile. Called by the trading loop on every iteration."""
+        if self._request is None and self._active is None:
+            return
+
+        if self._active is not None:
+            if self._stop_requested or time.monotonic() >= self._active['deadline']:
+                self._finish()
+            return
+
+        mode, duration = self._request
+        self._request = None
+        self._stop_requested = False
+        self._start(mode, duration)
+
+    def _on_signal(self, signum, frame) -> None:
+        if self._active is not None:
+            self.request_stop()
+        else:
+            self.request()
+
+    def _watch_control_file(self) -> None:
+        while not self._stop_event.wait(self.control_poll):
+            if not os.path.exists(self.control_file):
+                continue
+
+            try:
+                with open(self.control_file) as f:
+                    command = f.read().split()
+                os.remove(self.control_file)
+            except OSError as e:
+                logging.warning(f"Profiler: Failed to read {self.control_file}: {e}")
+                continue
+
+            if command and command[0] == 'stop':
+                self.request_stop()
+            else:
+                try:
+                    duration = float(command[1]) if len(command) > 1 else None
+                except ValueError:
+                    logging.warning(f"Profiler: Ignoring invalid request {command}")
+                    continue
+                self.request(command[0] if command else None, duration)
+
+    def _start(self, mode: str, duration: float) -> None:
+        active = {'mode': mode, 'deadline': time.monotonic() + duration, 'started': datetime.now()}
+
+        if mode == 'cprofile':
+            import cProfile
+            active['profile'] = cProfile.Profile()
+            active['profile'].enable()
+        elif mode == 'sample':
+            active['stacks'] = Counter()
+            active['stop'] = threading.Event()
+            active['thread'] = threading.Thread(target=self._sample,
+                                                args=(threading.get_ident(), active['stacks'], active['stop']),
+                                                name="ProfilerSampler", daemon=True)
+            active['thread'].start()
+        else:
+            active['tracing'] = not tracemalloc.is_tracing()
+            if active['tracing']:
+                tracemalloc.start(25)
+            active['snapshot'] = tracemalloc.take_snapshot()
+
+        self._active = active
+        logging.info(f"Profiler: Started {mode} profile for {duration}s")
+
+    def _finish(self) -> None:
+        active, self._active = self._active, None
+        self._stop_requested = False
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"profile_{active['mode']}_{active['started'].strftime('%Y%m%d_%H%M%S')}")
+
+        if active['mode'] == 'cprofile':
+            import pstats
+            active['profile'].disable()
+            active['profile'].dump_stats(path + ".prof")
+            with open(path + ".txt", 'w') as f:
+                pstats.Stats(active['profile'], stream=f).sort_stats('cumulative').print_stats(50)
+            path += ".prof"
+
+        elif active['mode'] == 'sample':
+            active['stop'].set()
+            active['thread'].join()
+            stacks = active['stacks']
+            path += ".folded"
+            with open(path, 'w') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{';'.join(stack)} {count}\n")
+
+            leaves = Counter()
+            for stack, count in stacks.items():
+                leaves[stack[-1]] += count
+            total = sum(stacks.values()) or 1
+            top = ", ".join(f"{frame} {count / total:.0%}" for frame, count in leaves.most_common(5))
+            logging.info(f"Profiler: {total} samples, top frames: {top}")
+
+        else:
+            snapshot = tracemalloc.take_snapshot()
+            if active['tracing']:
+                tracemalloc.stop()
+            path += ".txt"
+            with open(path, 'w') as f:
+                for stat in snapshot.compare_to(active['snapshot'], 'lineno')[:25]:
+                    f.write(f"{stat}\n")
+
+        logging.info(f"Profiler: Wrote {active['mode']} profile to {path}")
+
+    def _sample(self, thread_id: int, stacks: Counter, stop: threading.Event) -> None:
+        while not stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                stacks[tuple(reversed(stack))] += 1
@@ -0,0 +1,74 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Optional, Tuple
+
+
+class SessionScheduler:
+    """Heap of session event deadlines that sleeps exactly until the next one.
+
+    Deadlines are int64 UTC nanoseconds. Waiting is done on a threading.Event, so a
+    pending wait returns immediately when the scheduler is cancelled for shutdown.
+    """
+
+    def __init__(self, stop_event: Optional[threading.Event] = None) -> None:
+        """Initialize the scheduler.
+
+        Args:
+            stop_event (Optional[threading.Event]): Event that cancels waits when set
+        """
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, deadline_ns: int, event: str) -> None:
+        """Schedule an event.
+
+        Args:
+            deadline_ns (int): Deadline in UTC nanoseconds
+            event (str): Name of the event
+        """
+        heapq.heappush(self._heap, (deadline_ns, next(self._counter), event))
+
+    def peek(self) -> Optional[Tuple[int, str]]:
+        """Return the earliest deadline and event without removing it.
+
+        Returns:
+            Optional[Tuple[int, str]]: (deadline_ns, event), None if nothing is scheduled
+        """
+        if not self._heap:
+            return None
+        deadline_ns, _, event = self._heap[0]
+        return deadline_ns, event
+
+    def clear(self) -> None:
+        """Remove all scheduled events."""
+        self._heap.clear()
+
+    def cancel(self) -> None:
+        """Cancel the current and all future waits."""
+        self.stop_event.set()
+
+    def wait_next(self) -> Optional[str]:
+        """Sleep until the earliest deadline and pop its event.
+
+        Returns:
+            Optional[str]: Name of the event, None if cancelled or nothing is scheduled
+        """
+        if not self._heap or self.stop_event.is_set():
+            return None
+
+        deadline_ns, _, event = self._heap[0]
+        timeout = max(0.0, (deadline_ns - time.time_ns()) / 1e9)
+        logging.debug(f"SessionScheduler: Sleeping {timeout:.1f} seconds until {event}")
+
+        if self.stop_event.wait(timeout):
+            return None
+
+        heapq.heappop(self._heap)
+        return event
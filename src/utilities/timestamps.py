@@ -0,0 +1,68 @@
+import time
+import calendar
+import datetime
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+
+# Internally all instants are int64 UTC nanoseconds since the epoch. Conversion to the
+# configured timezone only happens at the edges: logging, CSV files and display.
+
+NANOSECONDS_PER_SECOND = 1_000_000_000
+
+
+def now_ns() -> int:
+    """Current time in UTC nanoseconds."""
+    return time.time_ns()
+
+
+def to_ns(value) -> int:
+    """Convert an instant to UTC nanoseconds.
+
+    Args:
+        value: Integer nanoseconds, pd.Timestamp, datetime or ISO string. Naive values are taken as UTC.
+
+    Returns:
+        int: UTC nanoseconds
+    """
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, pd.Timestamp):
+        return value.value
+    if isinstance(value, datetime.datetime):
+        # Avoids constructing a pd.Timestamp per tick
+        seconds = calendar.timegm(value.utctimetuple()) if value.tzinfo is not None else calendar.timegm(value.timetuple())
+        return seconds * NANOSECONDS_PER_SECOND + value.microsecond * 1000
+    return pd.Timestamp(value).value
+
+
+def to_ns_array(timestamps) -> np.ndarray:
+    """Convert an array of instants to int64 UTC nanoseconds.
+
+    Args:
+        timestamps: Array of datetime64 values, integer nanoseconds or timestamp objects
+
+    Returns:
+        np.ndarray: int64 UTC nanoseconds
+    """
+    if isinstance(timestamps, pd.DatetimeIndex):
+        return timestamps.as_unit('ns').asi8
+    timestamps = np.asarray(timestamps)
+    if timestamps.dtype.kind == 'M':
+        return timestamps.astype('datetime64[ns]').astype(np.int64)
+    if timestamps.dtype == object:
+        return np.fromiter((to_ns(ts) for ts in timestamps), dtype=np.int64, count=timestamps.size)
+    return timestamps.astype(np.int64)
+
+
+def to_timestamp(ns: int, timezone: Optional[str] = None) -> pd.Timestamp:
+    """Convert UTC nanoseconds to a pd.Timestamp, in timezone if given."""
+    ts = pd.Timestamp(ns, tz='UTC')
+    return ts.tz_convert(timezone) if timezone is not None else ts
+
+
+def to_datetime_index(ns: np.ndarray, timezone: Optional[str] = None) -> pd.DatetimeIndex:
+    """Convert an array of UTC nanoseconds to a DatetimeIndex, in timezone if given."""
+    index = pd.DatetimeIndex(np.asarray(ns, dtype=np.int64).view('datetime64[ns]')).tz_localize('UTC')
+    return index.tz_convert(timezone) if timezone is not None else index
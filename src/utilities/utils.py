@@ -5,7 +5,6 @@ import pandas as pd
 import re
 from dateutil import relativedelta
 import pytz
-import holidays
 import configparser
 import os
 import datetime
@@ -111,6 +110,7 @@ def market_open(market_calendar='NYSE'):
         sys.exit()
 
     # Check if it's a holiday
+    import holidays
     market_holidays = holidays.NYSE() if market_calendar == 'NYSE' else holidays.UnitedKingdom()  # Add more calendars as needed
     if now.strftime('%Y-%m-%d') in market_holidays:
         message = f"Market is closed today for {market_holidays.get(now.strftime('%Y-%m-%d'))}."
@@ -0,0 +1,8 @@
+import os
+
+
+# Benchmarks are slow and need pytest-benchmark, so they only run on request:
+#   RUN_BENCHMARKS=1 python -m pytest test/benchmarks
+# RUN_BENCHMARKS=full also runs the 1M tick sizes.
+if not os.environ.get("RUN_BENCHMARKS"):
+    collect_ignore_glob = ["test_*.py"]
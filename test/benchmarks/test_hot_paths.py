@@ -0,0 +1,132 @@
+import pytest
+import os
+import asyncio
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from src.configuration import Configuration
+from src.mkt_data.mkt_data_state import MktDataState
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.portfolio.closed_buckets_ledger import ClosedBucketsLedger
+from src.strategys.take_profit_strategy import TakeProfitStrategy
+from src.utilities.timestamps import to_datetime_index
+from test.test_strategy.test_strategies import Quote
+
+pytest.importorskip("pytest_benchmark")
+
+
+SYMBOL = "AAPL250620C00200000"
+START_NS = pd.Timestamp("2025-06-02 09:30", tz="US/Eastern").value
+TICK_SIZES = [1_000, 100_000] + ([1_000_000] if os.environ.get("RUN_BENCHMARKS") == "full" else [])
+
+
+def make_quotes(count, start_ns=START_NS):
+    """Synthetic quotes 1ms apart with a random walk bid"""
+    bids = 1.0 + np.cumsum(np.random.default_rng(0).normal(0, 0.01, count))
+    timestamps = to_datetime_index(start_ns + np.arange(count, dtype=np.int64) * 1_000_000)
+    return [Quote(bid_price=float(bid), ask_price=float(bid) + 0.05, timestamp=ts, symbol=SYMBOL) 
+            for bid, ts in zip(bids, timestamps)]
+
+
+def make_market_data(mkt_data, count):
+    """Tick frame with the layout of _parse_tick_data, built without per-tick objects"""
+    bids = 1.0 + np.cumsum(np.random.default_rng(1).normal(0, 0.01, count))
+    return pd.DataFrame({
+        'symbol': SYMBOL,
+        'bid_price': bids,
+        'bid_size': 1,
+        'bid_exchange': "NYSE",
+        'ask_price': bids + 0.05,
+        'ask_size': 1,
+        'ask_exchange': "NYSE",
+        'conditions': None,
+        'tape': None,
+    }, index=to_datetime_index(START_NS + np.arange(count, dtype=np.int64) * 1_000_000).rename('datetime'))
+
+
+@pytest.fixture
+def cfg():
+    cfg = Configuration(os.path.join(os.getcwd(), "test", "test_strategy", "test_run.cfg"))
+    cfg.save_market_data = False
+    return cfg
+
+
+@pytest.fixture
+def mkt_data(cfg):
+    return MktDataState(cfg)
+
+
+def test_parse_tick_data(benchmark, mkt_data):
+    """Parse a batch of 1000 quotes"""
+    quotes = make_quotes(1_000)
+    df = benchmark(mkt_data._parse_tick_data, quotes)
+    assert len(df) == 1_000
+
+
+@pytest.mark.parametrize("stored_ticks", TICK_SIZES)
+def test_update_state(benchmark, mkt_data, stored_ticks):
+    """Ingest a batch of 10 quotes on top of the stored ticks, exposes per-call cost growing with history"""
+    mkt_data._market_data = make_market_data(mkt_data, stored_ticks)
+    batches = iter([make_quotes(10, START_NS + (stored_ticks + 10 * i) * 1_000_000) for i in range(200)])
+
+    def enqueue():
+        for quote in next(batches):
+            asyncio.run(mkt_data.update_quote_data(quote))
+
+    benchmark.pedantic(mkt_data.update_state, setup=enqueue, rounds=100)
+    assert len(mkt_data.latest_batch()) == 10
+
+
+@pytest.mark.parametrize("stored_ticks", TICK_SIZES)
+def test_latest_quote(benchmark, mkt_data, stored_ticks):
+    """Read the latest quote"""
+    mkt_data._market_data = make_market_data(mkt_data, stored_ticks)
+    quote = benchmark(mkt_data.latest_quote)
+    assert quote.symbol == SYMBOL
+
+
+@pytest.mark.parametrize("stored_ticks", TICK_SIZES)
+def test_take_profit_generate_signals(benchmark, cfg, mkt_data, stored_ticks):
+    """Evaluate the take-profit signal on the latest quote"""
+    mkt_data._market_data = make_market_data(mkt_data, stored_ticks)
+    benchmark(TakeProfitStrategy.generate_signals, mkt_data, cfg, {'profit_target': 10.0})
+
+
+def test_take_profit_first_trigger(benchmark, cfg):
+    """Evaluate the take-profit signal over a batch of 1000 ticks"""
+    bids = np.linspace(1.0, 2.0, 1_000)
+    timestamps = START_NS + np.arange(1_000, dtype=np.int64)
+    assert benchmark(TakeProfitStrategy.first_trigger, bids, timestamps, cfg, {'profit_target': 1.99}) == 990
+
+
+def test_process_latest_order(benchmark, cfg, tmp_path):
+    """Process a filled order, including the durable ledger append"""
+    portfolio_manager = PortfolioManager(cfg, None)
+    portfolio_manager.ledger = ClosedBucketsLedger(str(tmp_path / "ledger.db"))
+    order_ids = iter(range(1_000))
+
+    def place_order():
+        order = SimpleNamespace(id=str(next(order_ids)), symbol=SYMBOL, status="filled", qty="1", filled_avg_price="1.5")
+        portfolio_manager.orders.append((order, 0, False))
+        portfolio_manager._order_statuses[order.id] = SimpleNamespace(order=order)
+
+    benchmark.pedantic(portfolio_manager.process_latest_order, setup=place_order, rounds=100)
+    assert len(portfolio_manager.ledger.query()) == len(portfolio_manager.orders)
+    portfolio_manager.ledger.close()
+
+
+def test_ledger_query(benchmark, tmp_path):
+    """Query the filled buckets of a symbol from a ledger with 10k events"""
+    ledger = ClosedBucketsLedger(str(tmp_path / "ledger.db"))
+    conn = ledger._connection()
+    with conn:
+        conn.executemany(
+            "INSERT INTO closed_buckets "
+            "(bucket_idx, order_id, symbol, order_status, bucket_qty, fill_price, timestamp, reason) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(idx % 5, str(idx), SYMBOL if idx % 2 else "OTHER", "filled", 1.0, 1.5, START_NS + idx, "profit_target")
+             for idx in range(10_000)])
+
+    filled = benchmark(ledger.query, SYMBOL, "filled")
+    assert len(filled) == 5_000
+    ledger.close()
@@ -0,0 +1,31 @@
+import os
+import re
+import sys
+import subprocess
+
+
+# Cold import budgets in seconds, best of a few runs. pandas and numpy account for most
+# of the engine's import time, the Alpaca SDK is only imported when connecting.
+IMPORT_BUDGETS = {
+    "src.configuration": 0.05,
+    "src.execution_orchestrator": 0.4,
+}
+
+
+def import_time(module, runs=3):
+    """Cumulative import time of module in a fresh interpreter, from python -X importtime"""
+    times = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=os.getcwd(), capture_output=True, text=True, timeout=120)
+        match = re.search(rf"\|\s*(\d+) \| {re.escape(module)}$", result.stderr, re.MULTILINE)
+        times.append(int(match.group(1)) / 1e6)
+    return min(times)
+
+
+def test_import_budgets():
+    """Cold import of the configuration and the engine stays within budget"""
+    for module, budget in IMPORT_BUDGETS.items():
+        seconds = import_time(module)
+        print(f"\n{module}: {seconds * 1000:.0f} ms (budget {budget * 1000:.0f} ms)")
+        assert seconds <= budget
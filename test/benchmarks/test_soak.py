@@ -0,0 +1,26 @@
+import os
+import pandas as pd
+from src.configuration import Configuration
+from src.mkt_data.mkt_data_state import MktDataState
+from src.backtest.synthetic_market_data import SyntheticOptionFeed, run_soak
+
+
+# Half an hour by default, the full 6.5 hour session with RUN_BENCHMARKS=full
+SESSION_SECONDS = 23_400 if os.environ.get("RUN_BENCHMARKS") == "full" else 1_800
+EXPIRY_DAY_RATE = 25
+
+
+def test_soak_session():
+    """Soak MktDataState with a compressed session at expiry-day rates"""
+    cfg = Configuration(os.path.join(os.getcwd(), "test", "test_strategy", "test_run.cfg"))
+    cfg.save_market_data = False
+    feed = SyntheticOptionFeed(1, start=pd.Timestamp("2025-06-20 09:30", tz="America/New_York"),
+                               rate=EXPIRY_DAY_RATE, seed=0)
+
+    results = run_soak(MktDataState(cfg), feed, SESSION_SECONDS, sample_every=300)
+    print("\n" + results.to_string(index=False))
+
+    assert results['ticks_stored'].iloc[-1] == results['quotes'].iloc[-1]
+    # Every tick is kept, so memory grows with the tick count but not faster
+    bytes_per_tick = results['memory_mb'].iloc[-1] * 1e6 / results['ticks_stored'].iloc[-1]
+    assert bytes_per_tick < 2_000
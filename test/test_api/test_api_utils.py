@@ -3,7 +3,8 @@ from src.api.alpaca_api import AlpacaAPI
 import pytest
 import pandas as pd
 from datetime import datetime
-from src.api.api_utils import is_expiry_day, check_options_level
+from src.api.api_utils import is_expiry_day, check_options_level, round_to_tick
+from src.utilities.enums import Signal
 
 
 class MockOptionContract:
@@ -84,5 +85,11 @@ class TestApiUtils:
                   return_value=3):
                 assert check_options_level(self.api, 3) == False
 
-
-
+    def test_round_to_tick(self):
+        """Test limit prices are rounded away from the market on the option tick grid"""
+        assert round_to_tick(1.234, Signal.SELL) == 1.24
+        assert round_to_tick(1.234, Signal.BUY) == 1.23
+        assert round_to_tick(1.1, Signal.SELL) == 1.1
+        assert round_to_tick(3.12, Signal.SELL) == 3.15
+        assert round_to_tick(3.12, Signal.BUY) == 3.1
+        assert round_to_tick(4.35, Signal.SELL) == 4.35
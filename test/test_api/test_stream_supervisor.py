@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+import pandas as pd
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from src.api.alpaca_api import AlpacaAPI
+from src.api.stream_supervisor import StreamSupervisor
+
+
+class FakeStream:
+    """Stream whose run returns immediately when it drops, or blocks until stopped"""
+
+    def __init__(self, drops: bool) -> None:
+        self.drops = drops
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        if self.drops:
+            raise ConnectionError("connection lost")
+        self.stopped.wait()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+
+def test_reconnects_and_backfills():
+    """Test a dropped stream is recreated and the missed interval is reported"""
+    streams = [FakeStream(drops=True), FakeStream(drops=True), FakeStream(drops=False)]
+    created = []
+    disconnects = []
+
+    def factory():
+        created.append(streams[len(created)])
+        return created[-1]
+
+    supervisor = StreamSupervisor("test", factory, on_reconnect=disconnects.append, initial_backoff=0.01)
+    before_ns = time.time_ns()
+    supervisor.start()
+
+    deadline = time.monotonic() + 5
+    while supervisor.reconnects < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert supervisor.reconnects == 2
+    assert supervisor.stream is streams[2]
+    assert len(disconnects) == 2
+    assert all(before_ns <= disconnected_ns <= time.time_ns() for disconnected_ns in disconnects)
+
+    supervisor.stop()
+    supervisor.join(timeout=1)
+    assert streams[2].stopped.is_set()
+    assert supervisor.reconnects == 2
+
+
+def test_silent_stream_backfilled_when_messages_resume():
+    """Test a stream reconnected inside the SDK is detected from the silence and backfilled from its last message"""
+    stream = FakeStream(drops=False)
+    disconnects = []
+    supervisor = StreamSupervisor("test", lambda: stream, on_reconnect=disconnects.append, silence_timeout=0.05)
+    supervisor.start()
+
+    supervisor.heartbeat()
+    last_message_ns = supervisor._last_message_ns
+    time.sleep(0.2)
+    assert disconnects == []
+    assert supervisor._gap_start_ns == last_message_ns
+
+    supervisor.heartbeat()
+    deadline = time.monotonic() + 5
+    while not disconnects and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert disconnects == [last_message_ns]
+    assert supervisor.gaps == 1
+    assert supervisor.reconnects == 0
+
+    supervisor.stop()
+    supervisor.join(timeout=1)
+
+
+def test_backoff_delay():
+    """Test the reconnect delay doubles up to the maximum"""
+    supervisor = StreamSupervisor("test", MagicMock(), initial_backoff=1, max_backoff=10)
+    assert [supervisor.backoff_delay(attempt) for attempt in range(6)] == [1, 2, 4, 8, 10, 10]
+
+
+def test_resubscribe_and_backfill_on_reconnect(monkeypatch):
+    """Test the recreated option stream gets all subscriptions and the missed interval is backfilled from bars"""
+    monkeypatch.setattr("alpaca.data.live.option.OptionDataStream", MagicMock)
+    api = AlpacaAPI()
+    api.option_md_stream = MagicMock()
+    api.option_md_api = MagicMock()
+    api.option_md_api.get_option_latest_quote.return_value = {"AAPL250620C00200000": "quote"}
+    bar = SimpleNamespace(timestamp=pd.Timestamp("2025-06-02 14:01", tz="UTC"), open=1.0, high=1.2, low=0.9, 
+                          close=1.1, volume=10, trade_count=3, vwap=1.05)
+    api.option_md_api.get_option_bars.return_value = SimpleNamespace(data={"AAPL250620C00200000": [bar]})
+    quotes_handler, trades_handler, backfill_handler = AsyncMock(), AsyncMock(), MagicMock()
+
+    api.subscribe_option_md_updates(quotes_handler, trades_handler, ["AAPL250620C00200000"], backfill_handler=backfill_handler)
+    stream = api._create_option_md_stream()
+    disconnected = pd.Timestamp("2025-06-02 14:00:30", tz="UTC")
+    api._backfill_option_md(disconnected.value)
+
+    assert stream is api.option_md_stream
+    (resubscribed_quotes, symbol), _ = stream.subscribe_quotes.call_args
+    assert symbol == "AAPL250620C00200000"
+    stream.subscribe_trades.assert_called_once()
+
+    # The handlers report every message to the supervisor
+    api.option_md_supervisor = MagicMock()
+    asyncio.run(resubscribed_quotes("quote"))
+    quotes_handler.assert_awaited_once_with("quote")
+    api.option_md_supervisor.heartbeat.assert_called_once()
+
+    request = api.option_md_api.get_option_bars.call_args[0][0]
+    assert request.start == datetime(2025, 6, 2, 14, 0) # The SDK converts the start to naive UTC
+    quotes, bars = backfill_handler.call_args[0]
+    assert quotes == ["quote"]
+    assert list(bars["AAPL250620C00200000"]["close"]) == [1.1]
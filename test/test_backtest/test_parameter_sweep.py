@@ -0,0 +1,69 @@
+import pytest
+import os
+import numpy as np
+import pandas as pd
+from src.backtest.parameter_sweep import parameter_grid, simulate_session, run_sweep, main
+
+
+class TestParameterSweep:
+
+    @pytest.fixture
+    def data_dir(self, tmp_path):
+        """Write two recorded sessions in the format saved by MktDataState"""
+        for day, bids in (("20250617", [1.0, 1.2, 1.1, 1.3]), ("20250618", [1.0, 0.9, 0.8, 0.7])):
+            df = pd.DataFrame({
+                'datetime': pd.date_range(f"{day} 09:30", periods=len(bids), freq="s", tz="US/Eastern"),
+                'bid_price': bids,
+                'ask_price': [bid + 0.1 for bid in bids],
+            })
+            df.to_csv(os.path.join(str(tmp_path), f"market_data_AAPL250620C00200000_{day}.csv"), index=False)
+        return str(tmp_path)
+
+    def test_parameter_grid(self):
+        """Test inconsistent bucket counts are skipped"""
+        grid = parameter_grid([[0.1], [0.1, 0.2]], [2, 3], ["risk_on"])
+        assert grid == [((0.1,), 2, "risk_on"), ((0.1, 0.2), 3, "risk_on")]
+
+    def test_simulate_session(self):
+        """Test buckets are sold in order and the rest is marked at the last bid"""
+        bids = np.array([1.0, 1.2, 1.1, 1.3, 1.0])
+
+        # Buckets [1, 1, 2]: targets 1.1 and 1.3
+        pnl, sold = simulate_session(bids, 1.0, 4, [0.1, 0.3], 3, "risk_on")
+        assert sold == 2
+        assert pnl == pytest.approx(100 * (0.2 + 0.3 + 2 * 0.0))
+
+        # Second target never reached
+        pnl, sold = simulate_session(bids, 1.0, 4, [0.1, 0.5], 3, "risk_on")
+        assert sold == 1
+        assert pnl == pytest.approx(100 * 0.2)
+
+    def test_run_sweep(self, data_dir):
+        """Test the sweep ranks combinations across sessions on a process pool"""
+        grid = parameter_grid([[0.05], [0.5]], [2], ["risk_on", "risk_off"])
+        results = run_sweep(data_dir, grid, quantity=2, workers=2, chunk_size=1)
+
+        assert len(results) == 4
+        assert list(results['total_pnl']) == sorted(results['total_pnl'], reverse=True)
+        # Entry at the first ask of 1.1. Neither session reaches 1.65, so both contracts are marked at the close.
+        assert results.iloc[0]['profit_targets'] == "0.5"
+        assert results.iloc[0]['total_pnl'] == pytest.approx(100 * (2 * 0.2 - 2 * 0.4))
+
+    def test_cli_negative_ladder(self, data_dir, tmp_path, monkeypatch, capsys):
+        """Test ladders starting with a negative target are accepted inline and from a ladder file"""
+        monkeypatch.chdir(tmp_path)
+        ladder_file = tmp_path / "ladders.txt"
+        ladder_file.write_text("# Ladders\n-0.2,-0.1\n")
+
+        main(["--data-dir", data_dir, "--profit-targets=-0.1,-0.2,0.1;0.1,0.2,0.3", "--ladder-file", str(ladder_file),
+              "--sell-buckets", "3", "4", "--close-strategies", "risk_on", "--quantity", "4", "--workers", "1"])
+
+        output = list((tmp_path / "output").glob("parameter_sweep_*.csv"))
+        assert len(output) == 1
+        results = pd.read_csv(output[0])
+        assert sorted(results['profit_targets']) == ["-0.1, -0.2, 0.1", "-0.2, -0.1", "0.1, 0.2, 0.3"]
+
+    def test_cli_requires_ladders(self, data_dir):
+        """Test the sweep exits without any profit target ladder"""
+        with pytest.raises(SystemExit):
+            main(["--data-dir", data_dir, "--sell-buckets", "4", "--quantity", "4"])
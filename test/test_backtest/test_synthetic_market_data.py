@@ -0,0 +1,87 @@
+import pytest
+import os
+import asyncio
+import numpy as np
+import pandas as pd
+from src.configuration import Configuration
+from src.mkt_data.mkt_data_state import MktDataState
+from src.pricing.black_scholes import parse_option_symbol
+from src.backtest.synthetic_market_data import SyntheticOptionFeed, SyntheticQuote, SyntheticTrade, publish, run_soak
+
+
+START = pd.Timestamp("2025-06-20 09:30", tz="America/New_York")
+
+
+class TradeSink:
+    def __init__(self):
+        self.trades = []
+
+    async def update_trade_data(self, data):
+        self.trades.append(data)
+
+
+class TestSyntheticOptionFeed:
+
+    @pytest.fixture
+    def cfg(self):
+        cfg = Configuration(os.path.join(os.getcwd(), "test", "test_strategy", "test_run.cfg"))
+        cfg.save_market_data = False
+        return cfg
+
+    def test_generated_symbols(self):
+        """Test made up symbols are valid option symbols with weekly expiries from the start date"""
+        feed = SyntheticOptionFeed(12, start=START, seed=0)
+        expiries = [parse_option_symbol(symbol).expiry for symbol in feed.symbols]
+
+        assert expiries[0] == START.date()
+        assert all((later - earlier).days == 7 for earlier, later in zip(expiries, expiries[1:]))
+        assert len(set(feed.symbols)) == 12
+
+    def test_events(self):
+        """Test events are ordered within their second and quotes are sane"""
+        feed = SyntheticOptionFeed(["A", "B"], start=START, rate=50, trade_ratio=0.2, seed=0)
+        events = [event for second in feed.seconds(10) for event in second]
+        timestamps = [event.timestamp for event in events]
+
+        assert timestamps == sorted(timestamps)
+        assert timestamps[0] >= START.to_pydatetime()
+        assert timestamps[-1] < (START + pd.Timedelta(seconds=10)).to_pydatetime()
+        assert {event.symbol for event in events} == {"A", "B"}
+
+        quotes = [event for event in events if isinstance(event, SyntheticQuote)]
+        trades = [event for event in events if isinstance(event, SyntheticTrade)]
+        assert all(0 < quote.bid_price < quote.ask_price for quote in quotes)
+        assert 0.1 < len(trades) / len(events) < 0.3
+        assert [trade.id for trade in trades] == list(range(1, len(trades) + 1))
+
+    def test_seed_and_bursts(self):
+        """Test a seed reproduces the stream and bursts raise the rate"""
+        first = SyntheticOptionFeed(1, start=START, seed=1).second(0)
+        second = SyntheticOptionFeed(1, start=START, seed=1).second(0)
+        assert first == second
+
+        calm = SyntheticOptionFeed(1, start=START, rate=10, burst_probability=0.0, seed=2)
+        bursty = SyntheticOptionFeed(1, start=START, rate=10, burst_probability=1.0, burst_multiplier=10, seed=2)
+        assert sum(map(len, bursty.seconds(20))) > 5 * sum(map(len, calm.seconds(20)))
+
+    def test_publish(self, cfg):
+        """Test quotes go to market data and trades to the portfolio"""
+        mkt_data = MktDataState(cfg)
+        sink = TradeSink()
+        events = SyntheticOptionFeed(1, start=START, rate=100, trade_ratio=0.5, seed=3).second(0)
+
+        asyncio.run(publish(events, mkt_data, sink))
+        mkt_data.update_state()
+
+        assert len(sink.trades) == sum(isinstance(event, SyntheticTrade) for event in events)
+        assert len(mkt_data.market_data) == len(events) - len(sink.trades)
+        assert mkt_data.market_data.index.is_monotonic_increasing
+
+    def test_run_soak(self, cfg):
+        """Test a short soak stores every quote and samples memory"""
+        feed = SyntheticOptionFeed(2, start=START, rate=20, seed=4)
+        results = run_soak(MktDataState(cfg), feed, 120, sample_every=60)
+
+        assert list(results['session_seconds']) == [60, 120]
+        assert results['ticks_stored'].iloc[-1] == results['quotes'].iloc[-1] > 0
+        assert np.all(results['memory_mb'] > 0)
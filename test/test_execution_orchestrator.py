@@ -0,0 +1,234 @@
+import os
+import re
+import pytest
+import asyncio
+from types import SimpleNamespace
+from src.configuration import Configuration
+from src.execution_orchestrator import ExecutionOrchestrator
+from test.test_strategy.test_strategies import Quote
+
+
+SYMBOL = "AAPL250620C00200000"
+TEST_CFG = os.path.join(os.getcwd(), "test", "test_portfolio_manager", "test_run.cfg")
+
+
+class MockApi:
+    """Places orders without a broker, the position is held once the entry is placed"""
+
+    def __init__(self, entry_price=1.0):
+        self.entry_price = entry_price
+        self.placed = []
+        self.closed = []
+        self.closed_all = False
+        self.position = None
+        self.on_order = None # Sends the trade update of a close order
+
+    def place_market_order(self, symbol, qty, side):
+        self.placed.append((symbol, qty, side))
+        self.position = SimpleNamespace(symbol=symbol, qty=str(qty), avg_entry_price=str(self.entry_price))
+        return SimpleNamespace(id=f"order-{len(self.placed)}", symbol=symbol, qty=str(qty))
+
+    def get_open_position_by_id(self, symbol):
+        return self.position
+
+    def close_position_by_id(self, symbol, qty):
+        self.closed.append((symbol, qty))
+        order = SimpleNamespace(id=f"close-{len(self.closed)}", symbol=symbol, qty=qty, status="filled", 
+                                filled_qty=qty, filled_avg_price="1.0")
+        if self.on_order is not None:
+            self.on_order(order)
+        return order
+
+    def close_all_positions(self):
+        self.closed_all = True
+
+    def get_orders(self, signal=None, status="all"):
+        return []
+
+    def place_limit_order(self, symbol, qty, side, limit_price, tif=None):
+        self.placed.append((symbol, qty, side))
+        return SimpleNamespace(id=f"order-{len(self.placed)}", symbol=symbol, qty=str(qty), limit_price=limit_price,
+                               status="new", filled_qty="0", filled_avg_price=None)
+
+    def cancel_order_by_id(self, order_id):
+        pass
+
+
+class TestExecutionOrchestrator:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        # The orchestrator writes its ledger, snapshots and journal under the working directory
+        monkeypatch.chdir(tmp_path)
+        self.path = tmp_path / "run.cfg"
+        with open(TEST_CFG) as f:
+            self.path.write_text(f.read() + "\n[Recovery]\nenable_recovery = True\n")
+        self.orchestrators = []
+        yield
+        for orchestrator in self.orchestrators:
+            orchestrator.portfolio_manager.ledger.close()
+            orchestrator.recovery_store.close()
+
+    def configure(self, section, **settings):
+        """Set settings of the test configuration, replacing the existing values"""
+        text = self.path.read_text()
+        for key, value in settings.items():
+            text = re.sub(rf"^{key} = .*\n", "", text, flags=re.M)
+            text = text.replace(f"[{section}]\n", f"[{section}]\n{key} = {value}\n")
+        self.path.write_text(text)
+
+    def orchestrator(self, api=None):
+        orchestrator = ExecutionOrchestrator(Configuration(str(self.path)))
+        orchestrator.api = api or MockApi()
+        orchestrator.portfolio_manager.api = orchestrator.api
+        orchestrator.portfolio_manager.wait_for_order_response = lambda order_id, timeout: None
+        orchestrator.api.on_order = lambda order: asyncio.run(
+            orchestrator.portfolio_manager.update_order_status(SimpleNamespace(order=order)))
+        self.orchestrators.append(orchestrator)
+        return orchestrator
+
+    def feed(self, orchestrator, batches, on_batch=None):
+        """Queue one batch of bids before each update_state call, failing the loop once they run out"""
+        mkt_data = orchestrator.mkt_data_state
+        mkt_data.QUOTE_POLL_TIMEOUT = 0.01
+        update_state = mkt_data.update_state
+        batches = list(batches)
+        calls = []
+
+        def scripted():
+            calls.append(len(calls))
+            if len(calls) > len(batches) + 20:
+                raise RuntimeError("Trading loop did not finish")
+            if len(calls) <= len(batches):
+                for bid in batches[len(calls) - 1]:
+                    asyncio.run(mkt_data.update_quote_data(Quote(bid_price=bid, symbol=SYMBOL)))
+                if on_batch is not None:
+                    on_batch(len(calls) - 1)
+            return update_state()
+
+        mkt_data.update_state = scripted
+
+    def test_restart_before_entry_places_entry(self):
+        """Test a snapshot taken before the entry order does not make the session recovered"""
+        first = self.orchestrator()
+        first._recover()
+        first._take_snapshot()
+        first.recovery_store.close()
+
+        restarted = self.orchestrator()
+        restarted._recover()
+        assert restarted._recovered == False
+
+    def test_restart_after_entry_recovers(self):
+        """Test a journaled entry order skips the entry after a restart"""
+        first = self.orchestrator()
+        first._recover()
+        first._take_snapshot()
+        order = first.api.place_market_order(SYMBOL, 4, None)
+        first.recovery_store.append("orchestrator.entry", order.id)
+        first.recovery_store.close()
+
+        restarted = self.orchestrator()
+        restarted._recover()
+        assert restarted._recovered == True
+        assert restarted._entry_order_id == "order-1"
+
+        # The entry order id is carried over by the next snapshot
+        restarted._take_snapshot()
+        restarted.recovery_store.close()
+        again = self.orchestrator()
+        again._recover()
+        assert again._entry_order_id == "order-1"
+
+    def test_missing_position(self):
+        """Test a missing position is reported before it is used"""
+        orchestrator = self.orchestrator()
+        orchestrator.api.get_open_position_by_id = lambda symbol: None
+        assert orchestrator._trading_execution() is None
+        assert orchestrator.profit_target_levels is None
+
+    def test_exit_strategy_closes_remaining_buckets(self):
+        """Test a triggered trailing stop closes every bucket but the runners"""
+        self.configure("Trading", profit_targets="0.5, 0.6, 0.7")
+        self.configure("Risk_Management", exit_strategy="trailing_stop", trail_pct=0.1)
+        orchestrator = self.orchestrator()
+        self.feed(orchestrator, [[1.0, 1.2], [1.15], [1.05]])
+
+        assert orchestrator._trading_execution() == True
+        assert orchestrator.api.closed == [(SYMBOL, "1")] * 3
+        assert orchestrator.api.closed_all == False
+        assert [orchestrator.portfolio_manager.bucket_filled(idx) for idx in range(4)] == [True, True, True, False]
+
+    def test_reloaded_targets_apply_to_later_buckets(self):
+        """Test profit targets reloaded while a bucket is open are used by the following buckets"""
+        self.configure("Run", watch_config="True")
+        self.configure("Trading", profit_targets="0.1, 0.2, 0.3")
+        orchestrator = self.orchestrator()
+        closed_before_batch = []
+
+        def on_batch(idx):
+            closed_before_batch.append(len(orchestrator.api.closed))
+            if idx == 0:
+                self.configure("Trading", profit_targets="0.1, 0.5, 0.6")
+                orchestrator.config_watcher._changed.set()
+
+        # The second bucket holds at 1.3, its target moved from 1.2 to 1.5
+        self.feed(orchestrator, [[1.0], [1.1], [1.3], [1.5], [1.6]], on_batch)
+
+        assert orchestrator._trading_execution() == True
+        assert orchestrator.profit_target_levels == pytest.approx([1.1, 1.5, 1.6])
+        assert closed_before_batch == [0, 0, 1, 1, 2]
+        assert orchestrator.api.closed == [(SYMBOL, "1")] * 3
+
+    def test_stop_leaves_trading_loop(self):
+        """Test stop(), as called on SIGTERM, leaves the trading loop without closing the position"""
+        self.configure("Trading", profit_targets="0.5, 0.6, 0.7")
+        orchestrator = self.orchestrator()
+        self.feed(orchestrator, [[1.0], [1.1]], lambda idx: orchestrator.stop())
+
+        assert orchestrator._trading_execution() == False
+        assert orchestrator.trading_session_manager.stop_event.is_set()
+        assert orchestrator.api.closed == []
+
+    def test_limit_ladder_drains_quotes(self):
+        """Test quotes keep being ingested while the limit ladder rests"""
+        self.configure("Trading", exit_order_type="limit")
+        orchestrator = self.orchestrator()
+        for bid in (1.0, 1.1, 1.2):
+            asyncio.run(orchestrator.mkt_data_state.update_quote_data(Quote(bid_price=bid, symbol=SYMBOL)))
+
+        # Leave the ladder after its first wake up
+        orchestrator.portfolio_manager.order_updated.set()
+        orchestrator._maybe_take_snapshot = orchestrator.trading_session_manager.stop_event.set
+
+        assert orchestrator._trading_execution() == False
+        assert orchestrator.mkt_data_state.has_pending_quotes() == False
+        assert list(orchestrator.mkt_data_state.market_data['bid_price']) == [1.0, 1.1, 1.2]
+
+    def test_limit_ladder_restart_after_out_of_order_fill(self):
+        """Test a restart after a later bucket filled first posts the earlier bucket and not the filled one"""
+        self.configure("Trading", exit_order_type="limit")
+        orchestrator = self.orchestrator()
+        orchestrator.portfolio_manager.ledger.append(1, "fill-1", SYMBOL, "filled", 1, 1.2, None, "profit_target")
+        orchestrator.portfolio_manager.populate_from_csv()
+
+        orchestrator.portfolio_manager.order_updated.set()
+        orchestrator._maybe_take_snapshot = orchestrator.trading_session_manager.stop_event.set
+
+        assert orchestrator._trading_execution() == False
+        assert [idx for _, idx, _ in orchestrator.portfolio_manager.orders] == [0, 2]
+
+    def test_limit_ladder_restart_after_partial_fill(self):
+        """Test a restart after a partially filled cancel posts only the rest of the bucket"""
+        self.configure("Trading", exit_order_type="limit")
+        self.configure("Positions", starting_position_quantity=8)
+        orchestrator = self.orchestrator()
+        orchestrator.portfolio_manager.ledger.append(0, "cancel-1", SYMBOL, "partially_filled", 1, 1.1, None, "profit_target")
+        orchestrator.portfolio_manager.populate_from_csv()
+
+        orchestrator.portfolio_manager.order_updated.set()
+        orchestrator._maybe_take_snapshot = orchestrator.trading_session_manager.stop_event.set
+
+        assert orchestrator._trading_execution() == False
+        assert [idx for _, idx, _ in orchestrator.portfolio_manager.orders] == [0, 1, 2]
+        assert [qty for _, qty, _ in orchestrator.api.placed[1:]] == [1, 2, 2]
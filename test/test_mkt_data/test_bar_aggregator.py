@@ -0,0 +1,88 @@
+import pytest
+import os
+import asyncio
+import numpy as np
+import pandas as pd
+from src.configuration import Configuration
+from src.mkt_data.mkt_data_state import MktDataState
+from src.mkt_data.bar_aggregator import BarAggregator
+from src.utilities.period import Period
+from test.test_strategy.test_strategies import Quote
+
+
+SECOND = 1_000_000_000
+
+
+class TestBarAggregator:
+
+    def test_ohlc(self):
+        """Test bars match a pandas resample of the same ticks"""
+        rng = np.random.default_rng(0)
+        timestamps_ns = np.sort(rng.integers(0, 600 * SECOND, 1000))
+        prices = rng.uniform(1, 2, 1000)
+
+        aggregator = BarAggregator(Period("1min"), capacity=2)
+        for batch in np.array_split(np.arange(1000), 37):
+            aggregator.update(timestamps_ns[batch], prices[batch])
+
+        expected = pd.Series(prices, index=pd.to_datetime(timestamps_ns, utc=True)).resample("1min").ohlc()
+        bars = aggregator.to_frame()
+
+        assert len(aggregator) == 10
+        assert aggregator.capacity == 16
+        np.testing.assert_allclose(bars[['open', 'high', 'low', 'close']].to_numpy(), expected.to_numpy())
+        assert bars['ticks'].sum() == 1000
+
+    def test_bounded(self):
+        """Test bounded mode keeps only the latest bars in order"""
+        aggregator = BarAggregator(Period("1s"), capacity=100, max_bars=3)
+        aggregator.update(np.arange(5) * SECOND, np.arange(5, dtype=float))
+
+        arrays = aggregator.arrays()
+        assert len(aggregator) == 3
+        assert aggregator.capacity == 3
+        assert list(arrays['close']) == [2.0, 3.0, 4.0]
+        assert list(arrays['start_ns']) == [2 * SECOND, 3 * SECOND, 4 * SECOND]
+
+    def test_late_ticks(self):
+        """Test late ticks update their bar if it is still held"""
+        aggregator = BarAggregator(Period("1s"), capacity=10, max_bars=2)
+        aggregator.update(np.array([0, SECOND, 2 * SECOND]), np.array([1.0, 1.0, 1.0]))
+        aggregator.update(np.array([SECOND + 1, 0]), np.array([5.0, 9.0]))
+
+        arrays = aggregator.arrays()
+        assert list(arrays['high']) == [5.0, 1.0]
+        assert list(arrays['ticks']) == [2, 1]
+
+    def test_period_tenors(self):
+        """Test intraday tenors convert to fixed intervals"""
+        assert Period("5min").to_timedelta() == pd.Timedelta(minutes=5)
+        assert Period("1s").is_intraday
+        with pytest.raises(ValueError):
+            Period("1D").to_timedelta()
+
+
+class TestMktDataStateBars:
+
+    def test_bars_built_on_ingest(self):
+        """Test the configured bars are updated with every ingested batch"""
+        cfg = Configuration(os.path.join(os.getcwd(), 
+                                   "test", 
+                                   "test_strategy", 
+                                   "test_run.cfg"))
+        cfg.save_market_data = False
+        cfg.bar_intervals = ["1s", "1min"]
+        mkt_data = MktDataState(cfg)
+
+        start = pd.Timestamp("2025-06-02 14:30:00", tz="UTC")
+        for offset, bid in [(0.1, 1.0), (0.5, 1.2), (1.2, 0.9), (61, 1.5)]:
+            asyncio.run(mkt_data.update_quote_data(
+                Quote(bid_price=bid, timestamp=start + pd.Timedelta(seconds=offset), symbol="AAPL")))
+            mkt_data.update_state()
+
+        seconds = mkt_data.bars("AAPL", "1s")
+        minutes = mkt_data.bars("AAPL", "1min")
+        assert list(seconds['close']) == [1.2, 0.9, 1.5]
+        assert list(minutes['high']) == [1.2, 1.5]
+        assert list(minutes['low']) == [0.9, 1.5]
+        assert str(minutes.index.tz) == cfg.timezone
@@ -0,0 +1,94 @@
+import pytest
+import os
+import asyncio
+import numpy as np
+import pandas as pd
+from src.configuration import Configuration
+from src.mkt_data.mkt_data_state import MktDataState
+from src.mkt_data.feed_latency_monitor import FeedLatencyMonitor, StreamingHistogram
+from test.test_strategy.test_strategies import Quote
+
+
+SECOND = 1_000_000_000
+
+
+class TestStreamingHistogram:
+
+    def test_percentiles(self):
+        """Test percentiles fall in the bucket of the true value"""
+        hist = StreamingHistogram()
+        hist.record(np.arange(1, 1001, dtype=float))
+
+        assert hist.count == 1000
+        assert hist.max == 1000
+        assert hist.mean == pytest.approx(500.5)
+        assert 500 <= hist.percentile(50) <= 500 * 10 ** 0.1
+        assert 990 <= hist.percentile(99) <= 990 * 10 ** 0.1
+
+    def test_empty(self):
+        """Test an empty histogram reports NaN"""
+        assert np.isnan(StreamingHistogram().percentile(50))
+
+
+class TestFeedLatencyMonitor:
+
+    def test_latency_and_gaps_per_symbol(self):
+        """Test latency and inter-tick gaps are tracked separately per symbol"""
+        monitor = FeedLatencyMonitor(stale_threshold=5)
+        exchange_ns = np.array([0, SECOND, 0, 3 * SECOND])
+        receive_ns = exchange_ns + np.array([10, 10, 200, 200]) * 1_000_000
+        monitor.record_batch(np.array(['A', 'A', 'B', 'B']), exchange_ns, receive_ns)
+        monitor.record_batch(np.array(['A']), np.array([4 * SECOND]), np.array([4 * SECOND + 10_000_000]))
+
+        summary = monitor.summary()
+        assert summary['A']['ticks'] == 3
+        assert summary['A']['latency_max'] == pytest.approx(10)
+        assert summary['B']['latency_max'] == pytest.approx(200)
+        assert summary['A']['gap_max'] == pytest.approx(3000)
+        assert summary['B']['gap_max'] == pytest.approx(3000)
+
+    def test_stale(self):
+        """Test a symbol is stale once its latest quote is older than the threshold"""
+        monitor = FeedLatencyMonitor(stale_threshold=5)
+        monitor.record_batch(np.array(['A', 'B']), np.array([0, 4 * SECOND]), np.array([0, 4 * SECOND]))
+
+        assert not monitor.is_stale(now_ns=5 * SECOND)
+        assert monitor.is_stale(now_ns=6 * SECOND)
+        assert not monitor.is_stale('B', now_ns=6 * SECOND)
+        assert monitor.is_stale('C', now_ns=0)
+        assert monitor.quote_age('B', now_ns=6 * SECOND) == pytest.approx(2)
+
+
+class TestMktDataStateStaleness:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Set up test fixtures before each test method."""
+        self.cfg = Configuration(os.path.join(os.getcwd(), 
+                                        "test", 
+                                        "test_strategy", 
+                                        "test_run.cfg"))
+        self.cfg.save_market_data = False
+        self.mkt_data = MktDataState(self.cfg)
+        self.mkt_data.QUOTE_POLL_TIMEOUT = 0.01
+
+    def test_stalled_feed(self):
+        """Test update_state returns an empty batch on a stalled feed and the quote goes stale"""
+        timestamp = pd.Timestamp.now(tz="UTC") - pd.Timedelta(seconds=60)
+        asyncio.run(self.mkt_data.update_quote_data(Quote(bid_price=1.0, timestamp=timestamp, symbol="AAPL")))
+
+        assert self.mkt_data.update_state()
+        assert self.mkt_data.is_stale()
+        assert self.mkt_data.latency_monitor.summary()['AAPL']['latency_max'] >= 60_000
+
+        assert not self.mkt_data.update_state()
+        assert self.mkt_data.latest_batch().empty
+        assert 'bid_price' in self.mkt_data.latest_batch().columns
+        assert len(self.mkt_data.market_data) == 1
+
+    def test_fresh_quotes(self):
+        """Test quotes within the threshold are not stale"""
+        asyncio.run(self.mkt_data.update_quote_data(Quote(bid_price=1.0, symbol="AAPL")))
+        self.mkt_data.update_state()
+
+        assert not self.mkt_data.is_stale()
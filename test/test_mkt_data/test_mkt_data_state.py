@@ -0,0 +1,119 @@
+import pytest
+import os
+import asyncio
+import pandas as pd
+from unittest.mock import MagicMock
+from src.configuration import Configuration
+from src.mkt_data.mkt_data_state import MktDataState
+from src.api.alpaca_api import AlpacaAPI
+from test.test_strategy.test_strategies import Quote
+
+
+class TestUnderlyingJoin:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Set up test fixtures before each test method."""
+        self.cfg = Configuration(os.path.join(os.getcwd(), 
+                                        "test", 
+                                        "test_strategy", 
+                                        "test_run.cfg"))
+        self.cfg.subscribe_underlying = True
+        self.mkt_data = MktDataState(self.cfg)
+
+    def test_option_quotes_joined_with_latest_underlying(self):
+        """Test each option quote is paired with the underlying quote received before it"""
+        option = "AAPL250620C00200000"
+
+        asyncio.run(self.mkt_data.update_quote_data(Quote(bid_price=1.0, symbol=option)))
+        asyncio.run(self.mkt_data.update_underlying_quote_data(Quote(bid_price=200.0, ask_price=200.1, symbol="AAPL")))
+        asyncio.run(self.mkt_data.update_quote_data(Quote(bid_price=1.1, symbol=option)))
+        asyncio.run(self.mkt_data.update_underlying_quote_data(Quote(bid_price=201.0, ask_price=201.1, symbol="AAPL")))
+        asyncio.run(self.mkt_data.update_underlying_quote_data(Quote(bid_price=99.0, ask_price=99.1, symbol="TSLA")))
+        asyncio.run(self.mkt_data.update_quote_data(Quote(bid_price=1.2, symbol=option)))
+        self.mkt_data.update_state()
+
+        df = self.mkt_data.market_data
+        assert pd.isna(df['underlying_bid_price'].iloc[0])
+        assert list(df['underlying_bid_price'].iloc[1:]) == [200.0, 201.0]
+        assert list(df['underlying_ask_price'].iloc[1:]) == [200.1, 201.1]
+        assert self.mkt_data.underlying_symbol(option) == "AAPL"
+
+    def test_unparseable_symbol(self):
+        """Test quotes of symbols without a known underlying are stored without a join"""
+        asyncio.run(self.mkt_data.update_underlying_quote_data(Quote(bid_price=99.0, symbol="TSLA")))
+        asyncio.run(self.mkt_data.update_quote_data(Quote(bid_price=1.0, symbol="TSLA25071800200000")))
+        self.mkt_data.update_state()
+
+        assert pd.isna(self.mkt_data.latest_quote().underlying_bid_price)
+
+    def test_underlying_subscriptions_deduplicated(self):
+        """Test contracts on the same underlying share a single subscription"""
+        api = AlpacaAPI()
+        api.option_md_stream = MagicMock()
+        api.equity_md_stream = MagicMock()
+        handler = self.mkt_data.update_underlying_quote_data
+
+        api.subscribe_option_md_updates(None, None, ["AAPL250620C00200000", "AAPL250620P00180000"], handler)
+        api.subscribe_option_md_updates(None, None, ["AAPL250718C00210000", "SPY250620C00500000"], handler)
+
+        subscribed = [call.args[1:] for call in api.equity_md_stream.subscribe_quotes.call_args_list]
+        assert subscribed == [("AAPL",), ("SPY",)]
+
+
+class TestBackfill:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Set up test fixtures before each test method."""
+        self.cfg = Configuration(os.path.join(os.getcwd(), 
+                                        "test", 
+                                        "test_strategy", 
+                                        "test_run.cfg"))
+        self.cfg.save_market_data = False
+        self.mkt_data = MktDataState(self.cfg)
+
+    def test_backfill_merged_in_order_without_duplicates(self):
+        """Test backfilled quotes are merged in timestamp order and known quotes are dropped"""
+        start = pd.Timestamp("2025-06-02 14:00:00", tz="UTC")
+        live = [Quote(bid_price=1.0 + i / 10, timestamp=start + pd.Timedelta(seconds=10 * i), symbol="AAPL") for i in range(3)]
+        for quote in live:
+            asyncio.run(self.mkt_data.update_quote_data(quote))
+        self.mkt_data.update_state()
+
+        missed = Quote(bid_price=9.9, timestamp=start + pd.Timedelta(seconds=15), symbol="AAPL")
+        self.mkt_data.backfill_quote_data([live[1], missed])
+        asyncio.run(self.mkt_data.update_quote_data(
+            Quote(bid_price=2.0, timestamp=start + pd.Timedelta(seconds=30), symbol="AAPL")))
+        self.mkt_data.update_state()
+
+        df = self.mkt_data.market_data
+        assert list(df['bid_price']) == [1.0, 1.1, 9.9, 1.2, 2.0]
+        assert df.index.is_monotonic_increasing
+        assert list(self.mkt_data.latest_batch()['bid_price']) == [2.0]
+
+    def test_backfilled_bars_fill_missed_interval(self):
+        """Test bars of the missed interval are merged into the session bars, replacing incomplete bars"""
+        index = pd.date_range("2025-06-02 14:00", periods=3, freq="min", tz="UTC", name="datetime")
+        self.mkt_data.seed({"AAPL": pd.DataFrame({'close': [1.0, 1.1, 1.2]}, index=index)}, [])
+
+        missed = pd.DataFrame({'close': [1.25, 1.3, 1.4]}, index=index[2:].append(index[2:] + pd.Timedelta(minutes=1)).append(
+            index[2:] + pd.Timedelta(minutes=2)))
+        self.mkt_data.backfill_quote_data([], {"AAPL": missed})
+        asyncio.run(self.mkt_data.update_quote_data(Quote(bid_price=1.5, symbol="AAPL")))
+        self.mkt_data.update_state()
+
+        assert list(self.mkt_data.historical_bars("AAPL")['close']) == [1.0, 1.1, 1.25, 1.3, 1.4]
+
+    def test_snapshot_keeps_latest_ticks(self):
+        """Test snapshots hold only the latest snapshot_max_ticks ticks"""
+        self.cfg.snapshot_max_ticks = 2
+        start = pd.Timestamp("2025-06-02 14:00:00", tz="UTC")
+        for i in range(5):
+            asyncio.run(self.mkt_data.update_quote_data(
+                Quote(bid_price=1.0 + i / 10, timestamp=start + pd.Timedelta(seconds=i), symbol="AAPL")))
+        self.mkt_data.update_state()
+
+        snapshot = self.mkt_data.snapshot_state()
+        assert list(snapshot['market_data']['bid_price']) == [1.3, 1.4]
+        assert len(self.mkt_data.market_data) == 5
@@ -0,0 +1,171 @@
+import pytest
+import os
+import time
+import uuid
+import asyncio
+import multiprocessing
+import numpy as np
+import pandas as pd
+from src.configuration import Configuration
+from src.mkt_data.mkt_data_state import MktDataState
+from src.mkt_data.shared_quote_ring import SharedQuoteRing, SharedQuoteReader, quotes_to_records
+from src.mkt_data.feed_handler import FeedHandler
+from src.backtest.synthetic_market_data import SyntheticOptionFeed, SyntheticQuote
+
+
+START = pd.Timestamp("2025-06-20 09:30", tz="America/New_York")
+
+
+def make_quotes(count, symbols=("AAPL250620C00200000",)):
+    feed = SyntheticOptionFeed(list(symbols), start=START, rate=2 * count, trade_ratio=0.0, burst_probability=0.0, seed=0)
+    return [event for event in feed.second(0) if isinstance(event, SyntheticQuote)][:count]
+
+
+def read_in_child(name, queue):
+    """Attach to the ring from another process and send back the bids"""
+    ring = SharedQuoteRing(name)
+    queue.put(ring.reader(from_start=True).read()['bid_price'].tolist())
+    ring.close()
+
+
+class TestSharedQuoteRing:
+
+    @pytest.fixture
+    def ring(self):
+        ring = SharedQuoteRing(f"test_ring_{uuid.uuid4().hex[:8]}", 8)
+        yield ring
+        ring.close()
+        ring.unlink()
+
+    def test_round_trip(self, ring):
+        """Test records keep their fields and sequence numbers, and readers filter symbols"""
+        quotes = make_quotes(5, ["A", "B"])
+        reader = ring.reader()
+        only_a = ring.reader(["A"])
+        ring.write(quotes, receive_ns=42)
+
+        records = reader.read()
+        assert records['seq'].tolist() == [0, 1, 2, 3, 4]
+        assert records['bid_price'].tolist() == [quote.bid_price for quote in quotes]
+        assert np.char.decode(records['symbol']).tolist() == [quote.symbol for quote in quotes]
+        assert set(records['receive_ns']) == {42}
+        assert reader.read().size == 0
+
+        assert set(only_a.read()['symbol']) == {b"A"}
+
+    def test_overrun(self, ring):
+        """Test a reader lapped by the writer skips to the oldest record held and counts the rest"""
+        reader = ring.reader()
+        ring.write_records(quotes_to_records(make_quotes(5)))
+        ring.write_records(quotes_to_records(make_quotes(7)))
+
+        records = reader.read()
+        assert records['seq'].tolist() == list(range(4, 12))
+        assert reader.dropped == 4
+        assert ring.write_seq == 12
+
+    def test_torn_records_dropped(self, ring):
+        """Test records in slots claimed by the writer are dropped"""
+        reader = ring.reader()
+        ring.write_records(quotes_to_records(make_quotes(8)))
+        ring._header['claim_seq'] = 10 # Writer busy with seq 8 and 9, overwriting seq 0 and 1
+
+        assert reader.read()['seq'].tolist() == list(range(2, 8))
+        assert reader.dropped == 2
+
+    def test_other_process(self, ring):
+        """Test another process reads the records without a copy through a pipe"""
+        quotes = make_quotes(3)
+        ring.write(quotes)
+
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=read_in_child, args=(ring.name, queue))
+        process.start()
+        bids = queue.get(timeout=30)
+        process.join(timeout=30)
+
+        assert bids == [quote.bid_price for quote in quotes]
+
+    def test_attach_invalid(self):
+        """Test attaching to a block that is not a quote ring fails"""
+        from multiprocessing import shared_memory
+        shm = shared_memory.SharedMemory(create=True, size=256)
+        try:
+            with pytest.raises(ValueError):
+                SharedQuoteRing(shm.name)
+        finally:
+            shm.close()
+            shm.unlink()
+
+
+class TestSharedFeed:
+
+    @pytest.fixture
+    def cfg(self):
+        cfg = Configuration(os.path.join(os.getcwd(), "test", "test_strategy", "test_run.cfg"))
+        cfg.save_market_data = False
+        return cfg
+
+    def test_records_match_websocket_ticks(self, cfg):
+        """Test ticks read from the ring are stored like ticks received on the websocket"""
+        quotes = make_quotes(50)
+        direct = MktDataState(cfg)
+        for quote in quotes:
+            asyncio.run(direct.update_quote_data(quote))
+        direct.update_state()
+
+        shared = MktDataState(cfg)
+        shared.update_quote_records(quotes_to_records(quotes[:20]))
+        shared.update_quote_records(quotes_to_records(quotes[20:]))
+        shared.update_state()
+
+        pd.testing.assert_frame_equal(shared.market_data, direct.market_data)
+        assert len(shared.latest_batch()) == 50
+
+    def test_reader_thread(self, cfg):
+        """Test the reader hands new records to MktDataState"""
+        ring = SharedQuoteRing(f"test_ring_{uuid.uuid4().hex[:8]}", 64)
+        mkt_data = MktDataState(cfg)
+        reader = SharedQuoteReader(ring.name, mkt_data.update_quote_records, ["AAPL250620C00200000"])
+        reader.start()
+        try:
+            ring.write(make_quotes(10))
+            deadline = time.monotonic() + 10
+            while len(mkt_data.market_data) < 10 and time.monotonic() < deadline:
+                mkt_data.update_state()
+        finally:
+            reader.stop()
+            ring.close()
+            ring.unlink()
+
+        assert len(mkt_data.market_data) == 10
+        assert reader.dropped == 0
+
+    def test_feed_handler(self, cfg):
+        """Test the feed handler writes live and backfilled quotes and removes the ring on stop"""
+        class Api:
+            def connect_market_data(self, config):
+                pass
+
+            def subscribe_option_md_updates(self, quotes_handler, trades_handler, symbols, backfill_handler=None):
+                self.quotes_handler, self.backfill_handler = quotes_handler, backfill_handler
+
+            def close_websockets(self):
+                pass
+
+        api = Api()
+        name = f"test_ring_{uuid.uuid4().hex[:8]}"
+        feed_handler = FeedHandler(cfg, [cfg.instrument_id], name, 16, api)
+        feed_handler.start()
+
+        quotes = make_quotes(3)
+        reader = SharedQuoteRing(name)
+        cursor = reader.reader()
+        asyncio.run(api.quotes_handler(quotes[0]))
+        api.backfill_handler(quotes[1:])
+        assert cursor.read()['bid_price'].tolist() == [quote.bid_price for quote in quotes]
+
+        reader.close()
+        feed_handler.stop()
+        with pytest.raises(FileNotFoundError):
+            SharedQuoteRing(name)
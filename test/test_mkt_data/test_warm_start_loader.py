@@ -0,0 +1,72 @@
+import pytest
+import os
+import pandas as pd
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from src.configuration import Configuration
+from src.mkt_data.mkt_data_state import MktDataState
+from src.mkt_data.warm_start_loader import WarmStartLoader
+from test.test_strategy.test_strategies import Quote
+
+
+SYMBOL = "AAPL250620C00200000"
+OPEN = pd.Timestamp("2025-06-02 09:30", tz="America/New_York")
+
+
+def make_bars(start, count):
+    """Minute bars with close prices 1.0, 1.1, ..."""
+    return [SimpleNamespace(timestamp=(start + pd.Timedelta(minutes=i)).to_pydatetime(), 
+                            open=1.0, high=1.0, low=1.0, close=1.0 + i / 10, 
+                            volume=10, trade_count=2, vwap=1.0) 
+            for i in range(count)]
+
+
+class TestWarmStartLoader:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test fixtures before each test method."""
+        self.cfg = Configuration(os.path.join(os.getcwd(), 
+                                        "test", 
+                                        "test_strategy", 
+                                        "test_run.cfg"))
+        self.api = MagicMock()
+        self.loader = WarmStartLoader(self.api, str(tmp_path))
+
+    def test_repeat_calls_served_from_cache(self):
+        """Test bars are fetched once and then read from the cache file"""
+        self.api.get_option_bars.return_value = SimpleNamespace(data={SYMBOL: make_bars(OPEN, 5)})
+        end = OPEN + pd.Timedelta(minutes=5)
+
+        first = self.loader.load_bars(SYMBOL, OPEN, end)
+        second = self.loader.load_bars(SYMBOL, OPEN, end)
+
+        assert self.api.get_option_bars.call_count == 1
+        assert os.path.exists(self.loader.cache_path(SYMBOL, OPEN))
+        assert list(second['close']) == pytest.approx([1.0, 1.1, 1.2, 1.3, 1.4])
+        pd.testing.assert_frame_equal(first, second, check_freq=False)
+
+    def test_cache_extended_incrementally(self):
+        """Test only bars after the last cached bar are fetched when the session moved on"""
+        self.api.get_option_bars.return_value = SimpleNamespace(data={SYMBOL: make_bars(OPEN, 3)})
+        self.loader.load_bars(SYMBOL, OPEN, OPEN + pd.Timedelta(minutes=3))
+
+        self.api.get_option_bars.return_value = SimpleNamespace(data={SYMBOL: make_bars(OPEN + pd.Timedelta(minutes=2), 3)})
+        bars = self.loader.load_bars(SYMBOL, OPEN, OPEN + pd.Timedelta(minutes=5))
+
+        _, start, _ = self.api.get_option_bars.call_args.args
+        assert pd.Timestamp(start) == OPEN + pd.Timedelta(minutes=2)
+        assert len(bars) == 5
+        assert bars.index.is_unique and bars.index.is_monotonic_increasing
+
+    def test_seed(self):
+        """Test market data is seeded with the bars and the latest quote"""
+        self.api.get_option_bars.return_value = SimpleNamespace(data={SYMBOL: make_bars(OPEN, 3)})
+        self.api.get_option_latest_quotes.return_value = {SYMBOL: Quote(bid_price=1.25, timestamp=OPEN + pd.Timedelta(minutes=3), symbol=SYMBOL)}
+        mkt_data = MktDataState(self.cfg)
+
+        self.loader.seed(mkt_data, [SYMBOL], OPEN, OPEN + pd.Timedelta(minutes=3))
+
+        assert len(mkt_data.historical_bars(SYMBOL)) == 3
+        assert mkt_data.latest_quote().bid_price == 1.25
+        assert mkt_data.historical_bars("OTHER").empty
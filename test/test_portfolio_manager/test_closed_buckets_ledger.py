@@ -0,0 +1,89 @@
+import pytest
+import os
+import pandas as pd
+from types import SimpleNamespace
+from src.portfolio.closed_buckets_ledger import ClosedBucketsLedger
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.configuration import Configuration
+
+
+class TestClosedBucketsLedger:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test fixtures before each test method."""
+        self.cfg = Configuration(os.path.join(os.getcwd(), 
+                                        "test", 
+                                        "test_portfolio_manager", 
+                                        "test_run.cfg"))
+        self.ledger = ClosedBucketsLedger(os.path.join(str(tmp_path), "positions_closed.db"))
+        yield
+        self.ledger.close()
+
+    def test_append_and_query(self):
+        """Test events are appended and can be queried by symbol and status"""
+        assert self.ledger.exists() == False
+
+        self.ledger.append(0, "a", "AAPL250620C00200000", "filled", 1, 1.5, None, "profit_target")
+        self.ledger.append(1, "b", "AAPL250620C00200000", "cancelled", 1, None, None, "profit_target")
+        self.ledger.append(1, "c", "AAPL250620C00200000", "filled", 1, 1.7, None, "profit_target")
+        self.ledger.append(0, "d", "TSLA25071800200000", "filled", 2, 3.0, None, "profit_target")
+
+        assert self.ledger.exists() == True
+        assert len(self.ledger.query()) == 4
+
+        filled = self.ledger.query(symbol="AAPL250620C00200000", order_status="filled")
+        assert list(filled.index) == [0, 1]
+        assert list(filled['order_id']) == ["a", "c"]
+        assert sum(filled['bucket_qty']) == 2
+
+    def test_timestamps_stored_as_ns(self):
+        """Test timestamps are stored as UTC nanoseconds, also when given as timestamps or text"""
+        ts = pd.Timestamp("2025-06-02 09:30:00.000000001", tz="US/Eastern")
+        self.ledger.append(0, "a", "AAPL250620C00200000", "filled", 1, 1.5, ts.value, "profit_target")
+        self.ledger.append(1, "b", "AAPL250620C00200000", "filled", 1, 1.5, ts, "profit_target")
+        self.ledger.append(2, "c", "AAPL250620C00200000", "filled", 1, 1.5, str(ts), "profit_target")
+
+        assert list(self.ledger.query()['timestamp']) == [ts.value] * 3
+
+    def test_populate_from_ledger(self):
+        """Test populate_from_csv restores the filled buckets from the ledger"""
+        portfolio_manager = PortfolioManager(self.cfg, None)
+        portfolio_manager.ledger = self.ledger
+
+        order = SimpleNamespace(id="a", symbol="AAPL250620C00200000", status="filled", qty="1", filled_avg_price="1.5")
+        portfolio_manager.orders.append((order, 0, False))
+        portfolio_manager._order_statuses["a"] = SimpleNamespace(order=order)
+
+        assert portfolio_manager.process_latest_order() == True
+
+        restored = PortfolioManager(self.cfg, None)
+        restored.ledger = ClosedBucketsLedger(self.ledger.path)
+        restored.populate_from_csv()
+        restored.ledger.close()
+
+        assert restored.filled_buckets == [0]
+        assert len(restored.closed_buckets) == 1
+
+    def test_populate_with_gaps(self):
+        """Test buckets filled out of order are restored by idx, leaving the skipped bucket open"""
+        portfolio_manager = PortfolioManager(self.cfg, None)
+        portfolio_manager.ledger = self.ledger
+        for order_id, idx in (("a", 0), ("b", 2)):
+            order = SimpleNamespace(id=order_id, symbol="AAPL250620C00200000", status="filled", qty="1", filled_avg_price="1.5")
+            portfolio_manager.orders.append((order, idx, False))
+            portfolio_manager._order_statuses[order_id] = SimpleNamespace(order=order)
+            assert portfolio_manager.process_latest_order() == True
+
+        restored = PortfolioManager(self.cfg, None)
+        restored.ledger = ClosedBucketsLedger(self.ledger.path)
+        restored.populate_from_csv()
+        restored.ledger.close()
+
+        assert restored.filled_buckets == [0, 2]
+        assert [restored.bucket_filled(idx) for idx in range(4)] == [True, False, True, False]
+
+        # The snapshot path restores the same buckets
+        snapshot = PortfolioManager(self.cfg, None)
+        snapshot.restore_state(portfolio_manager.snapshot_state())
+        assert snapshot.filled_buckets == [0, 2]
@@ -0,0 +1,125 @@
+import os
+import pytest
+import asyncio
+from types import SimpleNamespace
+from src.configuration import Configuration
+from src.portfolio.limit_ladder import LimitLadder
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.portfolio.closed_buckets_ledger import ClosedBucketsLedger
+
+
+SYMBOL = "AAPL250620C00200000"
+
+
+class MockApi:
+    """Records the orders placed and cancelled, the trade updates are sent by the tests"""
+
+    def __init__(self, open_orders=()):
+        self.open_orders = list(open_orders)
+        self.placed = []
+        self.cancelled = []
+
+    def _order(self, kind, qty, limit_price=None):
+        order = SimpleNamespace(id=f"order-{len(self.placed) + 1}", symbol=SYMBOL, qty=str(qty), limit_price=limit_price,
+                                status="new", filled_qty="0", filled_avg_price=None)
+        self.placed.append((kind, qty, limit_price))
+        return order
+
+    def get_orders(self, signal=None, status="all"):
+        return self.open_orders
+
+    def place_limit_order(self, symbol, qty, side, limit_price, tif=None):
+        return self._order("limit", qty, limit_price)
+
+    def close_position_by_id(self, symbol, qty):
+        return self._order("market", int(qty))
+
+    def cancel_order_by_id(self, order_id):
+        self.cancelled.append(order_id)
+
+
+class TestLimitLadder:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        cfg = Configuration(os.path.join(os.getcwd(), "test", "test_portfolio_manager", "test_run.cfg"))
+        self.api = MockApi([SimpleNamespace(id="stale", symbol=SYMBOL, qty="1"),
+                            SimpleNamespace(id="other", symbol="TSLA25071800200000", qty="1")])
+        self.portfolio_manager = PortfolioManager(cfg, self.api)
+        self.portfolio_manager.ledger = ClosedBucketsLedger(os.path.join(str(tmp_path), "positions_closed.db"))
+        self.ladder = LimitLadder(self.api, self.portfolio_manager, SYMBOL)
+        self.ladder.post([(0, 1, 1.1), (1, 2, 1.234), (2, 1, 3.12)])
+        yield
+        self.portfolio_manager.ledger.close()
+
+    def update(self, order_id, status, filled_qty=0, price=None):
+        order = SimpleNamespace(id=order_id, symbol=SYMBOL, status=status, filled_qty=str(filled_qty), filled_avg_price=price,
+                                qty=next(order.qty for order, _, _ in self.portfolio_manager.orders if order.id == order_id))
+        asyncio.run(self.portfolio_manager.update_order_status(SimpleNamespace(order=order)))
+
+    def test_post(self):
+        """Test every bucket rests at its target rounded up to the tick, after stale orders are cancelled"""
+        assert self.api.cancelled == ["stale"]
+        assert self.api.placed == [("limit", 1, 1.1), ("limit", 2, 1.24), ("limit", 1, 3.15)]
+        assert self.ladder.open_buckets == [0, 1, 2]
+        assert self.ladder.process() == False
+
+    def test_fills_recorded_per_bucket(self):
+        """Test fills close their bucket in the ledger and the ladder ends once all buckets are filled"""
+        self.update("order-2", "filled", 2, 1.25)
+        assert self.portfolio_manager.order_updated.is_set()
+        assert self.ladder.process() == False
+        assert self.ladder.open_buckets == [0, 2]
+        assert self.portfolio_manager.bucket_filled(1)
+
+        self.update("order-1", "filled", 1, 1.1)
+        self.update("order-3", "filled", 1, 3.15)
+        assert self.ladder.process() == True
+
+        filled = self.portfolio_manager.ledger.query(symbol=SYMBOL, order_status="filled")
+        assert list(filled.index) == [1, 0, 2]
+        assert list(filled['fill_price']) == [1.25, 1.1, 3.15]
+
+    def test_reposted_after_cancel(self):
+        """Test a cancelled bucket is posted again for the contracts it did not sell"""
+        self.update("order-2", "canceled", 1, 1.24)
+        assert self.ladder.process() == False
+        assert self.api.placed[-1] == ("limit", 1, 1.24)
+        assert not self.portfolio_manager.bucket_filled(1)
+        assert self.portfolio_manager.bucket_remaining(1, 2) == 1
+
+        # The contracts sold before the cancel are kept in the ledger
+        ledger = self.portfolio_manager.ledger.query()
+        assert list(ledger['order_status']) == ["partially_filled"]
+        assert list(ledger['bucket_qty']) == [1]
+        assert list(ledger['fill_price']) == [1.24]
+
+        self.update("order-4", "filled", 1, 1.24)
+        self.ladder.process()
+        assert self.ladder.open_buckets == [0, 2]
+
+    def test_reprice(self):
+        """Test changed targets cancel the resting orders, posted again at the new price"""
+        self.ladder.reprice({0: 1.1, 1: 1.5, 2: 3.12})
+        assert self.api.cancelled == ["stale", "order-2"]
+
+        self.update("order-2", "canceled")
+        self.ladder.process()
+        assert self.api.placed[-1] == ("limit", 2, 1.5)
+
+    def test_switch_to_market(self):
+        """Test the expiry cutoff replaces the remaining limit orders with market orders"""
+        self.update("order-1", "filled", 1, 1.1)
+        self.ladder.process()
+
+        self.ladder.switch_to_market()
+        assert self.api.cancelled == ["stale", "order-2", "order-3"]
+
+        # order-3 filled before the cancel reached the broker
+        self.update("order-2", "canceled")
+        self.update("order-3", "filled", 1, 3.15)
+        assert self.ladder.process() == False
+        assert self.api.placed[-1] == ("market", 2, None)
+
+        self.update("order-4", "filled", 2, 1.0)
+        assert self.ladder.process() == True
@@ -0,0 +1,178 @@
+import os
+import time
+import pytest
+import asyncio
+import threading
+from types import SimpleNamespace
+from src.configuration import Configuration
+from src.portfolio.order_batcher import OrderBatcher
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.portfolio.closed_buckets_ledger import ClosedBucketsLedger
+
+
+SYMBOL = "AAPL250620C00200000"
+
+
+class MockApi:
+    """Close orders that take latency seconds to return, filled up to filled_qty if given"""
+
+    def __init__(self, latency=0.0, filled_qty=None, fail=()):
+        self.latency = latency
+        self.filled_qty = filled_qty
+        self.fail = fail
+        self.calls = []
+        self.on_order = None
+        self._lock = threading.Lock()
+
+    def close_position_by_id(self, symbol, qty):
+        time.sleep(self.latency)
+        if symbol in self.fail:
+            raise ConnectionError("rejected")
+
+        with self._lock:
+            self.calls.append((symbol, qty))
+            order_id = f"order-{len(self.calls)}"
+        filled = self.filled_qty is None
+        order = SimpleNamespace(id=order_id, symbol=symbol, qty=qty, status="filled" if filled else "cancelled",
+                                filled_qty=qty if filled else str(self.filled_qty), filled_avg_price="1.5")
+        if self.on_order is not None:
+            self.on_order(order)
+        return order
+
+
+class TestOrderBatcher:
+
+    def test_same_symbol_merged(self):
+        """Test intents of one symbol become one order for their total quantity"""
+        api = MockApi()
+        batcher = OrderBatcher(api, window=0.01)
+        batcher.add(SYMBOL, 1, 0)
+        batcher.add(SYMBOL, 2, 1)
+
+        placed = batcher.flush()
+        batcher.close()
+
+        assert api.calls == [(SYMBOL, "3")]
+        assert [intent.bucket_idx for intent in placed[0][1]] == [0, 1]
+        assert batcher.flush() == []
+
+    def test_window_only_with_other_producers(self):
+        """Test a single producer's intents are sent at once, and the window is waited for with several"""
+        api = MockApi()
+        batcher = OrderBatcher(api, window=0.5)
+        batcher.add(SYMBOL, 1, 0)
+        start = time.perf_counter()
+        batcher.flush()
+        assert time.perf_counter() - start < 0.25
+
+        batcher = OrderBatcher(api, window=0.1, producers=2)
+        batcher.add(SYMBOL, 1, 0)
+        threading.Timer(0.02, batcher.add, (SYMBOL, 2, 1)).start()
+        start = time.perf_counter()
+        placed = batcher.flush()
+        batcher.close()
+
+        assert time.perf_counter() - start >= 0.09
+        assert api.calls[-1] == (SYMBOL, "3")
+        assert [intent.bucket_idx for intent in placed[0][1]] == [0, 1]
+
+    def test_symbols_sent_concurrently(self):
+        """Test orders of different symbols are placed at the same time"""
+        api = MockApi(latency=0.2)
+        batcher = OrderBatcher(api, window=0.0)
+        for symbol in ("AAPL250620C00200000", "AAPL250620P00180000", "TSLA25071800200000"):
+            batcher.add(symbol, 1, 0)
+
+        start = time.perf_counter()
+        placed = batcher.flush()
+        elapsed = time.perf_counter() - start
+        batcher.close()
+
+        assert [order.symbol for order, _ in placed] == ["AAPL250620C00200000", "AAPL250620P00180000", "TSLA25071800200000"]
+        assert elapsed < 0.4
+
+    def test_failed_order_dropped(self, caplog):
+        """Test a failed symbol is logged without losing the orders of the others"""
+        api = MockApi(fail=("TSLA25071800200000",))
+        batcher = OrderBatcher(api, window=0.0)
+        batcher.add("TSLA25071800200000", 1, 0)
+        batcher.add(SYMBOL, 1, 0)
+
+        placed = batcher.flush()
+        batcher.close()
+
+        assert [order.symbol for order, _ in placed] == [SYMBOL]
+        assert "Failed to close TSLA25071800200000 buckets [0]" in caplog.text
+
+
+class TestBatchedPortfolioManager:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.cfg = Configuration(os.path.join(os.getcwd(), "test", "test_portfolio_manager", "test_run.cfg"))
+        self.cfg.batch_orders = True
+        self.ledger = ClosedBucketsLedger(os.path.join(str(tmp_path), "positions_closed.db"))
+        yield
+        self.ledger.close()
+
+    def portfolio_manager(self, api):
+        portfolio_manager = PortfolioManager(self.cfg, api)
+        portfolio_manager.ledger = self.ledger
+        # Trade updates arrive while the close is placed
+        api.on_order = lambda order: asyncio.run(portfolio_manager.update_order_status(SimpleNamespace(order=order)))
+        return portfolio_manager
+
+    def test_fill_allocated_per_bucket(self):
+        """Test a merged fill closes each bucket with its own quantity"""
+        api = MockApi()
+        portfolio_manager = self.portfolio_manager(api)
+
+        portfolio_manager.close_buckets([(SYMBOL, 1, 0), (SYMBOL, 2, 1)])
+
+        assert api.calls == [(SYMBOL, "3")]
+        assert portfolio_manager.latest_order_pending() == False
+        assert portfolio_manager.process_latest_order() == True
+        assert portfolio_manager.bucket_filled(0) and portfolio_manager.bucket_filled(1)
+        assert not portfolio_manager.bucket_filled(2)
+
+        filled = self.ledger.query(symbol=SYMBOL, order_status="filled")
+        assert list(filled.index) == [0, 1]
+        assert list(filled['bucket_qty']) == [1, 2]
+        assert list(filled['order_id']) == ["order-1", "order-1"]
+        assert portfolio_manager.process_latest_order() == False
+
+    def test_partial_fill_allocated_in_bucket_order(self):
+        """Test a partially filled merged order fills the first buckets and reopens the rest"""
+        api = MockApi(filled_qty=2)
+        portfolio_manager = self.portfolio_manager(api)
+
+        portfolio_manager.close_buckets([(SYMBOL, 1, 0), (SYMBOL, 1, 1), (SYMBOL, 1, 2)])
+
+        assert portfolio_manager.process_latest_order() == True
+        assert [portfolio_manager.bucket_filled(idx) for idx in range(3)] == [True, True, False]
+        assert list(self.ledger.query()['order_status']) == ["filled", "filled", "cancelled"]
+
+    def test_partial_fill_inside_bucket(self):
+        """Test a merged order filled partway through a bucket leaves only the rest of it to close"""
+        api = MockApi(filled_qty=3)
+        portfolio_manager = self.portfolio_manager(api)
+
+        portfolio_manager.close_buckets([(SYMBOL, 2, 0), (SYMBOL, 2, 1)])
+
+        assert portfolio_manager.process_latest_order() == True
+        assert portfolio_manager.bucket_filled(0) and not portfolio_manager.bucket_filled(1)
+        assert portfolio_manager.bucket_remaining(1, 2) == 1
+        assert list(self.ledger.query()['order_status']) == ["filled", "partially_filled"]
+        assert list(self.ledger.query()['bucket_qty']) == [2, 1]
+
+    def test_replay_batched_order(self):
+        """Test a batched order placed before a restart is allocated once its fill is replayed"""
+        order = SimpleNamespace(id="order-1", symbol=SYMBOL, qty="3", status="filled", filled_qty="3", filled_avg_price="1.5")
+        portfolio_manager = PortfolioManager(self.cfg, None)
+        portfolio_manager.ledger = self.ledger
+
+        portfolio_manager.apply_event("order_batched", (order, [(0, 1), (1, 2)]))
+        portfolio_manager.apply_event("order_update", SimpleNamespace(order=order))
+
+        assert portfolio_manager.process_latest_order() == True
+        assert list(self.ledger.query()['bucket_qty']) == [1, 2]
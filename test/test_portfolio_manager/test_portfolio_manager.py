@@ -4,6 +4,9 @@ from src.portfolio.portfolio_manager import PortfolioManager
 import os
 from src.configuration import Configuration
 from unittest.mock import patch
+import asyncio
+from types import SimpleNamespace
+from src.portfolio.portfolio_manager import ORDER_ACK_SECONDS, ORDERS_PENDING
 
 
 class TestPortfolioManager:
@@ -33,7 +36,7 @@ class TestPortfolioManager:
 
             assert self.portfolio_manager.closed_buckets.empty == False
             assert len(self.portfolio_manager.closed_buckets) == 2
-            assert self.portfolio_manager.starting_idx == 2
+            assert self.portfolio_manager.filled_buckets == [0, 1]
 
     def test_populate_from_csv_empty(self):
         """Test populate_from_csv function"""
@@ -45,6 +48,25 @@ class TestPortfolioManager:
 
             assert self.portfolio_manager_tsla.closed_buckets.empty == True
             assert len(self.portfolio_manager_tsla.closed_buckets) == 0
-            assert self.portfolio_manager_tsla.starting_idx == 0
+            assert self.portfolio_manager_tsla.filled_buckets == []
 
 
+
+    def test_order_ack_metrics(self):
+        """Test the ack latency is observed once, also when the trade update beats the REST response"""
+        portfolio_manager = PortfolioManager(self.cfg, None) # The gauges follow the latest instance
+        order = SimpleNamespace(id="order-1", status="new")
+
+        class Api:
+            def close_position_by_id(self, symbol, qty):
+                asyncio.run(portfolio_manager.update_order_status(SimpleNamespace(order=order)))
+                return order
+
+        portfolio_manager.api = Api()
+        acks = ORDER_ACK_SECONDS.count
+
+        portfolio_manager.close_position_by_id(self.cfg.instrument_id, 1, 0)
+        asyncio.run(portfolio_manager.update_order_status(SimpleNamespace(order=order)))
+
+        assert ORDER_ACK_SECONDS.count == acks + 1
+        assert ORDERS_PENDING.value == 1
@@ -0,0 +1,164 @@
+import os
+import time
+import shutil
+import pytest
+import numpy as np
+from src.configuration import Configuration
+from src.portfolio.position_book import PositionBook, PositionSpec, bucket_quantities
+from src.utilities.utils import quantity_buckets
+
+
+DEFAULTS = {'profit_targets': [-0.1, -0.2, 0.1], 'sell_buckets': 4, 'close_strategy': 'risk_on', 'expiry_sell_cutoff': 65}
+TEST_CFG = os.path.join("test", "test_strategy", "test_run.cfg")
+
+
+def spec(symbol, source="test", **fields):
+    return PositionSpec(source, symbol, {key: str(value) for key, value in fields.items()})
+
+
+class TestPositionBook:
+
+    def test_defaults_and_overrides(self):
+        """Test empty fields take the defaults and set fields override them per position"""
+        book = PositionBook.compile([
+            spec("AAPL250620C00200000", quantity=4),
+            spec("AAPL250620P00180000", quantity=7, profit_targets="0.5", sell_buckets=2, close_strategy="risk_off", expiry_sell_cutoff=30),
+        ], DEFAULTS)
+
+        assert len(book) == 2
+        assert book.row("AAPL250620P00180000") == 1
+        assert book.row("TSLA25071800200000") is None
+        assert book.quantity.tolist() == [4, 7]
+        assert book.sell_buckets.tolist() == [4, 2]
+        assert book.expiry_sell_cutoff.tolist() == [65, 30]
+        assert book.position_targets(0).tolist() == [-0.1, -0.2, 0.1]
+        assert book.position_targets(1).tolist() == [0.5]
+        assert np.isnan(book.profit_targets[1, 1:]).all()
+        assert book.position_buckets(0).tolist() == [1, 1, 1, 1]
+        assert book.position_buckets(1).tolist() == [4, 3]
+
+    def test_errors_reported_together(self):
+        """Test every invalid position is reported in a single error"""
+        with pytest.raises(ValueError) as error:
+            PositionBook.compile([
+                spec("AAPL250620C00200000", quantity=4),
+                spec("AAPL250620C00200000", quantity=4),
+                spec("AAPL250620P00180000", source="positions.csv:3", quantity="four"),
+                spec("TSLA25071800200000", quantity=4, sell_buckets=3),
+                spec("TSLA25071800300000", quantity=2, close_strategy="yolo", colour="red"),
+                spec("TSLA25071800400000"),
+            ], DEFAULTS)
+
+        message = str(error.value)
+        assert message.startswith("7 position errors")
+        assert "duplicate position AAPL250620C00200000" in message
+        assert "positions.csv:3 AAPL250620P00180000: quantity is not valid: four" in message
+        assert "sell_buckets must be the number of profit targets + 1 = 4, got 3" in message
+        assert "unknown fields colour" in message
+        assert "close_strategy must be one of" in message
+        assert "quantity 2 is smaller than sell_buckets 4" in message
+        assert "TSLA25071800400000: quantity is required" in message
+
+    def test_no_positions(self):
+        with pytest.raises(ValueError, match="No positions configured"):
+            PositionBook.compile([], DEFAULTS)
+
+    def test_bucket_quantities_match_quantity_buckets(self):
+        """Test the vectorised buckets match quantity_buckets for every valid position"""
+        quantity, sell_buckets, risk_off = np.meshgrid(np.arange(2, 40), np.arange(1, 7), [False, True], indexing='ij')
+        quantity, sell_buckets, risk_off = quantity.ravel(), sell_buckets.ravel(), risk_off.ravel()
+        valid = quantity >= sell_buckets
+        quantity, sell_buckets, risk_off = quantity[valid], sell_buckets[valid], risk_off[valid]
+
+        buckets = bucket_quantities(quantity, sell_buckets, risk_off)
+        for row in range(len(quantity)):
+            expected = quantity_buckets(int(quantity[row]), int(sell_buckets[row]), "risk_off" if risk_off[row] else "risk_on")
+            if min(expected) > 0:
+                assert buckets[row, :sell_buckets[row]].tolist() == expected
+
+    def test_single_contract_is_a_runner(self):
+        book = PositionBook.compile([spec("AAPL250620C00200000", quantity=1)], DEFAULTS)
+        assert book.position_buckets(0).tolist() == [0, 0, 0, 1]
+
+
+class TestConfigurationPositions:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.path = tmp_path / "run.cfg"
+        shutil.copy(TEST_CFG, self.path)
+
+    def append(self, text):
+        with open(self.path, "a") as f:
+            f.write(text)
+
+    def test_single_position(self):
+        """Test the [Positions] instrument is the only position by default"""
+        cfg = Configuration(str(self.path))
+        assert cfg.positions.symbols == (cfg.instrument_id,)
+        assert cfg.positions.quantity.tolist() == [cfg.starting_position_quantity]
+
+    def test_sections_and_file(self, tmp_path):
+        """Test positions are read from the sections, then from the positions file"""
+        rows = ["symbol,quantity,profit_targets,sell_buckets,close_strategy"]
+        rows += [f'SPY250620C{strike:05d}000,3,"0.1, 0.2",3,risk_off' for strike in range(500)]
+        (tmp_path / "positions.csv").write_text("\n".join(rows) + "\n")
+        self.append("\n[Position AAPL250620P00180000]\nquantity = 2\nprofit_targets = 0.3\nsell_buckets = 2\n")
+        with open(self.path) as f:
+            text = f.read().replace("[Positions]\n", "[Positions]\npositions_file = positions.csv\n")
+        self.path.write_text(text)
+
+        start = time.perf_counter()
+        cfg = Configuration(str(self.path))
+        elapsed = time.perf_counter() - start
+
+        assert len(cfg.positions) == 502
+        assert cfg.positions.symbols[:2] == (cfg.instrument_id, "AAPL250620P00180000")
+        assert cfg.positions.position_targets(2).tolist() == [0.1, 0.2]
+        assert cfg.positions.position_buckets(501).tolist() == [1, 1, 1]
+        assert elapsed < 1.0
+
+    def test_invalid_section(self):
+        self.append("\n[Position AAPL250620P00180000]\nquantity = 2\n")
+        with pytest.raises(ValueError, match=r"\[Position AAPL250620P00180000\] AAPL250620P00180000: quantity 2 is smaller than sell_buckets 4"):
+            Configuration(str(self.path))
+
+    def test_reload_requires_restart(self):
+        """Test override changes reload while position changes require a restart"""
+        cfg = Configuration(str(self.path))
+        self.append("\n[Position AAPL250620P00180000]\nquantity = 4\n")
+        added = Configuration(str(self.path))
+        assert cfg.requires_restart(cfg.diff(added)) == ["positions"]
+
+        with open(self.path) as f:
+            text = f.read().replace("[Position AAPL250620P00180000]\nquantity = 4\n",
+                                    "[Position AAPL250620P00180000]\nquantity = 4\nexpiry_sell_cutoff = 10\n")
+        self.path.write_text(text)
+        changed = Configuration(str(self.path))
+        assert added.requires_restart(added.diff(changed)) == []
+        assert added.positions.changes(changed.positions) == ["AAPL250620P00180000 expiry_sell_cutoff: 65 -> 10"]
+
+    def test_traded_position_overrides(self):
+        """Test the overrides of the traded position are the effective settings and reload like them"""
+        with open(self.path) as f:
+            text = f.read().replace("instrument_id = AAPL250620C00200000\nstarting_position_quantity = 4\n", "")
+        self.path.write_text(text + "\n[Position AAPL250620P00180000]\nquantity = 5\nprofit_targets = 0.3, 0.4\n"
+                                    "sell_buckets = 3\nclose_strategy = risk_off\nexpiry_sell_cutoff = 10\n")
+        cfg = Configuration(str(self.path))
+
+        assert cfg.instrument_id == "AAPL250620P00180000"
+        assert cfg.profit_targets == [0.3, 0.4]
+        assert cfg.sell_buckets == 3
+        assert cfg.close_strategy == "risk_off"
+        assert cfg.expiry_sell_cutoff == 10
+
+        # Target changes reload, bucket changes require a restart
+        self.path.write_text(self.path.read_text().replace("profit_targets = 0.3, 0.4", "profit_targets = 0.5, 0.6"))
+        changed = Configuration(str(self.path))
+        changes = cfg.diff(changed)
+        assert changes['profit_targets'] == ([0.3, 0.4], [0.5, 0.6])
+        assert cfg.requires_restart(changes) == []
+
+        self.path.write_text(self.path.read_text().replace("profit_targets = 0.5, 0.6\nsell_buckets = 3",
+                                                           "profit_targets = 0.5\nsell_buckets = 2"))
+        assert cfg.requires_restart(cfg.diff(Configuration(str(self.path)))) == ["sell_buckets"]
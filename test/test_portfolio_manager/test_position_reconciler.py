@@ -0,0 +1,77 @@
+import pytest
+from types import SimpleNamespace
+from src.portfolio.position_reconciler import PositionReconciler
+
+
+class MockApi:
+    def __init__(self, positions):
+        self.positions = positions
+
+    def get_all_positions(self):
+        return [SimpleNamespace(symbol=symbol, qty=str(qty)) for symbol, qty in self.positions.items()]
+
+
+def fill(symbol, position_qty, event="fill"):
+    return SimpleNamespace(event=event, position_qty=str(position_qty), order=SimpleNamespace(symbol=symbol))
+
+
+class TestPositionReconciler:
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Set up test fixtures before each test method."""
+        self.api = MockApi({"AAPL250620C00200000": 4, "TSLA25071800200000": 2})
+        self.alerts = []
+        self.reconciler = PositionReconciler(self.api, 5, lambda *args: self.alerts.append(args))
+        self.reconciler.seed()
+
+    def test_no_drift(self):
+        """Test fills reflected at the broker do not raise alerts"""
+        self.reconciler.on_trade_update(fill("AAPL250620C00200000", 3))
+        self.api.positions["AAPL250620C00200000"] = 3
+
+        assert self.reconciler.reconcile() == {}
+        assert self.alerts == []
+
+    def test_manual_trade_detected(self):
+        """Test a broker change without a local fill is found by the full sweep and raises a single alert"""
+        self.api.positions["TSLA25071800200000"] = 1
+
+        assert self.reconciler.reconcile(full_sweep=False) == {}
+        assert self.reconciler.reconcile(full_sweep=True) == {}
+        assert self.reconciler.reconcile(full_sweep=False) == {"TSLA25071800200000": (2.0, 1.0)}
+        assert self.reconciler.reconcile(full_sweep=True) == {}
+        assert self.alerts == [("TSLA25071800200000", 2.0, 1.0)]
+
+        # Mismatch clears once the local cache catches up
+        self.reconciler.on_trade_update(fill("TSLA25071800200000", 1, event="partial_fill"))
+        self.reconciler.reconcile()
+        assert self.reconciler.mismatches == {}
+
+    def test_closed_position_detected(self):
+        """Test a position closed at the broker is detected"""
+        del self.api.positions["AAPL250620C00200000"]
+
+        self.reconciler.reconcile(full_sweep=True)
+        assert self.reconciler.reconcile() == {"AAPL250620C00200000": (4.0, 0.0)}
+
+    def test_fill_during_fetch_not_reported(self):
+        """Test a fill the broker positions did not include yet is checked again instead of reported"""
+        self.reconciler.on_trade_update(fill("AAPL250620C00200000", 3))
+
+        assert self.reconciler.reconcile() == {}
+        self.api.positions["AAPL250620C00200000"] = 3
+        assert self.reconciler.reconcile() == {}
+        assert self.alerts == []
+        assert self.reconciler.mismatches == {}
+
+    def test_only_changed_symbols_fetched(self):
+        """Test runs without fills, suspects or mismatches do not call the broker"""
+        self.api.get_all_positions = lambda: pytest.fail("Broker positions fetched without changes")
+        assert self.reconciler.reconcile(full_sweep=False) == {}
+
+    def test_non_fill_events_ignored(self):
+        """Test only fills update the local cache"""
+        self.reconciler.on_trade_update(fill("AAPL250620C00200000", 1, event="new"))
+
+        assert self.reconciler.positions["AAPL250620C00200000"] == 4.0
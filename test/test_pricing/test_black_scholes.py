@@ -0,0 +1,96 @@
+import pytest
+import datetime
+import numpy as np
+import pandas as pd
+from src.pricing.black_scholes import (
+    parse_option_symbol, 
+    bs_price, 
+    bs_delta, 
+    bs_theta, 
+    implied_volatility, 
+    price_target_from_underlying, 
+    book_greeks,
+    norm_cdf
+)
+
+
+class TestBlackScholes:
+
+    def test_parse_option_symbol(self):
+        """Test OCC symbols are parsed into their contract terms"""
+        spec = parse_option_symbol("AAPL250620C00200000")
+        assert spec.underlying == "AAPL"
+        assert spec.expiry == datetime.date(2025, 6, 20)
+        assert spec.is_call == True
+        assert spec.strike == 200.0
+        assert spec.expiry_ns == pd.Timestamp("2025-06-20 16:00", tz="America/New_York").value
+
+        assert parse_option_symbol("SPY250620P00512500").strike == 512.5
+
+        with pytest.raises(ValueError):
+            parse_option_symbol("TSLA25071800200000")
+
+    def test_norm_cdf(self):
+        """Test the normal cdf approximation"""
+        assert norm_cdf(0.0) == pytest.approx(0.5)
+        assert norm_cdf(1.96) == pytest.approx(0.9750021, abs=1e-6)
+        assert norm_cdf(-1.96) == pytest.approx(0.0249979, abs=1e-6)
+
+    def test_price_and_greeks(self):
+        """Test prices against a reference value and put-call parity"""
+        call = bs_price(100, 100, 1.0, 0.05, 0.2, True)
+        put = bs_price(100, 100, 1.0, 0.05, 0.2, False)
+        assert call == pytest.approx(10.4506, abs=1e-3)
+        assert call - put == pytest.approx(100 - 100 * np.exp(-0.05), abs=1e-6)
+
+        assert bs_delta(100, 100, 1.0, 0.05, 0.2, True) == pytest.approx(0.6368, abs=1e-3)
+        assert bs_delta(100, 100, 1.0, 0.05, 0.2, False) == pytest.approx(0.6368 - 1, abs=1e-3)
+        assert bs_theta(100, 100, 1.0, 0.05, 0.2, True) == pytest.approx(-6.414 / 365, abs=1e-4)
+
+        # Expired options are worth their intrinsic value
+        assert bs_price(110, 100, 0.0, 0.05, 0.2, True) == pytest.approx(10.0)
+        assert bs_delta(90, 100, 0.0, 0.05, 0.2, False) == -1.0
+
+    def test_implied_volatility_round_trip(self):
+        """Test implied volatilities are recovered for a whole array of quotes"""
+        spot = np.array([100, 100, 100, 100, 250])
+        strike = np.array([80, 100, 120, 100, 200])
+        t = np.array([0.01, 0.25, 0.5, 1.0, 2 / 365])
+        sigma = np.array([0.15, 0.3, 0.6, 1.5, 0.25])
+        is_call = np.array([True, False, True, True, False])
+
+        prices = bs_price(spot, strike, t, 0.03, sigma, is_call)
+        iv = implied_volatility(prices, spot, strike, t, 0.03, is_call)
+
+        np.testing.assert_allclose(iv[1:4], sigma[1:4], atol=1e-4)
+
+        # Deep in the money close to expiry the price does not depend on the volatility
+        assert np.isnan(iv[0]) and np.isnan(iv[4])
+
+        # Below intrinsic value there is no solution
+        assert np.isnan(implied_volatility(5.0, 120, 100, 0.5, 0.0, True))
+
+    def test_implied_volatility_zero_vega(self):
+        """Test NaN is returned instead of the starting guess where vega is near zero"""
+        # Far out of the money, a worthless option matches the price at the starting guess
+        assert np.isnan(implied_volatility(0.0, 100, 150, 0.02, 0.0, True))
+        assert np.isnan(implied_volatility(0.0, 100, 50, 0.02, 0.0, False))
+
+        # Sensitive quotes of the same book are still solved
+        iv = implied_volatility([0.0, bs_price(100, 100, 0.02, 0.0, 0.4, True)], 100, [150, 100], 0.02, 0.0, True)
+        assert np.isnan(iv[0])
+        assert iv[1] == pytest.approx(0.4, abs=1e-4)
+
+    def test_targets_and_book(self):
+        """Test underlying targets are converted to option prices and greeks are computed per contract"""
+        price = bs_price(200, 200, 0.1, 0.0, 0.25, True)
+        target = price_target_from_underlying(205, 200, price, 200, 0.1, 0.0, True)
+        assert target == pytest.approx(bs_price(205, 200, 0.1, 0.0, 0.25, True), abs=1e-4)
+
+        now = pd.Timestamp("2025-06-13 16:00", tz="America/New_York").value
+        greeks = book_greeks(["AAPL250620C00200000", "AAPL250620P00200000"], [3.0, 2.9], [200.0, 200.0], now)
+        assert list(greeks.index) == ["AAPL250620C00200000", "AAPL250620P00200000"]
+        assert greeks['time_to_expiry'].iloc[0] == pytest.approx(7 / 365)
+        assert 0 < greeks['delta'].iloc[0] < 1
+        assert -1 < greeks['delta'].iloc[1] < 0
+        assert (greeks['theta'] < 0).all()
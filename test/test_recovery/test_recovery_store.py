@@ -0,0 +1,97 @@
+import pytest
+import os
+import pandas as pd
+from types import SimpleNamespace
+from src.recovery.recovery_store import RecoveryStore
+from src.portfolio.portfolio_manager import PortfolioManager
+from src.configuration import Configuration
+
+
+class TestRecoveryStore:
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test fixtures before each test method."""
+        self.directory = str(tmp_path)
+        self.store = RecoveryStore(self.directory)
+        self.cfg = Configuration(os.path.join(os.getcwd(), 
+                                        "test", 
+                                        "test_portfolio_manager", 
+                                        "test_run.cfg"))
+        yield
+        self.store.close()
+
+    def test_empty_store(self):
+        """Test loading a store without snapshot or journal"""
+        state, events = self.store.load()
+        assert state is None
+        assert events == []
+
+    def test_snapshot_and_journal_replay(self):
+        """Test only the events recorded after the latest snapshot are replayed"""
+        self.store.append("portfolio.order_update", 1)
+        self.store.save_snapshot(lambda: {"value": 1})
+        self.store.append("portfolio.order_update", 2)
+        self.store.append("mkt_data.ticks", pd.DataFrame({"bid_price": [1.0]}), sync=False)
+        self.store.close()
+
+        state, events = RecoveryStore(self.directory).load()
+        assert state == {"value": 1}
+        assert [kind for kind, _ in events] == ["portfolio.order_update", "mkt_data.ticks"]
+        assert events[0][1] == 2
+
+    def test_torn_record_is_ignored(self):
+        """Test a partially written journal record does not prevent recovery"""
+        self.store.save_snapshot(lambda: {"value": 1})
+        self.store.append("portfolio.order_update", 2)
+        self.store.close()
+
+        with open(self.store.journal_path, "ab") as f:
+            f.write(b"\x40\x00\x00\x00partial")
+
+        state, events = RecoveryStore(self.directory).load()
+        assert state == {"value": 1}
+        assert events == [("portfolio.order_update", 2)]
+
+    def test_events_during_capture_kept(self):
+        """Test an event appended while the state is captured is replayed after the snapshot"""
+        self.store.append("portfolio.order_update", 1)
+
+        def capture():
+            # A trade update arriving from the websocket thread mid-snapshot
+            self.store.append("portfolio.order_update", 2)
+            return {"value": 1}
+
+        self.store.save_snapshot(capture)
+        self.store.append("portfolio.order_update", 3)
+        self.store.close()
+
+        state, events = RecoveryStore(self.directory).load()
+        assert state == {"value": 1}
+        assert events == [("portfolio.order_update", 2), ("portfolio.order_update", 3)]
+
+    def test_portfolio_replay(self):
+        """Test a portfolio is restored from a snapshot and journal"""
+        portfolio_manager = PortfolioManager(self.cfg, None)
+        portfolio_manager.ledger.path = os.path.join(self.directory, "positions_closed.db")
+        self.store.save_snapshot(lambda: {"portfolio": portfolio_manager.snapshot_state()})
+        portfolio_manager.journal = self.store
+
+        order = SimpleNamespace(id="a", symbol="AAPL250620C00200000", status="filled", qty="1", filled_avg_price="1.5")
+        portfolio_manager.orders.append((order, 0, False))
+        self.store.append("portfolio.order_placed", (order, 0))
+        portfolio_manager._order_statuses["a"] = SimpleNamespace(order=order)
+        self.store.append("portfolio.order_update", SimpleNamespace(order=order))
+        assert portfolio_manager.process_latest_order() == True
+        portfolio_manager.ledger.close()
+        self.store.close()
+
+        state, events = RecoveryStore(self.directory).load()
+        restored = PortfolioManager(self.cfg, None)
+        restored.restore_state(state["portfolio"])
+        for kind, payload in events:
+            restored.apply_event(kind.partition(".")[2], payload)
+
+        assert restored.filled_buckets == [0]
+        assert restored.orders[-1][2] == True
+        assert restored.latest_order_pending() == False
@@ -0,0 +1,39 @@
+import os
+import sys
+import subprocess
+import textwrap
+
+
+def run_python(code):
+    return subprocess.run([sys.executable, "-c", textwrap.dedent(code)], cwd=os.getcwd(),
+                          capture_output=True, text=True, timeout=120)
+
+
+def test_engine_import_defers_sdk():
+    """Test importing the engine does not import the Alpaca SDK or holidays"""
+    result = run_python("""
+        import sys
+        import src.execution_orchestrator
+        heavy = sorted({name.split('.')[0] for name in sys.modules} & {'alpaca', 'holidays'})
+        print(','.join(heavy))
+    """)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+def test_invalid_configuration_fails_before_sdk(tmp_path):
+    """Test configuration errors surface without importing the engine"""
+    with open(os.path.join("test", "test_strategy", "test_run.cfg")) as f:
+        cfg = f.read().replace("timezone = Europe/Amsterdam", "timezone = Europe/Atlantis")
+    path = tmp_path / "run.cfg"
+    path.write_text(cfg)
+
+    result = run_python(f"""
+        import sys
+        from src.configuration import Configuration
+        try:
+            Configuration({str(path)!r})
+        except ValueError as e:
+            print(e, 'pandas' in sys.modules, 'alpaca' in sys.modules)
+    """)
+    assert result.stdout.strip() == "Unknown timezone Europe/Atlantis False False"
@@ -0,0 +1,135 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from src.strategys.trailing_stop_strategy import TrailingStopStrategy
+from src.strategys.volatility_stop_strategy import VolatilityStopStrategy
+from src.strategys.time_decay_strategy import TimeDecayTargetStrategy
+from src.strategys.exit_strategy_factory import build_exit_strategy
+from src.utilities.enums import Signal
+from src.configuration import Configuration
+from src.mkt_data.mkt_data_state import MktDataState
+from test.test_strategy.test_strategies import Quote
+
+
+class TestExitStrategies(unittest.TestCase):
+    def setUp(self):
+        config_path = os.path.join(os.getcwd(), 
+                                   "test", 
+                                   "test_strategy", 
+                                   "test_run.cfg")
+        self.cfg = Configuration(config_path)
+        self.timestamps = np.arange(6, dtype=np.int64) * 1_000_000_000
+
+    def test_trailing_stop_pct(self):
+        """Test the trailing stop follows the running maximum"""
+        strategy = TrailingStopStrategy(trail_pct=0.1)
+        bids = np.array([1.0, 1.5, 2.0, 1.9, 1.81, 1.79])
+
+        signals = strategy.generate_signals_batch(bids, self.timestamps, self.cfg)
+        self.assertEqual(list(signals), [Signal.HOLD] * 5 + [Signal.SELL])
+        self.assertAlmostEqual(strategy.stop_price, 1.8)
+
+    def test_trailing_stop_activation(self):
+        """Test the trailing stop is not armed below the activation price"""
+        strategy = TrailingStopStrategy(trail_amount=0.2, activation_price=2.0)
+        self.assertEqual(strategy.first_trigger(np.array([1.5, 1.2, 1.0]), self.timestamps[:3], self.cfg), -1)
+        self.assertEqual(strategy.first_trigger(np.array([2.1, 1.85]), self.timestamps[:2], self.cfg), 1)
+
+        strategy.reset()
+        self.assertEqual(strategy.running_max, float('-inf'))
+
+    def test_warm_up(self):
+        """Test warm up primes the running state without producing a signal"""
+        strategy = TrailingStopStrategy(trail_pct=0.1)
+        strategy.warm_up(np.array([1.0, 2.0, 1.5]), self.timestamps[:3])
+
+        self.assertEqual(strategy.running_max, 2.0)
+        self.assertEqual(strategy.first_trigger(np.array([1.85, 1.75]), self.timestamps[:2], self.cfg), 1)
+
+    def test_trailing_stop_invalid_arguments(self):
+        """Test the trailing distance must be specified once"""
+        with self.assertRaises(ValueError):
+            TrailingStopStrategy()
+        with self.assertRaises(ValueError):
+            TrailingStopStrategy(trail_pct=0.1, trail_amount=0.1)
+
+    def test_volatility_stop(self):
+        """Test the volatility stop arms after the window and scales with the range"""
+        strategy = VolatilityStopStrategy(window=3, multiplier=2)
+        bids = np.array([1.0, 1.1, 1.0, 1.1, 1.0, 0.8])
+
+        signals = strategy.generate_signals_batch(bids, self.timestamps, self.cfg)
+        self.assertEqual(list(signals), [Signal.HOLD] * 5 + [Signal.SELL])
+        self.assertAlmostEqual(strategy.average_range, (0.1 + 0.1 + 0.2) / 3)
+
+    def test_time_decay_target(self):
+        """Test the target decays linearly towards expiry"""
+        decay_start = pd.Timestamp("2025-06-20 09:30", tz="US/Eastern")
+        expiry = pd.Timestamp("2025-06-20 16:00", tz="US/Eastern")
+        strategy = TimeDecayTargetStrategy(2.0, 1.0, decay_start, expiry)
+
+        midpoint = (decay_start + (expiry - decay_start) / 2).value
+        self.assertAlmostEqual(strategy.target_at(decay_start.value - 1), 2.0)
+        self.assertAlmostEqual(strategy.target_at(midpoint), 1.5)
+        self.assertAlmostEqual(strategy.target_at(expiry.value + 1), 1.0)
+
+        self.assertEqual(strategy.update(1.6, decay_start.value), Signal.HOLD)
+        self.assertEqual(strategy.update(1.6, midpoint), Signal.SELL)
+
+    def test_consumes_every_batch(self):
+        """Test generate_signals consumes every batch ingested since the previous call once"""
+        mkt_data = MktDataState(self.cfg)
+        strategy = TrailingStopStrategy(trail_pct=0.1)
+
+        for bid_price in (1.0, 2.0):
+            mkt_data._quote_data.put(Quote(bid_price=bid_price))
+        mkt_data.update_state()
+        self.assertEqual(strategy.generate_signals(mkt_data, self.cfg), Signal.HOLD)
+        self.assertEqual(strategy.generate_signals(mkt_data, self.cfg), Signal.HOLD)
+
+        # The drop is in a batch that is never the latest one when the strategy is polled
+        for bid_price in (1.7, 1.95):
+            mkt_data._quote_data.put(Quote(bid_price=bid_price))
+            mkt_data.update_state()
+        self.assertEqual(strategy.generate_signals(mkt_data, self.cfg), Signal.SELL)
+        self.assertEqual(strategy.running_max, 2.0)
+
+    def test_build_from_configuration(self):
+        """Test the configured exit strategy is built with levels relative to the entry price"""
+        self.assertIsNone(build_exit_strategy(self.cfg, "AAPL250620C00200000", 2.0))
+
+        self.cfg.exit_strategy = 'trailing_stop'
+        self.cfg.exit_strategy_args.update(trail_pct=0.1, trail_activation=0.5)
+        strategy = build_exit_strategy(self.cfg, "AAPL250620C00200000", 2.0)
+        self.assertIsInstance(strategy, TrailingStopStrategy)
+        self.assertAlmostEqual(strategy.activation_price, 3.0)
+
+        self.cfg.exit_strategy = 'time_decay'
+        self.cfg.exit_strategy_args.update(decay_initial_target=0.5, decay_final_target=0.1, decay_days=2)
+        strategy = build_exit_strategy(self.cfg, "AAPL250620C00200000", 2.0)
+        expiry = pd.Timestamp("2025-06-20 16:00", tz=self.cfg.timezone)
+        self.assertAlmostEqual(strategy.target_at((expiry - pd.Timedelta(days=2)).value), 3.0)
+        self.assertAlmostEqual(strategy.target_at(expiry.value), 2.2)
+
+    def test_configuration_checks(self):
+        """Test exit strategies missing settings are rejected when the configuration is read"""
+        with open(os.path.join(os.getcwd(), "test", "test_strategy", "test_run.cfg")) as f:
+            text = f.read()
+
+        for settings, message in (
+                ("exit_strategy = trailing", "exit_strategy must be one of"),
+                ("exit_strategy = trailing_stop", "exactly one of trail_pct and trail_amount"),
+                ("exit_strategy = volatility_stop\nvolatility_window = 20", "volatility_stop requires volatility_multiplier"),
+                ("exit_strategy = time_decay\ndecay_initial_target = 0.5\ndecay_final_target = 0.1\ndecay_days = 0", "decay_days must be greater than 0")):
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "run.cfg")
+                with open(path, "w") as f:
+                    f.write(text.replace("[Risk_Management]\n", f"[Risk_Management]\n{settings}\n"))
+                with self.assertRaisesRegex(ValueError, message):
+                    Configuration(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 import pandas as pd
 import numpy as np
 import os
+from src.strategys.abstract_strategy import AbstractStrategy
 from src.strategys.take_profit_strategy import TakeProfitStrategy
 from src.utilities.enums import Signal
 from src.configuration import Configuration
@@ -77,5 +78,60 @@ class TestTakeProfitStrategy(unittest.TestCase):
         signal = self.strategy.generate_signals(self.mkt_data, self.cfg, strategy_args)
         self.assertEqual(signal, Signal.SELL)  # Should sell when price equals target
 
+    def test_batch_signals(self):
+        """Test a vector of signals is generated for a batch of bids"""
+        bids = np.array([0.8, 1.0, 0.9])
+        timestamps = np.arange(3)
+        
+        signals = self.strategy.generate_signals_batch(bids, timestamps, self.cfg, {'profit_target': 1.0})
+        self.assertEqual(list(signals), [Signal.HOLD, Signal.SELL, Signal.HOLD])
+
+        self.assertEqual(self.strategy.first_trigger(bids, timestamps, self.cfg, {'profit_target': 1.0}), 1)
+        self.assertEqual(self.strategy.first_trigger(bids, timestamps, self.cfg, {'profit_target': 1.5}), -1)
+        self.assertEqual(self.strategy.first_trigger(bids[:0], timestamps[:0], self.cfg, {'profit_target': 1.0}), -1)
+
+    def test_intra_batch_spike_detected(self):
+        """Test a spike that is over by the end of a drained batch still triggers"""
+        for bid_price in (0.8, 1.2, 0.9):
+            self.mkt_data._quote_data.put(Quote(bid_price=bid_price, ask_price=bid_price + 0.1))
+        self.mkt_data.update_state()
+
+        strategy_args = {'profit_target': 1.0}
+        self.assertEqual(self.strategy.generate_signals(self.mkt_data, self.cfg, strategy_args), Signal.HOLD)
+
+        batch = self.mkt_data.latest_batch()
+        trigger_idx = self.strategy.first_trigger(batch['bid_price'].to_numpy(), batch.index.to_numpy(), self.cfg, strategy_args)
+        self.assertEqual(batch['bid_price'].iloc[trigger_idx], 1.2)
+
+
+class BelowStrategy(AbstractStrategy):
+    """Sells below a level, relying on the base class first_trigger"""
+
+    @staticmethod
+    def generate_signals(mkt_data, cfg, strategy_args=None):
+        return Signal.HOLD
+
+    @staticmethod
+    def generate_signals_batch(bids, timestamps, cfg, strategy_args=None):
+        return np.array([Signal.SELL if bid < strategy_args['level'] else Signal.HOLD for bid in bids], dtype=object)
+
+
+class TestAbstractStrategy(unittest.TestCase):
+
+    def test_first_trigger(self):
+        """Test the base class finds the first SELL of an object array of signals"""
+        bids = np.array([1.2, 1.1, 0.9, 0.8])
+        timestamps = np.arange(4)
+
+        self.assertEqual(BelowStrategy().first_trigger(bids, timestamps, None, {'level': 1.0}), 2)
+        self.assertEqual(BelowStrategy().first_trigger(bids, timestamps, None, {'level': 0.5}), -1)
+        self.assertEqual(BelowStrategy().first_trigger(bids[:0], timestamps[:0], None, {'level': 1.0}), -1)
+
+    def test_first_sell_index(self):
+        signals = np.array([Signal.HOLD, Signal.BUY, Signal.SELL, Signal.SELL], dtype=object)
+        self.assertEqual(AbstractStrategy.first_sell_index(signals), 2)
+        self.assertEqual(AbstractStrategy.first_sell_index(signals[:2]), -1)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -5,6 +5,7 @@ import os
 from unittest.mock import patch
 from src.portfolio.portfolio_manager import PortfolioManager
 from src.trading_session_manager import TradingSessionManager
+from src.utilities.session_scheduler import SessionScheduler
 
 
 class TestTradingSessionManager:
@@ -113,3 +114,76 @@ class TestTradingSessionManager:
 
         
 
+    def test_nyse_holidays_and_early_closes(self):
+        """Test NYSE specific holidays and half-days"""
+        tsm = TradingSessionManager(
+            trading_start_time="0930",  
+            trading_end_time="1600",   
+            timezone="US/Eastern")
+        
+        good_friday = pd.Timestamp("2025-04-18 10:00", tz="US/Eastern")  # NYSE holiday, not a federal one
+        assert tsm.is_trading_day(good_friday) == False
+
+        columbus_day = pd.Timestamp("2025-10-13 10:00", tz="US/Eastern")  # Federal holiday, NYSE open
+        assert tsm.is_trading_day(columbus_day) == True
+
+        day_after_thanksgiving = pd.Timestamp("2025-11-28 12:30", tz="US/Eastern")
+        assert tsm.is_open(day_after_thanksgiving) == True
+        assert tsm.is_open(pd.Timestamp("2025-11-28 13:30", tz="US/Eastern")) == False
+        assert tsm.session_close(day_after_thanksgiving) == pd.Timestamp("2025-11-28 13:00", tz="US/Eastern")
+
+        assert tsm.session_close(pd.Timestamp("2025-07-03 09:00", tz="US/Eastern")) == pd.Timestamp("2025-07-03 13:00", tz="US/Eastern")
+        assert tsm.session_close(pd.Timestamp("2025-12-24 09:00", tz="US/Eastern")) == pd.Timestamp("2025-12-24 13:00", tz="US/Eastern")
+        assert tsm.session_close(pd.Timestamp("2025-03-18 09:00", tz="US/Eastern")) == pd.Timestamp("2025-03-18 16:00", tz="US/Eastern")
+        assert tsm.session_close(pd.Timestamp("2025-12-25 09:00", tz="US/Eastern")) is None
+
+    def test_next_open(self, trading_session_manager: TradingSessionManager):
+        """Test next session open lookups across weekends, holidays and years"""
+        tz = trading_session_manager.timezone
+
+        friday_evening = pd.Timestamp("2025-03-21 18:00", tz=tz)
+        assert trading_session_manager.next_open(friday_evening) == pd.Timestamp("2025-03-24 09:30", tz=tz)
+
+        christmas_eve = pd.Timestamp("2025-12-24 18:00", tz=tz)
+        assert trading_session_manager.next_open(christmas_eve) == pd.Timestamp("2025-12-26 09:30", tz=tz)
+
+        new_years_eve = pd.Timestamp("2025-12-31 18:00", tz=tz)
+        assert trading_session_manager.next_open(new_years_eve) == pd.Timestamp("2026-01-02 09:30", tz=tz)
+
+        assert trading_session_manager.calendar(2025) is trading_session_manager.calendar(2025)
+
+    def test_schedule_session_events(self):
+        """Test the session events scheduled outside trading hours"""
+        tsm = TradingSessionManager(
+            trading_start_time="0930",  
+            trading_end_time="1600",   
+            timezone="US/Eastern")
+        scheduler = SessionScheduler(tsm.stop_event)
+
+        # Evening before the day after Thanksgiving, a half-day
+        now = pd.Timestamp("2025-11-27 20:00", tz="US/Eastern")
+        tsm.schedule_session_events(scheduler, now, "1559", 5)
+
+        events = [(pd.Timestamp(deadline_ns, tz="UTC").tz_convert("US/Eastern"), event) 
+                  for deadline_ns, _, event in sorted(scheduler._heap)]
+
+        assert events == [
+            (pd.Timestamp("2025-11-28 00:00", tz="US/Eastern"), "day_rollover"),
+            (pd.Timestamp("2025-11-28 09:25", tz="US/Eastern"), "warmup"),
+            (pd.Timestamp("2025-11-28 09:30", tz="US/Eastern"), "open"),
+            (pd.Timestamp("2025-11-28 12:59", tz="US/Eastern"), "eod_exit"),
+            (pd.Timestamp("2025-11-28 13:00", tz="US/Eastern"), "close"),
+        ]
+
+    def test_scheduler_wait(self):
+        """Test due events fire immediately and cancelled waits return None"""
+        scheduler = SessionScheduler()
+        now = pd.Timestamp.now(tz="UTC").value
+
+        scheduler.schedule(now + 3_600_000_000_000, "open")
+        scheduler.schedule(now - 1_000_000_000, "warmup")
+        assert scheduler.wait_next() == "warmup"
+
+        scheduler.cancel()
+        assert scheduler.wait_next() is None
+        assert len(scheduler) == 1
@@ -1,5 +1,21 @@
 import unittest
+import logging
+import datetime
+import numpy as np
+import pandas as pd
+import pytz
+import os
+import time
+import signal
+import tempfile
 from src.utilities.utils import quantity_buckets
+from src.utilities.timestamps import to_ns, to_ns_array, to_timestamp, to_datetime_index
+from src.utilities.profiler import Profiler
+from src.utilities.metrics import MetricsRegistry, MetricsServer
+from src.utilities.config_watcher import ConfigWatcher
+from src.configuration import Configuration
+from urllib.request import urlopen
+from urllib.error import HTTPError
 
 
 class TestQuantityBuckets(unittest.TestCase):
@@ -98,3 +114,215 @@ class TestQuantityBuckets(unittest.TestCase):
 
 if __name__ == '__main__':
     unittest.main()
+
+
+class TestTimestamps(unittest.TestCase):
+    def test_to_ns(self):
+        """Test every supported representation converts to the same UTC nanoseconds"""
+        expected = pd.Timestamp("2025-06-02 13:30:00.123456", tz="UTC").value
+        eastern = datetime.datetime(2025, 6, 2, 13, 30, 0, 123456, tzinfo=pytz.utc).astimezone(pytz.timezone("US/Eastern"))
+
+        self.assertEqual(to_ns(eastern), expected)
+        self.assertEqual(to_ns(datetime.datetime(2025, 6, 2, 13, 30, 0, 123456)), expected)
+        self.assertEqual(to_ns(pd.Timestamp(eastern)), expected)
+        self.assertEqual(to_ns("2025-06-02 09:30:00.123456-04:00"), expected)
+        self.assertEqual(to_ns(np.int64(expected)), expected)
+
+    def test_arrays_round_trip(self):
+        """Test arrays convert to nanoseconds and back to a DatetimeIndex in any timezone"""
+        index = pd.date_range("2025-06-02 09:30", periods=3, freq="s", tz="US/Eastern")
+        ns = to_ns_array(index)
+
+        self.assertEqual(ns.dtype, np.int64)
+        np.testing.assert_array_equal(to_ns_array(index.to_numpy()), ns)
+        np.testing.assert_array_equal(to_ns_array(np.array(list(index), dtype=object)), ns)
+        self.assertTrue(to_datetime_index(ns, "US/Eastern").equals(index))
+        self.assertEqual(to_timestamp(ns[0], "US/Eastern"), index[0])
+
+
+
+def busy_loop(profiler, seconds, until=lambda profiler: not profiler.active):
+    """Stand-in trading loop calling the profiler checkpoint on every iteration"""
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline or not until(profiler):
+        sum(i * i for i in range(1000))
+        profiler.checkpoint()
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_idle(self):
+        """Test checkpoints without a request start nothing"""
+        profiler = Profiler(self.output_dir)
+        profiler.checkpoint()
+
+        self.assertFalse(profiler.active)
+        self.assertEqual(os.listdir(self.output_dir), [])
+
+    def test_modes(self):
+        """Test each mode writes its profile to the output directory"""
+        profiler = Profiler(self.output_dir, sample_interval=0.001)
+        written = {}
+
+        for mode, suffix in (("sample", ".folded"), ("cprofile", ".prof"), ("tracemalloc", ".txt")):
+            profiler.request(mode, 0.1)
+            busy_loop(profiler, 0.1)
+
+            files = [name for name in os.listdir(self.output_dir) if name.startswith(f"profile_{mode}_") and name.endswith(suffix)]
+            self.assertEqual(len(files), 1)
+            written[mode] = os.path.join(self.output_dir, files[0])
+
+        with open(written["sample"]) as f:
+            self.assertIn("test_utils.py:busy_loop", f.read())
+
+    def test_control_file(self):
+        """Test a control file starts a profile and stop ends it early"""
+        control_file = os.path.join(self.output_dir, "profile.request")
+        profiler = Profiler(self.output_dir, control_file=control_file, control_poll=0.01)
+        profiler.install()
+        try:
+            with open(control_file, "w") as f:
+                f.write("cprofile 60")
+            busy_loop(profiler, 0, until=lambda profiler: profiler.active)
+            self.assertTrue(profiler.active)
+            self.assertFalse(os.path.exists(control_file))
+
+            with open(control_file, "w") as f:
+                f.write("stop")
+            busy_loop(profiler, 0)
+            self.assertFalse(profiler.active)
+        finally:
+            profiler.uninstall()
+
+        self.assertTrue(any(name.endswith(".prof") for name in os.listdir(self.output_dir)))
+
+    @unittest.skipUnless(hasattr(signal, "SIGUSR1"), "SIGUSR1 not available")
+    def test_signal(self):
+        """Test SIGUSR1 requests a profile of the default mode"""
+        previous = signal.getsignal(signal.SIGUSR1)
+        profiler = Profiler(self.output_dir, default_duration=0.1)
+        profiler.install()
+        try:
+            os.kill(os.getpid(), signal.SIGUSR1)
+            profiler.checkpoint()
+            self.assertTrue(profiler.active)
+            busy_loop(profiler, 0.1)
+        finally:
+            profiler.uninstall()
+            signal.signal(signal.SIGUSR1, previous)
+
+        self.assertTrue(any(name.endswith(".folded") for name in os.listdir(self.output_dir)))
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_exposition(self):
+        """Test counters, gauges and histograms render in the Prometheus text format"""
+        calls = self.registry.counter("api_calls_total", "REST calls", ["method"])
+        calls.labels("get_orders").inc()
+        calls.labels("get_orders").inc(2)
+        depth = self.registry.gauge("queue_depth", "Queued quotes")
+        depth.set_function(lambda: 7)
+        latency = self.registry.histogram("ack_seconds", "Ack latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value)
+
+        lines = self.registry.expose().splitlines()
+        self.assertIn("# TYPE api_calls_total counter", lines)
+        self.assertIn('api_calls_total{method="get_orders"} 3.0', lines)
+        self.assertIn("queue_depth 7.0", lines)
+        self.assertIn('ack_seconds_bucket{le="0.1"} 1', lines)
+        self.assertIn('ack_seconds_bucket{le="1.0"} 2', lines)
+        self.assertIn('ack_seconds_bucket{le="+Inf"} 3', lines)
+        self.assertIn("ack_seconds_count 3", lines)
+
+    def test_registration(self):
+        """Test metrics are shared by name and conflicting registrations fail"""
+        counter = self.registry.counter("ticks_total", "Ticks")
+        self.assertIs(self.registry.counter("ticks_total", "Ticks"), counter)
+
+        with self.assertRaises(ValueError):
+            self.registry.gauge("ticks_total", "Ticks")
+        with self.assertRaises(ValueError):
+            self.registry.counter("calls_total", "Calls", ["method"]).labels("a", "b")
+
+    def test_server(self):
+        """Test the registry is served on /metrics"""
+        self.registry.counter("ticks_total", "Ticks").inc(5)
+        server = MetricsServer(self.registry, 0)
+        server.start()
+        try:
+            with urlopen(f"http://127.0.0.1:{server.port}/metrics") as response:
+                self.assertIn("ticks_total 5.0", response.read().decode())
+
+            with self.assertRaises(HTTPError):
+                urlopen(f"http://127.0.0.1:{server.port}/other")
+        finally:
+            server.stop()
+
+
+class TestConfigWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run.cfg")
+        with open(os.path.join("test", "test_strategy", "test_run.cfg")) as f:
+            self.text = f.read()
+        self.write(self.text)
+        self.config = Configuration(self.path)
+        self.watcher = ConfigWatcher(self.config, poll_interval=0.01)
+
+    def tearDown(self):
+        self.watcher.stop()
+        self.tmp.cleanup()
+
+    def write(self, text):
+        with open(self.path, "w") as f:
+            f.write(text)
+
+    def reload(self, text):
+        """Rewrite the file and return the changes of the first checkpoint that sees it"""
+        self.write(text)
+        deadline = time.monotonic() + 5
+        while not self.watcher._changed.is_set() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.watcher.checkpoint()
+
+    def test_reload(self):
+        """Test reloadable settings are swapped into the running configuration"""
+        self.watcher.start()
+        self.assertEqual(self.watcher.checkpoint(), {})
+
+        text = self.text.replace("expiry_sell_cutoff = 65", "expiry_sell_cutoff = 30")
+        text = text.replace("log_level = Debug", "log_level = Info")
+        changes = self.reload(text)
+
+        self.assertEqual(set(changes), {"expiry_sell_cutoff", "log_level", "positions"})
+        self.assertEqual(changes["log_level"], (10, 20))
+        self.assertEqual(self.config.expiry_sell_cutoff, 30)
+        self.assertEqual(self.config.positions.expiry_sell_cutoff.tolist(), [30])
+        self.assertEqual(self.watcher.checkpoint(), {})
+
+    def test_rejected(self):
+        """Test invalid files and restart-only changes keep the running configuration"""
+        self.watcher.start()
+
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(self.reload(self.text.replace("sell_buckets = 4", "sell_buckets = 3")), {})
+        self.assertEqual(self.config.sell_buckets, 4)
+
+        text = self.text.replace("expiry_sell_cutoff = 65", "expiry_sell_cutoff = 30")
+        text = text.replace("log_level = Debug", "log_level = Error")
+        text = text.replace("starting_position_quantity = 4", "starting_position_quantity = 5")
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertEqual(self.reload(text), {})
+            self.assertEqual(logging.getLogger().level, logging.DEBUG)
+        self.assertIn("starting_position_quantity requires a restart", logs.output[0])
+        self.assertEqual(self.config.expiry_sell_cutoff, 65)